@@ -5,6 +5,8 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Run it with an ASGI server, e.g. ``uvicorn myshop.asgi:application --workers 4``.
 """
 
 import os
@@ -12,5 +14,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myshop.settings')
+# Serve the storefront pages with the async views (store/async_views.py)
+os.environ.setdefault('STORE_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -33,15 +33,72 @@ INSTALLED_APPS = [
 # Middleware
 # ---------------------------------------------------
 MIDDLEWARE = [
+    'store.profiling.QueryProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'store.cart.CartMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# ---------------------------------------------------
+# Profiling (per-view query count & latency, see store/profiling.py)
+# ---------------------------------------------------
+STORE_PROFILER = {
+    'ENABLED': DEBUG,
+    'LOG_FILE': os.environ.get('STORE_PROFILER_LOG'),  # JSONL, one line per request
+    'QUERY_BUDGETS': {
+        'product_list': 12,
+        'product_detail': 10,
+        'view_cart': 4,
+        'place_order': 12,
+    },
+    'STRICT': False,
+}
+
+# ---------------------------------------------------
+# Background jobs (see store/jobs.py, run with `manage.py run_worker`)
+# ---------------------------------------------------
+STORE_JOBS = {
+    'ALWAYS_EAGER': False,  # True runs jobs inline, without a worker
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 10,
+}
+
+# ---------------------------------------------------
+# Cache (facets, image derivatives, storefront fragments)
+# ---------------------------------------------------
+# STORE_CACHE_BACKEND: locmem (default, per process), file or redis.
+# STORE_CACHE_LOCATION: directory for file, URL for redis.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'store'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+_cache_backend, _cache_location = CACHE_BACKENDS[os.environ.get('STORE_CACHE_BACKEND', 'locmem')]
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.environ.get('STORE_CACHE_LOCATION', _cache_location),
+    }
+}
+
+# Product cards, discount strip and review lists are cached per fragment and
+# keyed on product version stamps (see store/fragments.py).
+STORE_FRAGMENT_CACHE_TIMEOUT = 60 * 15
+
+# Sitemap, Google Shopping and Facebook catalog feeds (store/feeds.py), written
+# to MEDIA_ROOT/feeds/ by `manage.py build_feeds`. BASE_URL is the public site
+# root used for product links.
+STORE_FEEDS = {
+    'BASE_URL': os.environ.get('STORE_BASE_URL', 'http://localhost:8000'),
+    'CURRENCY': 'PKR',
+    'SHARD_SIZE': 10000,
+}
+
 # ---------------------------------------------------
 # URL / WSGI
 # ---------------------------------------------------
@@ -49,6 +106,10 @@ ROOT_URLCONF = 'myshop.urls'
 
 WSGI_APPLICATION = 'myshop.wsgi.application'
 
+# Async product list / detail / cart views (store/async_views.py). myshop/asgi.py
+# turns this on; under WSGI async views would only add thread hops.
+STORE_ASYNC_VIEWS = os.environ.get('STORE_ASYNC_VIEWS') == '1'
+
 # ---------------------------------------------------
 # Templates
 # ---------------------------------------------------
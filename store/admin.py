@@ -1,5 +1,10 @@
-from django.contrib import admin
-from .models import Category, Product, Wishlist, Order, OrderItem, Review
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from .models import Category, Product, Wishlist, Order, OrderItem, Review, Job
+from .exports import ORDER_COLUMNS, PRODUCT_COLUMNS, export_response, order_rows, product_rows
+from .inventory import cancel_orders, move_to_category, restock_products, set_active, set_discount
+from .rollups import local_day, mark_dirty
 
 # Category
 @admin.register(Category)
@@ -8,20 +13,74 @@ class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
 
 # Product
+class ProductActionForm(ActionForm):
+    # Extra inputs next to the action dropdown, used by the bulk actions below
+    quantity = forms.IntegerField(required=False, min_value=1, initial=10, label="Qty")
+    percent = forms.DecimalField(required=False, min_value=0, max_value=99, decimal_places=2, label="Discount %")
+    category = forms.ModelChoiceField(Category.objects.all(), required=False, label="Category")
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ('name', 'price', 'stock', 'category', 'is_active', 'created_at')
+    list_display = ('name', 'price', 'stock', 'category', 'is_active', 'created_at', 'updated_at')
     list_filter = ('is_active', 'category')
     search_fields = ('name', 'description')
     prepopulated_fields = {'slug': ('name',)}
-    actions = ['restock_products']
+    action_form = ProductActionForm
+    actions = ['restock_products', 'set_discount', 'activate_products', 'deactivate_products',
+               'move_to_category', 'export_csv', 'export_xlsx']
+
+    # Bulk actions are single UPDATEs with one admin log entry per batch (see inventory.py)
+    def _action_value(self, request, field):
+        try:
+            return self.action_form.base_fields[field].clean(request.POST.get(field))
+        except forms.ValidationError:
+            return None
 
     def restock_products(self, request, queryset):
-        for product in queryset:
-            product.stock += 10  # Add 10 more to stock
-            product.save()
-        self.message_user(request, "Selected products have been restocked by 10.")
-    restock_products.short_description = "Restock selected products by 10"
+        quantity = self._action_value(request, 'quantity')
+        if not quantity:
+            self.message_user(request, "Enter a quantity of 1 or more to restock.", messages.ERROR)
+            return
+        updated = restock_products(queryset, quantity, request.user)
+        self.message_user(request, f"{updated} product(s) restocked by {quantity}.")
+    restock_products.short_description = "Restock selected products by Qty"
+
+    def set_discount(self, request, queryset):
+        percent = self._action_value(request, 'percent')
+        if percent is None:
+            self.message_user(request, "Enter a discount between 0 and 99%.", messages.ERROR)
+            return
+        updated = set_discount(queryset, percent, request.user)
+        self.message_user(request, f"Discount set to {percent}% on {updated} product(s).")
+    set_discount.short_description = "Set discount %% on selected products"
+
+    def activate_products(self, request, queryset):
+        updated = set_active(queryset, True, request.user)
+        self.message_user(request, f"{updated} product(s) activated.")
+    activate_products.short_description = "Activate selected products"
+
+    def deactivate_products(self, request, queryset):
+        updated = set_active(queryset, False, request.user)
+        self.message_user(request, f"{updated} product(s) deactivated.")
+    deactivate_products.short_description = "Deactivate selected products"
+
+    def move_to_category(self, request, queryset):
+        category = self._action_value(request, 'category')
+        if category is None:
+            self.message_user(request, "Choose a category to move the products to.", messages.ERROR)
+            return
+        updated = move_to_category(queryset, category, request.user)
+        self.message_user(request, f"{updated} product(s) moved to {category.name}.")
+    move_to_category.short_description = "Move selected products to Category"
+
+    def export_csv(self, request, queryset):
+        return export_response("products", PRODUCT_COLUMNS, product_rows(queryset), "csv")
+    export_csv.short_description = "Export selected products (CSV)"
+
+    def export_xlsx(self, request, queryset):
+        return export_response("products", PRODUCT_COLUMNS, product_rows(queryset), "xlsx")
+    export_xlsx.short_description = "Export selected products (Excel)"
 
 # Wishlist
 @admin.register(Wishlist)
@@ -38,6 +97,31 @@ class OrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'status', 'total_amount', 'payment_method', 'created_at')
     list_filter = ('status', 'payment_method')
     inlines = [OrderItemInline]
+    actions = ['cancel_selected_orders', 'export_csv', 'export_xlsx']
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Items are saved after the order itself, so refresh the total here.
+        order = form.instance
+        total = order.calculate_total()
+        if total != order.total_amount:
+            order.total_amount = total
+            order.save(update_fields=["total_amount"])
+        # Item edits change units/per-product sales even when the total doesn't
+        mark_dirty([local_day(order.created_at)])
+
+    def cancel_selected_orders(self, request, queryset):
+        cancelled = cancel_orders(queryset)
+        self.message_user(request, f"{cancelled} order(s) cancelled and restocked.")
+    cancel_selected_orders.short_description = "Cancel selected orders and restock items"
+
+    def export_csv(self, request, queryset):
+        return export_response("orders", ORDER_COLUMNS, order_rows(queryset), "csv")
+    export_csv.short_description = "Export selected orders with items (CSV)"
+
+    def export_xlsx(self, request, queryset):
+        return export_response("orders", ORDER_COLUMNS, order_rows(queryset), "xlsx")
+    export_xlsx.short_description = "Export selected orders with items (Excel)"
 
 # Review
 @admin.register(Review)
@@ -45,3 +129,12 @@ class ReviewAdmin(admin.ModelAdmin):
     list_display = ('product', 'user', 'rating', 'created_at')
     list_filter = ('rating',)
     search_fields = ('title', 'body')
+
+# Background jobs
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'attempts', 'run_after', 'finished_at')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'idempotency_key')
+    readonly_fields = ('last_error',)
+
@@ -1,25 +1,116 @@
+from datetime import date, timedelta
+
 from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404
 from django.shortcuts import render
-from django.db.models import Sum, Count
-from .models import OrderItem, Product,Order
+from django.utils import timezone
+from .exports import FORMATS, ORDER_COLUMNS, PRODUCT_COLUMNS, export_response, order_rows, product_rows
+from .imports import ImportFileError, import_products, load_dataset
+from .models import Order, Product
+from .profiling import profiler_settings, summary
+from .rollups import day_bounds, sales_series, sales_summary
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+MAX_HOURLY_DAYS = 7  # longer ranges are charted per day (7 days = 168 bars)
+
+
+def _date_range(params):
+    """``(start, end)`` dates from ``?start=&end=`` (ISO dates), default last 30 days."""
+    today = timezone.localdate()
+    try:
+        end = date.fromisoformat(params.get('end', ''))
+    except ValueError:
+        end = today
+    try:
+        start = date.fromisoformat(params.get('start', ''))
+    except ValueError:
+        start = end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        start, end = end, start
+    return max(start, end - timedelta(days=MAX_RANGE_DAYS - 1)), end
+
 
 @staff_member_required
 def admin_dashboard(request):
-    # Sales statistics
-    total_orders = Order.objects.count()
-    total_revenue = OrderItem.objects.aggregate(total=Sum('price'))['total'] or 0
-    orders_by_status = Order.objects.values('status').annotate(count=Count('id'))
+    # Sales statistics (read from SalesRollup only, see store/rollups.py)
+    start, end = _date_range(request.GET)
+    period = request.GET.get('period') or ('hour' if (end - start).days < 2 else 'day')
+    if period not in ('hour', 'day') or (end - start).days >= MAX_HOURLY_DAYS:
+        period = 'day'
 
     # Low stock products (less than 5 in stock)
-    low_stock_products = Product.objects.filter(stock__lt=5)
+    low_stock_products = Product.objects.filter(stock__lt=5).order_by('stock', 'name')[:50]
 
     context = {
-        'total_orders': total_orders,
-        'total_revenue': total_revenue,
-        'orders_by_status': orders_by_status,
+        'start': start,
+        'end': end,
+        'period': period,
+        'sales': sales_summary(start, end),
+        'series': sales_series(start, end, period),
         'low_stock_products': low_stock_products,
     }
     return render(request, 'store/admin_dashboard.html', context)
 
 
+def _export_format(request):
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in FORMATS:
+        raise Http404("Unknown export format")
+    return fmt
+
+
+@staff_member_required
+def export_orders(request):
+    # Orders + items for ?start=&end= (same range as the dashboard), optional ?status=
+    start, end = _date_range(request.GET)
+    orders = Order.objects.filter(created_at__gte=day_bounds(start)[0], created_at__lt=day_bounds(end)[1])
+    if request.GET.get('status'):
+        orders = orders.filter(status=request.GET['status'])
+    return export_response("orders", ORDER_COLUMNS, order_rows(orders), _export_format(request))
+
+
+@staff_member_required
+def export_products(request):
+    # Full inventory, ?active=1 for active products only,
+    # ?since=<version> for products changed after that catalog version
+    products = Product.objects.all()
+    if request.GET.get('active'):
+        products = products.filter(is_active=True)
+    if request.GET.get('since', '').isdigit():
+        products = products.filter(version__gt=int(request.GET['since']))
+    return export_response("products", PRODUCT_COLUMNS, product_rows(products), _export_format(request))
+
+
+@staff_member_required
+def import_products_view(request):
+    # Upload a product CSV/XLSX (same columns as the export); previews by default
+    context = {'report': None, 'error': None, 'dry_run': True}
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        context['dry_run'] = bool(request.POST.get('dry_run'))
+        if not upload:
+            context['error'] = "Choose a CSV or Excel file to import."
+        else:
+            fmt = 'xlsx' if upload.name.lower().endswith('.xlsx') else 'csv'
+            try:
+                context['report'] = import_products(
+                    load_dataset(upload.read(), fmt),
+                    dry_run=context['dry_run'],
+                    skip_invalid=bool(request.POST.get('skip_invalid')),
+                )
+            except ImportFileError as e:
+                context['error'] = str(e)
+    return render(request, 'store/product_import.html', context)
 
+
+@staff_member_required
+def profiling_dashboard(request):
+    # Per-view query/latency stats recorded by QueryProfilerMiddleware
+    config = profiler_settings()
+    context = {
+        'enabled': config['ENABLED'],
+        'budgets': config['QUERY_BUDGETS'],
+        'views': summary(),
+    }
+    return render(request, 'store/profiling.html', context)
@@ -0,0 +1,171 @@
+import hashlib
+import json
+
+from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+
+from .facets import get_facets, selected_filters
+from .models import CatalogVersion, Category, Product, Review
+from .pagination import keyset_page
+from .views import catalog_queryset
+
+# -----------------------------
+# Read-only JSON catalog API
+# -----------------------------
+# Rows are read with ``.values()`` (no model instances). Responses carry an
+# ETag and Last-Modified built from ``Product.version`` / ``updated_at``,
+# which every product write maintains. So a poll reads only the page's keys
+# and versions. If the client's copy is current it gets a bodyless 304 and
+# the row query, serialization and transfer are all skipped. Categories and
+# facets are validated by the catalog fingerprint (``CatalogVersion``).
+# Product lists, categories and facets send an ETag only: a row leaving the
+# page (deactivated, filtered out) or a catalog change committing after a
+# later one moves the validator but not the newest modification date.
+
+PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+REVIEWS_PER_PAGE = 20
+
+PRODUCT_FIELDS = (
+    "id", "name", "slug", "product_code", "category__slug", "product_type", "piece_type",
+    "fabric", "color", "sizes", "price", "discount_price", "percentage_price", "stock",
+    "rating_average", "rating_count", "image1", "created_at", "updated_at", "version",
+)
+DETAIL_FIELDS = PRODUCT_FIELDS + (
+    "category__name", "description", "about_product", "disclaimer", "image2",
+    "delivery_nationwide", "delivery_international",
+)
+REVIEW_FIELDS = ("id", "user__username", "title", "body", "rating", "created_at")
+
+_image_storage = Product._meta.get_field("image1").storage
+
+
+def _conditional(request, validator, last_modified, build):
+    """
+    JSON of ``build()``, or a 304 when the client's ``If-None-Match`` /
+    ``If-Modified-Since`` still matches. ``build`` only runs on a miss.
+    """
+    etag = quote_etag(hashlib.md5(validator.encode()).hexdigest())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = JsonResponse(build())
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)  # cache, but revalidate every time
+    return response
+
+
+def _stamps(rows):
+    """Validator and Last-Modified for ``[(id, version, updated_at)]``."""
+    validator = ",".join(f"{pk}:{version}" for pk, version, _ in rows)
+    return validator, max((int(updated_at.timestamp()) for _, _, updated_at in rows), default=None)
+
+
+def _product_json(row):
+    price, discount = row["price"], row["discount_price"]
+    row["category"] = row.pop("category__slug")
+    if "category__name" in row:
+        row["category_name"] = row.pop("category__name")
+    row["final_price"] = discount if discount and discount < price else price
+    for field in ("image1", "image2"):
+        if field in row:
+            row[field] = _image_storage.url(row[field]) if row[field] else None
+    return row
+
+
+def _page_size(params):
+    try:
+        return max(1, min(int(params.get("per_page", PAGE_SIZE)), MAX_PAGE_SIZE))
+    except ValueError:
+        return PAGE_SIZE
+
+
+def _product(slug):
+    """``(id, version, updated_at, rating_count)`` of an active product, or 404."""
+    row = (
+        Product.objects.filter(slug=slug, is_active=True)
+        .values_list("id", "version", "updated_at", "rating_count").first()
+    )
+    if row is None:
+        raise Http404("No such product.")
+    return row
+
+
+@require_GET
+def products(request):
+    """Cursor-paginated products, with the storefront's catalog filters."""
+    queryset, _ = catalog_queryset(request.GET, keyset=True)
+    # keys and versions only; full rows are read after the validator check
+    page = keyset_page(
+        queryset.only("id", "created_at", "version", "updated_at"), request.GET.get("cursor"), _page_size(request.GET),
+    )
+    ids = [product.pk for product in page]
+    stamps, _ = _stamps([(p.pk, p.version, p.updated_at) for p in page])
+
+    def build():
+        rows = {row["id"]: row for row in Product.objects.filter(pk__in=ids).values(*PRODUCT_FIELDS)}
+        return {
+            "products": [_product_json(rows[pk]) for pk in ids if pk in rows],
+            "next": page.next_cursor,
+            "previous": page.previous_cursor,
+        }
+
+    return _conditional(request, f"products|{request.GET.urlencode()}|{stamps}", None, build)
+
+
+@require_GET
+def product(request, slug):
+    product_id, version, updated_at, _ = _product(slug)
+    stamps, last_modified = _stamps([(product_id, version, updated_at)])
+
+    def build():
+        return _product_json(Product.objects.filter(pk=product_id).values(*DETAIL_FIELDS).get())
+
+    return _conditional(request, f"product|{stamps}", last_modified, build)
+
+
+@require_GET
+def reviews(request, slug):
+    """Newest-first reviews of a product, ``?page=N``."""
+    product_id, version, updated_at, rating_count = _product(slug)
+    paginator = Paginator(
+        Review.objects.filter(product_id=product_id).order_by("-created_at", "-pk").values(*REVIEW_FIELDS),
+        REVIEWS_PER_PAGE,
+    )
+    paginator.count = rating_count  # denormalized, see Product.add_ratings
+    number = paginator.get_page(request.GET.get("page")).number
+    # review writes bump the product's version (see signals.py)
+    stamps, last_modified = _stamps([(product_id, version, updated_at)])
+
+    def build():
+        rows = list(paginator.page(number).object_list)
+        for row in rows:
+            row["user"] = row.pop("user__username")
+        return {
+            "reviews": rows,
+            "page": number,
+            "pages": paginator.num_pages,
+            "count": paginator.count,
+        }
+
+    return _conditional(request, f"reviews|{number}|{stamps}", last_modified, build)
+
+
+@require_GET
+def categories(request):
+    def build():
+        return {"categories": list(Category.objects.order_by("name").values("id", "name", "slug"))}
+
+    return _conditional(request, f"categories|{CatalogVersion.fingerprint()}", None, build)
+
+
+@require_GET
+def facets(request):
+    """Sidebar facet counts under the catalog filters in the query string."""
+    filters = selected_filters(request.GET)
+    validator = f"facets|{CatalogVersion.fingerprint()}|{json.dumps(filters, sort_keys=True)}"
+    return _conditional(request, validator, None, lambda: {"facets": get_facets(filters)})
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class StoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'store'
+
+    def ready(self):
+        from . import signals, tasks  # noqa: F401
+        from .profiling import install_query_hook
+
+        # before any connection opens, so every thread's connection is covered
+        install_query_hook()
@@ -0,0 +1,114 @@
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404
+from django.shortcuts import get_object_or_404, render
+
+from . import views
+from .detail import ProductDetail
+from .facets import get_categories, get_discounted_products, get_facets
+from .fragments import attach_versions, fragment_timeout
+from .models import Product
+from .pagination import keyset_page
+
+# -------------------------------
+# Async storefront (ASGI, see myshop/asgi.py)
+# -------------------------------
+# Same templates, context and query counts as the sync views in views.py.
+# These are a compatibility path for ASGI deployments, not a latency win:
+# Django's ORM is synchronous, and every ``sync_to_async`` call runs on the
+# request's one DB thread, so queries of a request never overlap (gathering
+# them would still run them one after another). Each view therefore hops to
+# that thread once for all of its reads and once to render; fewer hops is
+# the only overhead an async view can save. Under load the server can keep
+# more requests in flight, but per-request latency is no better than WSGI.
+
+
+def _offset_page(queryset, number, per_page):
+    """``(paginator, page, objects, is_paginated)`` like ``ListView.paginate_queryset``."""
+    paginator = Paginator(queryset, per_page)
+    if number == "last":
+        number = paginator.num_pages
+    try:
+        number = int(number)
+    except (TypeError, ValueError):
+        raise Http404("Page is not “last”, nor can it be converted to an int.")
+    if number < 1:
+        raise Http404("Invalid page (That page number is less than 1)")
+    try:
+        page = paginator.page(number)
+    except InvalidPage as e:
+        raise Http404(f"Invalid page ({number}): {e}")
+    page.object_list = list(page.object_list)
+    return paginator, page, page.object_list, page.has_other_pages()
+
+
+def _cursor_page(queryset, cursor, per_page):
+    page = keyset_page(queryset, cursor, per_page)
+    return None, page, page.object_list, page.has_other_pages()
+
+
+def _product_list_context(request):
+    cursor_paging = request.GET.get("paging") == "cursor"
+    queryset, filters = views.catalog_queryset(request.GET, keyset=cursor_paging)
+    per_page = views.ProductListView.paginate_by
+
+    if cursor_paging:
+        paginator, page, products, is_paginated = _cursor_page(queryset, request.GET.get("cursor"), per_page)
+    else:
+        paginator, page, products, is_paginated = _offset_page(queryset, request.GET.get("page") or 1, per_page)
+    facets = get_facets(filters)
+    discounted = get_discounted_products()
+
+    # ✅ Version stamps for the cached card fragments (one cache round trip)
+    attach_versions(list(products) + list(discounted))
+
+    return {
+        "paginator": paginator,
+        "page_obj": page,
+        "is_paginated": is_paginated,
+        "object_list": products,
+        "products": products,
+        "categories": get_categories(),
+        "facets": facets,
+        "fabrics": [f["value"] for f in facets["fabric"]],
+        "selected_fabric": request.GET.get("fabric"),
+        "selected_filters": filters,
+        "cursor_paging": cursor_paging,
+        "discounted_products": discounted,
+        "fragment_ttl": fragment_timeout(),
+    }
+
+
+async def product_list(request):
+    context = await sync_to_async(_product_list_context)(request)
+    return await sync_to_async(render)(request, views.ProductListView.template_name, context)
+
+
+def _product_detail_context(request, slug):
+    product = get_object_or_404(Product.objects.select_related("category"), slug=slug, is_active=True)
+    detail = ProductDetail(product, review_page=request.GET.get("review_page", 1))
+    attach_versions([product, *detail.related_products])
+
+    # reviews and the star histogram stay lazy: they only run if the cached
+    # review fragment misses, while the template renders
+    return {
+        "product": product,
+        "detail": detail,
+        "form": views.ReviewForm(),
+        "related_products": detail.related_products,
+        "fragment_ttl": fragment_timeout(),
+    }
+
+
+async def product_detail(request, slug):
+    if request.method == "POST":
+        # posting a review is a write + redirect
+        return await sync_to_async(views.product_detail)(request, slug)
+
+    context = await sync_to_async(_product_detail_context)(request, slug)
+    return await sync_to_async(render)(request, "store/product_detail.html", context)
+
+
+async def view_cart(request):
+    context = await sync_to_async(views.cart_page_context)(request)
+    return await sync_to_async(render)(request, "store/cart.html", context)
@@ -0,0 +1,401 @@
+import asyncio
+import json
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.text import slugify
+
+from .cart import fill_cart
+from .facets import invalidate_facets
+from .recommendations import refresh_neighbors
+from .rollups import rebuild_all as rebuild_sales_rollups
+from .models import Cart, CatalogVersion, Category, Order, OrderItem, OrderLedgerEntry, Product, Review, Wishlist
+
+# -----------------------------
+# Synthetic catalog
+# -----------------------------
+BRANDS = ["Maria B", "Khaadi", "Sana Safinaz", "Gul Ahmed", "Alkaram", "Bonanza", "Nishat", "Sapphire"]
+FABRICS = ["Lawn", "Cotton", "Silk", "Khaddar", "Chiffon", "Linen", "Karandi", "Velvet", "Organza"]
+COLORS = ["Red", "Yellow", "Black", "White", "Mint", "Navy", "Maroon", "Peach", "Teal"]
+STYLES = ["Classic", "Printed", "Embroidered", "Festive", "Luxury", "Everyday", "Signature"]
+CITIES = [("Lahore", "Punjab"), ("Karachi", "Sindh"), ("Islamabad", "ICT"),
+          ("Peshawar", "KPK"), ("Quetta", "Balochistan"), ("Multan", "Punjab")]
+STATUSES = ["Pending", "Confirmed", "Shipped", "Delivered", "Delivered", "Delivered", "Cancelled"]
+
+
+def seed_catalog(products=1000, categories=8, users=200, reviews=3000, orders=1000,
+                 items_per_order=3, wishlist_items=5, batch_size=2000, seed=None, log=None):
+    """
+    Bulk-insert a synthetic catalog. Returns ``{model_name: rows_created}``.
+
+    Everything goes through ``bulk_create``; derived data that model saves
+    and signals would normally maintain (slugs, SKUs, discount percentage,
+    rating aggregates, revenue ledger, recommendations, sales rollups,
+    facets) is filled in or rebuilt here.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    run = uuid.uuid4().hex[:6]
+    created = {}
+
+    with transaction.atomic():
+        # Categories
+        names = [BRANDS[i] if i < len(BRANDS) else f"Brand {i + 1}" for i in range(categories)]
+        slugs = {slugify(name): name for name in names}
+        taken = Category.objects.filter(Q(slug__in=slugs) | Q(name__in=names))
+        taken_pairs = list(taken.values_list("slug", "name"))
+        taken_slugs = {slug for slug, _ in taken_pairs}
+        taken_names = {name for _, name in taken_pairs}
+        new = [Category(name=name, slug=slug) for slug, name in slugs.items()
+               if slug not in taken_slugs and name not in taken_names]
+        Category.objects.bulk_create(new, batch_size=batch_size)
+        category_ids = list(taken.values_list("id", flat=True))
+        created["categories"] = len(new)
+        log(f"categories: {created['categories']}")
+
+        # Products
+        rows = []
+        stamp = CatalogVersion.claim()
+        for i in range(products):
+            name = f"{rng.choice(STYLES)} {rng.choice(COLORS)} {rng.choice(FABRICS)} Suit {run}-{i}"
+            product_type = rng.choice(["stitched", "unstitched"])
+            piece_type = rng.choice(["2-piece", "3-piece"])
+            price = Decimal(rng.randrange(1500, 25000, 100))
+            discount = None
+            percentage = 0
+            if rng.random() < 0.3:
+                discount = (price * Decimal(rng.choice([0.6, 0.7, 0.8, 0.9]))).quantize(Decimal("1"))
+                percentage = round((1 - discount / price) * 100, 2)
+            rows.append(Product(
+                name=name,
+                slug=slugify(name),
+                product_code=f"{product_type[:3].upper()}-{piece_type[0]}P-{uuid.uuid4().hex[:10].upper()}",
+                description=f"{name} in soft {rng.choice(FABRICS).lower()} with matching dupatta.",
+                price=price,
+                discount_price=discount,
+                percentage_price=percentage,
+                product_type=product_type,
+                piece_type=piece_type,
+                category_id=rng.choice(category_ids) if category_ids else None,
+                fabric=rng.choice(FABRICS),
+                color=rng.choice(COLORS),
+                sizes="S,M,L,XL",
+                stock=rng.randint(0, 60),
+                **stamp,
+            ))
+        Product.objects.bulk_create(rows, batch_size=batch_size)
+        product_ids = [p.pk for p in rows]
+        prices = {p.pk: p.price for p in rows}
+        created["products"] = len(product_ids)
+        log(f"products: {created['products']}")
+
+        # Users (one hash reused; hashing per user would dominate the run)
+        password = make_password("benchmark")
+        user_ids = [u.pk for u in User.objects.bulk_create(
+            [User(username=f"shopper-{run}-{i}", email=f"shopper-{run}-{i}@example.com", password=password)
+             for i in range(users)],
+            batch_size=batch_size,
+        )]
+        created["users"] = len(user_ids)
+        log(f"users: {created['users']}")
+
+        # Reviews
+        if user_ids and product_ids:
+            Review.objects.bulk_create(
+                [Review(product_id=rng.choice(product_ids), user_id=rng.choice(user_ids),
+                        title="Lovely fabric", body="Great quality and quick delivery.",
+                        rating=rng.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 5, 6])[0])
+                 for _ in range(reviews)],
+                batch_size=batch_size,
+            )
+            created["reviews"] = reviews
+            log(f"reviews: {reviews}")
+
+        # Orders + items
+        if user_ids and product_ids:
+            order_rows, item_lines = [], []
+            for _ in range(orders):
+                city, province = rng.choice(CITIES)
+                lines = [(rng.choice(product_ids), rng.randint(1, 3)) for _ in range(rng.randint(1, items_per_order))]
+                order_rows.append(Order(
+                    user_id=rng.choice(user_ids), full_name="Benchmark Shopper", phone_number="03000000000",
+                    city=city, province=province, shipping_address="1 Test Street",
+                    status=rng.choice(STATUSES),
+                    total_amount=sum(prices[pid] * qty for pid, qty in lines),
+                ))
+                item_lines.append(lines)
+            order_objs = Order.objects.bulk_create(order_rows, batch_size=batch_size)
+            OrderItem.objects.bulk_create(
+                [OrderItem(order=order, product_id=pid, price=prices[pid], quantity=qty)
+                 for order, lines in zip(order_objs, item_lines) for pid, qty in lines],
+                batch_size=batch_size,
+            )
+            created["orders"] = len(order_objs)
+            created["order_items"] = sum(len(lines) for lines in item_lines)
+            log(f"orders: {created['orders']} ({created['order_items']} items)")
+
+        # Wishlists
+        if user_ids and product_ids and wishlist_items:
+            wishlists = Wishlist.objects.bulk_create([Wishlist(user_id=uid) for uid in user_ids], batch_size=batch_size)
+            through = Wishlist.products.through
+            links = []
+            for wishlist_id in (w.pk for w in wishlists):
+                for product_id in rng.sample(product_ids, min(wishlist_items, len(product_ids))):
+                    links.append(through(wishlist_id=wishlist_id, product_id=product_id))
+            through.objects.bulk_create(links, batch_size=batch_size)
+            created["wishlist_items"] = len(links)
+            log(f"wishlist items: {len(links)}")
+
+        Product.rebuild_ratings()
+        OrderLedgerEntry.rebuild()
+        refresh_neighbors()
+        rebuild_sales_rollups()
+
+    invalidate_facets()
+    return created
+
+
+# -----------------------------
+# Benchmark harness
+# -----------------------------
+def _percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _benchmark_user():
+    user, created = User.objects.get_or_create(username="benchmark", defaults={"is_staff": True})
+    if not user.is_staff:
+        user.is_staff = True
+        user.save(update_fields=["is_staff"])
+    return user
+
+
+def _sample_products(cart_size):
+    """``(products, cart, fabric)``: newest in-stock ``(id, slug)``s, a cart of them and a fabric."""
+    products = list(
+        Product.objects.filter(is_active=True, stock__gte=3)
+        .order_by("-created_at").values_list("id", "slug")[:max(cart_size, 1)]
+    )
+    if not products:
+        raise ValueError("No products to benchmark; run `manage.py seed_catalog` first.")
+    cart = {str(pid): 1 for pid, _ in products[:cart_size]}
+    fabric = Product.objects.exclude(fabric="").values_list("fabric", flat=True).first() or ""
+    return products, cart, fabric
+
+
+def benchmark_scenarios(cart_size=10, user=None):
+    """``[(name, callable(client))]`` driving the real URL names."""
+    products, cart, fabric = _sample_products(cart_size)
+    checkout = {
+        "full_name": "Benchmark Shopper", "phone_number": "03000000000", "city": "Lahore",
+        "province": "Punjab", "shipping_address": "1 Test Street", "payment_method": "COD",
+    }
+
+    user = user or _benchmark_user()
+
+    def with_cart(client):
+        fill_cart(Cart.objects.get_or_create(user=user)[0], cart)
+
+    def checkout_post(client):
+        # Runs the full write path, then rolls it back to keep the data stable.
+        with_cart(client)
+        with transaction.atomic():
+            response = client.post(reverse("place_order"), checkout)
+            transaction.set_rollback(True)
+        return response
+
+    return [
+        ("product_list", lambda c: c.get(reverse("product_list"))),
+        ("product_list?fabric", lambda c: c.get(reverse("product_list"), {"fabric": fabric})),
+        ("product_list?page=5", lambda c: c.get(reverse("product_list"), {"page": 5})),
+        ("product_detail", lambda c: c.get(reverse("product_detail", args=[products[0][1]]))),
+        ("view_cart", lambda c: (with_cart(c), c.get(reverse("view_cart")))[1]),
+        ("place_order", lambda c: (with_cart(c), c.get(reverse("place_order")))[1]),
+        ("place_order:post", checkout_post),
+        ("admin_dashboard", lambda c: c.get(reverse("admin_dashboard"))),
+    ]
+
+
+def run_benchmark(iterations=20, warmup=2, cart_size=10, only=None):
+    """
+    Time every scenario through the test client.
+
+    Returns ``{name: {"p50_ms", "p95_ms", "queries", "status"}}``.
+    """
+    user = _benchmark_user()
+    client = Client(SERVER_NAME="localhost")
+    client.force_login(user)
+    results = {}
+
+    for name, scenario in benchmark_scenarios(cart_size, user):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        for _ in range(warmup):
+            scenario(client)
+        timings, queries, status = [], 0, None
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = scenario(client)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries = max(queries, len(captured))
+            status = response.status_code
+        results[name] = {
+            "p50_ms": round(_percentile(timings, 50), 2),
+            "p95_ms": round(_percentile(timings, 95), 2),
+            "queries": queries,
+            "status": status,
+        }
+    return results
+
+
+def compare(results, baseline, threshold=20.0):
+    """
+    Compare ``results`` with a stored ``baseline``.
+
+    Returns ``(rows, regressions)``; a regression is a p95 more than
+    ``threshold`` percent slower or any increase in query count.
+    """
+    rows, regressions = [], []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            rows.append((name, current, None, None))
+            continue
+        delta = (current["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        rows.append((name, current, before, delta))
+        if delta > threshold or current["queries"] > before["queries"]:
+            regressions.append(name)
+    return rows, regressions
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+# -----------------------------
+# Concurrent load (WSGI vs ASGI)
+# -----------------------------
+# The read-only storefront pages under ``concurrency`` simultaneous clients:
+# threads with the test ``Client`` (the WSGI handler) or asyncio tasks with
+# ``AsyncClient`` (the ASGI handler). Which views answer depends on
+# ``STORE_ASYNC_VIEWS``, which is read when the URLconf loads, so each mode
+# runs in its own process (see ``manage.py benchmark_concurrency``).
+
+def load_targets(cart_size=10, user=None):
+    """``[(name, path, params)]`` for the load test; fills ``user``'s cart for the cart page."""
+    products, cart, fabric = _sample_products(cart_size)
+    user = user or _benchmark_user()
+    fill_cart(Cart.objects.get_or_create(user=user)[0], cart)
+    return [
+        ("product_list", reverse("product_list"), {}),
+        ("product_list?fabric", reverse("product_list"), {"fabric": fabric}),
+        ("product_list?page=5", reverse("product_list"), {"page": 5}),
+        ("product_detail", reverse("product_detail", args=[products[0][1]]), {}),
+        ("view_cart", reverse("view_cart"), {}),
+    ]
+
+
+def _load_wsgi(plan, concurrency, session):
+    def worker(chunk):
+        client = Client(SERVER_NAME="localhost")
+        client.cookies[settings.SESSION_COOKIE_NAME] = session
+        samples = []
+        try:
+            for name, path, params in chunk:
+                start = time.perf_counter()
+                status = client.get(path, params).status_code
+                samples.append((name, (time.perf_counter() - start) * 1000, status))
+        finally:
+            connections.close_all()
+        return samples
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        chunks = pool.map(worker, [plan[i::concurrency] for i in range(concurrency)])
+        return [sample for chunk in chunks for sample in chunk]
+
+
+def _load_asgi(plan, concurrency, session):
+    async def worker(chunk):
+        client = AsyncClient()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session
+        samples = []
+        for name, path, params in chunk:
+            start = time.perf_counter()
+            status = (await client.get(path, params)).status_code
+            samples.append((name, (time.perf_counter() - start) * 1000, status))
+        return samples
+
+    async def main():
+        chunks = await asyncio.gather(*(worker(plan[i::concurrency]) for i in range(concurrency)))
+        return [sample for chunk in chunks for sample in chunk]
+
+    # AsyncClient always sends "Host: testserver"
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+        return asyncio.run(main())
+
+
+def run_load(concurrency=16, requests=400, cart_size=10, only=None):
+    """
+    Send ``requests`` GETs, spread round-robin over ``load_targets``, from
+    ``concurrency`` clients at once. The mode follows ``STORE_ASYNC_VIEWS``.
+
+    Returns ``{"mode", "concurrency", "requests", "seconds", "rps",
+    "scenarios": {name: {"requests", "p50_ms", "p95_ms", "errors"}}}``.
+    """
+    user = _benchmark_user()
+    targets = [
+        target for target in load_targets(cart_size, user)
+        if not only or any(target[0].startswith(prefix) for prefix in only)
+    ]
+    if not targets:
+        raise ValueError("No scenario matches --only.")
+    login = Client(SERVER_NAME="localhost")
+    login.force_login(user)
+    session = login.cookies[settings.SESSION_COOKIE_NAME].value
+
+    mode = "asgi" if settings.STORE_ASYNC_VIEWS else "wsgi"
+    run = _load_asgi if mode == "asgi" else _load_wsgi
+    run(targets, 1, session)  # warm the caches outside the timed run
+    plan = [targets[i % len(targets)] for i in range(requests)]
+
+    start = time.perf_counter()
+    samples = run(plan, concurrency, session)
+    seconds = time.perf_counter() - start
+
+    scenarios = {}
+    for name, _, _ in targets:
+        timings = [ms for n, ms, _ in samples if n == name]
+        scenarios[name] = {
+            "requests": len(timings),
+            "p50_ms": round(_percentile(timings, 50), 2),
+            "p95_ms": round(_percentile(timings, 95), 2),
+            "errors": sum(1 for n, _, status in samples if n == name and status >= 400),
+        }
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "seconds": round(seconds, 3),
+        "rps": round(len(samples) / seconds, 1),
+        "scenarios": scenarios,
+    }
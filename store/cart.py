@@ -0,0 +1,330 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core import signing
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Cart, CartItem
+
+
+# -------------------------------
+# Cart resolution
+# -------------------------------
+class ResolvedCart:
+    """
+    Priced view of a cart. ``removed`` is the number of lines dropped because
+    their product was deleted, not yet reported to the buyer.
+    """
+
+    def __init__(self, items, total, removed=0):
+        self.items = items
+        self.total = total
+        self.removed = removed
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _parse_cart(cart):
+    """Return ``{product_id: quantity}`` with int keys, skipping junk entries."""
+    parsed = {}
+    for key, quantity in cart.items():
+        try:
+            parsed[int(key)] = int(quantity)
+        except (TypeError, ValueError):
+            continue
+    return parsed
+
+
+def _price_lines(lines, removed=0):
+    """``ResolvedCart`` for ``(product, quantity)`` pairs, priced in a single pass."""
+    items = []
+    total = Decimal("0")
+
+    for product, quantity in lines:
+        # ✅ discounted price support
+        price = product.discount_price if product.discount_price else product.price
+        subtotal = price * quantity
+        total += subtotal
+
+        items.append({
+            'product': product,
+            'quantity': quantity,
+            'price': price,
+            'subtotal': subtotal,
+        })
+
+    return ResolvedCart(items, total, removed)
+
+
+# -------------------------------
+# Cart storage
+# -------------------------------
+# Lines live in CartItem rows (one per product), so adding or removing an item
+# is a single-row UPDATE/INSERT/DELETE instead of rewriting the whole session.
+# Anonymous visitors carry only their cart id in a signed cookie; logged-in
+# users have one cart each, merged with the anonymous one on login.
+# ``Cart.item_count`` is kept next to the lines, so the navbar count is one
+# primary-key read (none on the cart page, which counts the lines it loads).
+# It is not cached: with several workers a per-process cache would go stale.
+# Deleting a product cascades to its cart lines; ``Cart.removed_count`` keeps
+# how many a cart lost that way until the cart page has told the buyer.
+
+CART_COOKIE = "cart"
+CART_COOKIE_AGE = 60 * 60 * 24 * 30
+_SALT = "store.cart"
+_USER_KEY = "store:cart:user:"
+
+
+def sign_cart_id(cart_id):
+    """Cookie value for ``cart_id`` (what ``set_signed_cookie`` would write)."""
+    return signing.get_cookie_signer(salt=CART_COOKIE + _SALT).sign(str(cart_id))
+
+
+class CartStore:
+    """The current visitor's cart (``request.cart``, see ``CartMiddleware``)."""
+
+    def __init__(self, request):
+        self.request = request
+        self.cookie = None  # cart id to (re)issue, or "" to delete the cookie
+        self._cart_id = None
+        self._count = None  # item_count, read at most once per request
+
+    # --- identity ---
+    def _cookie_cart_id(self):
+        try:
+            return int(self.request.get_signed_cookie(CART_COOKIE, salt=_SALT, max_age=CART_COOKIE_AGE))
+        except (KeyError, ValueError, signing.BadSignature):
+            return None
+
+    def _user(self):
+        user = getattr(self.request, "user", None)
+        return user if user is not None and user.is_authenticated else None
+
+    def cart_id(self, create=False):
+        if self._cart_id is None:
+            user = self._user()
+            if user is None:
+                self._cart_id = self._cookie_cart_id()
+            else:
+                self._cart_id = cache.get(f"{_USER_KEY}{user.pk}")
+                if self._cart_id is None:
+                    self._cart_id = Cart.objects.filter(user=user).values_list("pk", flat=True).first()
+                    if self._cart_id is not None:
+                        cache.set(f"{_USER_KEY}{user.pk}", self._cart_id, None)
+        if self._cart_id is None and create:
+            self._new_cart()
+        return self._cart_id
+
+    def _new_cart(self):
+        user = self._user()
+        if user is None:
+            self._cart_id = Cart.objects.create().pk
+            self.cookie = self._cart_id
+        else:
+            self._cart_id = Cart.objects.get_or_create(user=user)[0].pk
+            cache.set(f"{_USER_KEY}{user.pk}", self._cart_id, None)
+
+    def _forget(self):
+        # The cart row is gone (purged or merged): start over on next write
+        user = self._user()
+        if user is not None:
+            cache.delete(f"{_USER_KEY}{user.pk}")
+        elif self._cart_id is not None:
+            self.cookie = ""
+        self._cart_id = None
+        self._count = None
+
+    # --- reads ---
+    @property
+    def count(self):
+        """Number of lines, for the navbar."""
+        cart_id = self.cart_id()
+        if cart_id is None:
+            return 0
+        if self._count is None:
+            self._count = Cart.objects.filter(pk=cart_id).values_list("item_count", flat=True).first()
+            if self._count is None:
+                self._forget()
+                return 0
+        return self._count
+
+    def lines(self):
+        """``{product_id: quantity}``."""
+        cart_id = self.cart_id()
+        if cart_id is None:
+            return {}
+        return dict(CartItem.objects.filter(cart_id=cart_id).values_list("product_id", "quantity"))
+
+    def resolve(self):
+        """
+        Priced ``ResolvedCart`` from one query (lines joined to their products
+        and the cart row); an empty cart costs a second primary-key read.
+        """
+        cart_id = self.cart_id()
+        if cart_id is None:
+            return ResolvedCart([], Decimal("0"))
+        rows = list(CartItem.objects.filter(cart_id=cart_id).select_related("product", "cart").order_by("pk"))
+        if rows:
+            removed = rows[0].cart.removed_count
+        else:
+            removed = Cart.objects.filter(pk=cart_id).values_list("removed_count", flat=True).first()
+            if removed is None:
+                self._forget()
+                return ResolvedCart([], Decimal("0"))
+        self._count = len(rows)  # the navbar needs no query
+        return _price_lines(((row.product, row.quantity) for row in rows), removed)
+
+    def acknowledge_removed(self, count):
+        """The buyer has been told about ``count`` lines of deleted products."""
+        cart_id = self.cart_id()
+        if cart_id is not None and count:
+            Cart.objects.filter(pk=cart_id, removed_count__gte=count).update(removed_count=F("removed_count") - count)
+
+    def __bool__(self):
+        return bool(self.count)
+
+    # --- writes ---
+    def _changed(self, cart_id, lines_delta):
+        updates = {"updated_at": timezone.now()}
+        if lines_delta:
+            updates["item_count"] = F("item_count") + lines_delta
+        Cart.objects.filter(pk=cart_id).update(**updates)
+        self._count = None
+
+    def add(self, product_id, quantity=1):
+        """Add ``quantity`` of a product (one UPDATE, or an INSERT for a new line)."""
+        for _ in range(2):
+            cart_id = self.cart_id(create=True)
+            if CartItem.objects.filter(cart_id=cart_id, product_id=product_id).update(
+                quantity=F("quantity") + quantity
+            ):
+                self._changed(cart_id, 0)
+                return
+            try:
+                with transaction.atomic():
+                    CartItem.objects.create(cart_id=cart_id, product_id=product_id, quantity=quantity)
+            except IntegrityError:
+                # Concurrent add of the same line (retry as an UPDATE), or the
+                # cart row no longer exists (start a new cart).
+                if not Cart.objects.filter(pk=cart_id).exists():
+                    self._forget()
+                continue
+            self._changed(cart_id, 1)
+            return
+
+    def remove(self, *product_ids):
+        cart_id = self.cart_id()
+        if cart_id is None or not product_ids:
+            return 0
+        removed, _ = CartItem.objects.filter(cart_id=cart_id, product_id__in=product_ids).delete()
+        if removed:
+            self._changed(cart_id, -removed)
+        return removed
+
+    def clear(self):
+        cart_id = self.cart_id()
+        if cart_id is None:
+            return
+        CartItem.objects.filter(cart_id=cart_id).delete()
+        Cart.objects.filter(pk=cart_id).update(item_count=0, updated_at=timezone.now())
+        self._count = 0
+
+    def merge_anonymous(self):
+        """
+        Fold the cookie cart into the (now logged-in) user's cart, adding
+        quantities for products in both, then drop the anonymous cart.
+        """
+        anonymous_id = self._cookie_cart_id()
+        if anonymous_id is None or self._user() is None:
+            return
+        self.cookie = ""
+        self._cart_id = None
+        lines = dict(
+            CartItem.objects.filter(cart_id=anonymous_id, cart__user__isnull=True).values_list("product_id", "quantity")
+        )
+        if not lines:
+            Cart.objects.filter(pk=anonymous_id, user__isnull=True).delete()
+            return
+
+        with transaction.atomic():
+            cart_id = self.cart_id(create=True)
+            for product_id, quantity in CartItem.objects.filter(cart_id=cart_id, product_id__in=lines).values_list(
+                "product_id", "quantity"
+            ):
+                lines[product_id] += quantity
+            CartItem.objects.bulk_create(
+                [CartItem(cart_id=cart_id, product_id=pid, quantity=qty) for pid, qty in lines.items()],
+                update_conflicts=True, unique_fields=["cart", "product"], update_fields=["quantity"],
+            )
+            Cart.objects.filter(pk=anonymous_id, user__isnull=True).delete()
+            Cart.objects.filter(pk=cart_id).update(
+                item_count=CartItem.objects.filter(cart_id=cart_id).count(), updated_at=timezone.now()
+            )
+        self._count = None
+
+
+class CartMiddleware:
+    """Attach ``request.cart`` and keep the anonymous cart cookie in sync."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request.cart = CartStore(request)
+        return self._set_cookie(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        request.cart = CartStore(request)
+        return self._set_cookie(request, await self.get_response(request))
+
+    def _set_cookie(self, request, response):
+        cookie = request.cart.cookie
+        if cookie == "":
+            response.delete_cookie(CART_COOKIE)
+        elif cookie is not None:
+            response.set_signed_cookie(
+                CART_COOKIE, str(cookie), salt=_SALT, max_age=CART_COOKIE_AGE, httponly=True, samesite="Lax",
+            )
+        return response
+
+
+def fill_cart(cart, lines):
+    """Replace the lines of ``cart`` with ``{product_id: quantity}`` (tests, benchmarks)."""
+    lines = _parse_cart(lines)
+    CartItem.objects.filter(cart=cart).delete()
+    CartItem.objects.bulk_create([CartItem(cart=cart, product_id=pid, quantity=qty) for pid, qty in lines.items()])
+    Cart.objects.filter(pk=cart.pk).update(item_count=len(lines), updated_at=timezone.now())
+    return cart
+
+
+def drop_product_from_carts(product_id):
+    """
+    Fix the line counts of carts holding a product that's being deleted (its
+    lines cascade) and count the loss for the cart page to report.
+    """
+    Cart.objects.filter(items__product_id=product_id).update(
+        item_count=F("item_count") - 1, removed_count=F("removed_count") + 1,
+    )
+
+
+def purge_abandoned_carts(days=30):
+    """Delete anonymous carts untouched for ``days``; returns how many."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, by_model = Cart.objects.filter(user__isnull=True, updated_at__lt=cutoff).delete()
+    return by_model.get(Cart._meta.label, 0)
@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models import F
+
+from .fragments import bump_products
+from .models import CatalogVersion, Order, OrderItem, Product
+
+
+class OutOfStockError(Exception):
+    """Raised when a checkout would drive a product's stock below zero."""
+
+    def __init__(self, product):
+        self.product = product
+        super().__init__(f"Not enough stock for {product.name}.")
+
+
+# -------------------------------
+# Checkout pipeline
+# -------------------------------
+def reserve_stock(cart_items):
+    """
+    Decrement stock for every cart line with a conditional ``F()`` update.
+
+    Each UPDATE only matches while ``stock >= quantity``, so the database row
+    lock taken by the UPDATE is the reservation: two buyers racing for the last
+    unit cannot both succeed. Lines are processed in product-id order so that
+    concurrent checkouts acquire row locks in the same order. The same
+    UPDATEs stamp the products with one new catalog version.
+    """
+    stamp = CatalogVersion.claim()
+    for item in sorted(cart_items, key=lambda i: i['product'].pk):
+        product = item['product']
+        updated = Product.objects.filter(
+            pk=product.pk, stock__gte=item['quantity']
+        ).update(stock=F('stock') - item['quantity'], **stamp)
+        if not updated:
+            raise OutOfStockError(product)
+    bump_products(item['product'].pk for item in cart_items)
+
+
+@transaction.atomic
+def create_order(user, cart, details):
+    """
+    Create an order for a resolved cart inside a single transaction.
+
+    ``details`` is the cleaned data of ``CheckoutForm``. Stock is reserved
+    first, then the order and all of its items are inserted (items with one
+    ``bulk_create``). Any ``OutOfStockError`` rolls the whole checkout back.
+    """
+    reserve_stock(cart.items)
+
+    order = Order.objects.create(
+        user=user,
+        full_name=details['full_name'],
+        phone_number=details['phone_number'],
+        city=details['city'],
+        province=details['province'],
+        shipping_address=details['shipping_address'],
+        payment_method=details['payment_method'],
+        status="Pending",
+        total_amount=cart.total,
+    )
+
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            product=item['product'],
+            price=item['price'],
+            quantity=item['quantity'],
+        )
+        for item in cart.items
+    ])
+    return order
@@ -0,0 +1,77 @@
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
+
+from .models import Product
+from .recommendations import recommended_products
+
+REVIEWS_PER_PAGE = 10
+RELATED_LIMIT = 4
+
+
+# -------------------------------
+# Product detail loading
+# -------------------------------
+class ProductDetail:
+    """
+    Everything the product page renders, in a bounded number of queries:
+
+    1. product + category (``select_related``)
+    2. related products: stored neighbours, then the same category (newest
+       first) only if there are fewer than ``related_limit`` of them
+    3. one page of reviews with their users (``select_related``)
+    4. star histogram (one aggregate)
+
+    3 and 4 are lazy, so they cost nothing when the page's review fragment is
+    served from the cache. The review count comes from ``rating_count``, so
+    paginating never runs a ``COUNT(*)``.
+    """
+
+    def __init__(self, product, review_page=1, reviews_per_page=REVIEWS_PER_PAGE, related_limit=RELATED_LIMIT):
+        self.product = product
+        self.review_page_number = review_page
+        self.reviews_per_page = reviews_per_page
+        self.related_limit = related_limit
+
+    @cached_property
+    def related_products(self):
+        """"Customers also bought" neighbours, topped up from the same category."""
+        product = self.product
+        related = recommended_products(product, self.related_limit)
+        missing = self.related_limit - len(related)
+        if missing and product.category_id is not None:
+            related += (
+                Product.objects.filter(category_id=product.category_id, is_active=True)
+                .exclude(pk__in=[product.pk, *(p.pk for p in related)])
+                .order_by("-created_at", "-pk")[:missing]
+            )
+        return related
+
+    @cached_property
+    def reviews(self):
+        """The requested page of reviews (a ``Page``), newest first."""
+        queryset = self.product.reviews.select_related("user").order_by("-created_at", "-pk")
+        paginator = Paginator(queryset, self.reviews_per_page)
+        paginator.count = self.product.rating_count  # denormalized, see Product.add_ratings
+        return paginator.get_page(self.review_page_number)
+
+    @cached_property
+    def rating_summary(self):
+        """``{"average", "count", "stars": [(5, n, pct), ..., (1, n, pct)]}``."""
+        product = self.product
+        counts = product.reviews.aggregate(
+            **{f"stars_{n}": Count("pk", filter=Q(rating=n)) for n in range(1, 6)}
+        ) if product.rating_count else {}
+        total = product.rating_count
+        stars = []
+        for n in range(5, 0, -1):
+            count = counts.get(f"stars_{n}", 0)
+            stars.append((n, count, round(count * 100 / total) if total else 0))
+        return {"average": product.rating_average, "count": total, "stars": stars}
+
+
+def load_product_detail(slug, review_page=1, **options):
+    """Fetch an active product by slug (404 otherwise) and wrap it in a ``ProductDetail``."""
+    product = get_object_or_404(Product.objects.select_related("category"), slug=slug, is_active=True)
+    return ProductDetail(product, review_page, **options)
@@ -0,0 +1,144 @@
+import csv
+import tempfile
+from datetime import datetime
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Order, Product
+
+# -----------------------------
+# Exports
+# -----------------------------
+# Rows come from ``values_list(...).iterator(chunk_size=...)`` (a server-side
+# cursor on PostgreSQL), so memory use doesn't grow with the export size.
+# CSV is streamed as it's generated. XLSX is buffered to disk, not streamed:
+# a zip archive can't be sent before it's complete, so openpyxl's write-only
+# workbook fills a temp file (spilled to disk after ``XLSX_SPOOL_SIZE``) and
+# the client waits for the whole build before the file is sent in blocks.
+#
+# Text that a spreadsheet would evaluate as a formula (customer names and
+# addresses, product names) is prefixed with ``'`` so it opens as plain text.
+
+CHUNK_SIZE = 2000
+XLSX_SPOOL_SIZE = 256 * 1024  # bytes kept in memory before the temp file moves to disk
+FORMATS = ("csv", "xlsx")
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+ORDER_COLUMNS = [
+    ("Order ID", "id"),
+    ("Placed at", "created_at"),
+    ("Status", "status"),
+    ("Customer", "full_name"),
+    ("Username", "user__username"),
+    ("Phone", "phone_number"),
+    ("City", "city"),
+    ("Province", "province"),
+    ("Address", "shipping_address"),
+    ("Payment", "payment_method"),
+    ("Order total", "total_amount"),
+    ("Product ID", "items__product_id"),
+    ("Product", "items__product__name"),
+    ("Product code", "items__product__product_code"),
+    ("Unit price", "items__price"),
+    ("Quantity", "items__quantity"),
+]
+
+PRODUCT_COLUMNS = [
+    ("Product ID", "id"),
+    ("Name", "name"),
+    ("Code", "product_code"),
+    ("Slug", "slug"),
+    ("Category", "category__name"),
+    ("Type", "product_type"),
+    ("Pieces", "piece_type"),
+    ("Fabric", "fabric"),
+    ("Color", "color"),
+    ("Sizes", "sizes"),
+    ("Price", "price"),
+    ("Discount price", "discount_price"),
+    ("Discount %", "percentage_price"),
+    ("Stock", "stock"),
+    ("Active", "is_active"),
+    ("Rating", "rating_average"),
+    ("Reviews", "rating_count"),
+    ("Created at", "created_at"),
+    ("Updated at", "updated_at"),
+    ("Version", "version"),
+]
+
+
+def _cell(value):
+    # Spreadsheets don't do timezones: export local wall-clock time.
+    if isinstance(value, datetime):
+        return timezone.localtime(value).replace(tzinfo=None, microsecond=0)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def unescape_cell(value):
+    """Undo ``_cell``'s formula escaping (for re-importing an export)."""
+    if isinstance(value, str) and value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def _rows(queryset, columns, ordering):
+    fields = [field for _, field in columns]
+    for row in queryset.order_by(*ordering).values_list(*fields).iterator(chunk_size=CHUNK_SIZE):
+        yield [_cell(value) for value in row]
+
+
+def order_rows(queryset=None):
+    """One row per order item (orders without items get one row with blank item columns)."""
+    queryset = Order.objects.all() if queryset is None else queryset
+    return _rows(queryset, ORDER_COLUMNS, ["created_at", "id", "items__id"])
+
+
+def product_rows(queryset=None):
+    queryset = Product.objects.all() if queryset is None else queryset
+    return _rows(queryset, PRODUCT_COLUMNS, ["id"])
+
+
+class _Echo:
+    """File-like object whose ``write`` just hands the line back to ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow([header for header, _ in columns])  # BOM so Excel reads UTF-8
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(columns, rows, title="Export"):
+    """
+    Write ``rows`` to a temp file with a write-only workbook; returns the open
+    file at position 0. The whole workbook is built before anything is sent.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append([header for header, _ in columns])
+    for row in rows:
+        sheet.append(row)
+
+    output = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE)
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def export_response(name, columns, rows, fmt="csv"):
+    """Download of ``rows`` as ``<name>-<date>.csv`` (streamed) or ``.xlsx`` (buffered to disk)."""
+    filename = f"{name}-{timezone.localdate():%Y%m%d}.{fmt}"
+    if fmt == "xlsx":
+        return FileResponse(write_xlsx(columns, rows, title=name.title()), as_attachment=True, filename=filename)
+    response = StreamingHttpResponse(iter_csv(columns, rows), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
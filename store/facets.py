@@ -0,0 +1,188 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Case, Count, F, Q, When
+from django.db.models.functions import Lower
+
+from .models import Category, Product
+from .search import filter_by_search
+
+
+# -----------------------------
+# Catalog filters
+# -----------------------------
+# (key, label, min, max) — prices are the effective (discounted) price.
+PRICE_BANDS = [
+    ("under-2000", "Under Rs. 2,000", None, 2000),
+    ("2000-5000", "Rs. 2,000 – 5,000", 2000, 5000),
+    ("5000-10000", "Rs. 5,000 – 10,000", 5000, 10000),
+    ("over-10000", "Over Rs. 10,000", 10000, None),
+]
+
+FILTER_PARAMS = ("q", "category", "fabric", "price", "type", "min_rating")
+
+FACET_CACHE_TIMEOUT = 60 * 15
+_VERSION_KEY = "store:facets:version"
+
+
+def selected_filters(params):
+    """Pick the catalog filters out of ``request.GET`` (empty values dropped)."""
+    return {key: params[key].strip() for key in FILTER_PARAMS if params.get(key, "").strip()}
+
+
+def _effective_price():
+    return Case(
+        When(discount_price__isnull=False, discount_price__lt=F("price"), then=F("discount_price")),
+        default=F("price"),
+    )
+
+
+def _band_q(band):
+    _, _, low, high = band
+    q = Q()
+    if low is not None:
+        q &= Q(effective_price__gte=low)
+    if high is not None:
+        q &= Q(effective_price__lt=high)
+    return q
+
+
+def filter_products(queryset, filters, skip=None):
+    """
+    Apply catalog ``filters`` (see ``selected_filters``) to ``queryset``.
+
+    ``skip`` names one filter to leave out, which is how each facet's counts
+    ignore its own selection while respecting all the others.
+    """
+    filters = {k: v for k, v in filters.items() if k != skip and k != "q"}
+
+    if filters.get("category"):
+        queryset = queryset.filter(category__slug=filters["category"])
+    if filters.get("fabric"):
+        # LOWER(fabric) = ... (not iexact) so store_prod_fabric_lower_idx applies
+        queryset = queryset.alias(fabric_lower=Lower("fabric")).filter(fabric_lower=filters["fabric"].lower())
+    if filters.get("type"):
+        queryset = queryset.filter(product_type=filters["type"])
+    if filters.get("min_rating"):
+        try:
+            queryset = queryset.filter(rating_average__gte=float(filters["min_rating"]))
+        except ValueError:
+            pass
+    if filters.get("price"):
+        band = next((b for b in PRICE_BANDS if b[0] == filters["price"]), None)
+        if band:
+            queryset = queryset.annotate(effective_price=_effective_price()).filter(_band_q(band))
+
+    return queryset
+
+
+# -----------------------------
+# Facet counts (cached)
+# -----------------------------
+def facet_version():
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, 1, None)
+        version = cache.get(_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_facets():
+    """Make every cached facet entry stale (called on Product/Category changes)."""
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, 1, None)
+
+
+def _cache_key(name, filters=None):
+    digest = hashlib.md5(json.dumps(filters or {}, sort_keys=True).encode()).hexdigest()
+    return f"store:facets:{facet_version()}:{name}:{digest}"
+
+
+def _cached(name, filters, compute):
+    key = _cache_key(name, filters)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, FACET_CACHE_TIMEOUT)
+    return value
+
+
+def _base(filters, skip):
+    queryset = Product.objects.filter(is_active=True)
+    if filters.get("q"):
+        queryset = filter_by_search(queryset, filters["q"])
+    return filter_products(queryset, filters, skip=skip).order_by()
+
+
+def _fabric_facet(filters):
+    counts = {}
+    rows = _base(filters, "fabric").exclude(fabric__exact="").values("fabric").annotate(n=Count("id"))
+    for row in rows:
+        # Normalize (remove spaces, lower, then capitalize)
+        label = row["fabric"].strip().title()
+        if label:
+            counts[label] = counts.get(label, 0) + row["n"]
+    return [{"value": label, "label": label, "count": counts[label]} for label in sorted(counts)]
+
+
+def _category_facet(filters):
+    rows = (
+        _base(filters, "category").filter(category__isnull=False)
+        .values("category__slug", "category__name").annotate(n=Count("id"))
+        .order_by("category__name")
+    )
+    return [{"value": r["category__slug"], "label": r["category__name"], "count": r["n"]} for r in rows]
+
+
+def _price_facet(filters):
+    counts = _base(filters, "price").annotate(effective_price=_effective_price()).aggregate(
+        **{f"band_{i}": Count("id", filter=_band_q(band)) for i, band in enumerate(PRICE_BANDS)}
+    )
+    return [
+        {"value": key, "label": label, "count": counts[f"band_{i}"]}
+        for i, (key, label, _, _) in enumerate(PRICE_BANDS)
+    ]
+
+
+def _type_facet(filters):
+    counts = dict(_base(filters, "type").values_list("product_type").annotate(n=Count("id")))
+    return [
+        {"value": value, "label": label, "count": counts.get(value, 0)}
+        for value, label in Product.PRODUCT_TYPE_CHOICES
+    ]
+
+
+def get_facets(filters):
+    """
+    Sidebar facets for the catalog with counts under the current ``filters``.
+
+    Returns ``{"fabric": [...], "category": [...], "price": [...], "type": [...]}``
+    where each entry is ``{"value", "label", "count"}``.
+    """
+    return _cached("facets", filters, lambda: {
+        "fabric": _fabric_facet(filters),
+        "category": _category_facet(filters),
+        "price": _price_facet(filters),
+        "type": _type_facet(filters),
+    })
+
+
+def get_categories():
+    return _cached("categories", None, lambda: list(Category.objects.all()))
+
+
+def get_discounted_products(limit=10):
+    """
+    Top discounted in-stock products. Only the ids are cached; stock is
+    re-checked on every call so sold-out items drop out immediately.
+    """
+    ids = _cached("discounted", {"limit": limit}, lambda: list(
+        Product.objects.filter(is_active=True, stock__gt=0, percentage_price__gt=0)
+        .order_by("-percentage_price").values_list("id", flat=True)[:limit]
+    ))
+    return list(
+        Product.objects.filter(pk__in=ids, is_active=True, stock__gt=0).order_by("-percentage_price")
+    )
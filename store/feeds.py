@@ -0,0 +1,352 @@
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import timezone as dt_timezone
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, Sum
+from django.db.models.functions import Floor
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import CatalogVersion, Product
+
+# -----------------------------
+# Sitemap & product feeds
+# -----------------------------
+# Products are split into shards by id range (``SHARD_SIZE`` ids per shard).
+# Each shard is written as three gzipped files under MEDIA_ROOT/feeds/:
+#
+#   sitemap-products-NNNN.xml.gz    sitemaps.org urlset
+#   google-products-NNNN.xml.gz     Google Merchant RSS 2.0 feed
+#   facebook-products-NNNN.csv.gz   Facebook catalog CSV
+#
+# Rows are streamed from ``values_list(...).iterator()`` straight into the
+# gzip streams. ``manifest.json`` records every shard's (row count, sum of
+# Product.version) and the catalog fingerprint of the last run, so a run with
+# no catalog change costs one query. Otherwise only shards whose signature
+# moved are rewritten: a changed product moves the sum (even when its
+# version commits after a later one) and a deleted one lowers the count.
+# ``sitemap.xml`` indexes the sitemap parts.
+# A lock file in the feed directory keeps concurrent runs (the job and the
+# command) from interleaving writes to the same files and manifest.
+
+DEFAULTS = {
+    "BASE_URL": "http://localhost:8000",
+    "CURRENCY": "PKR",
+    "SHARD_SIZE": 10000,  # sitemaps allow 50,000 URLs per file
+}
+FEED_DIR = "feeds"
+MANIFEST = "manifest.json"
+LOCK_FILE = ".build.lock"
+LOCK_TIMEOUT = 10 * 60  # refreshed after every shard; older means the run died
+CHUNK_SIZE = 2000
+
+FIELDS = (
+    "id", "name", "slug", "product_code", "description", "price", "discount_price", "stock",
+    "image1", "image2", "category__name", "updated_at",
+)
+FACEBOOK_COLUMNS = [
+    "id", "title", "description", "availability", "condition", "price", "sale_price", "link",
+    "image_link", "additional_image_link", "brand", "product_type", "quantity_to_sell_on_facebook",
+]
+_FILES = {
+    "sitemap": "sitemap-products-{:04d}.xml.gz",
+    "google": "google-products-{:04d}.xml.gz",
+    "facebook": "facebook-products-{:04d}.csv.gz",
+}
+
+
+class FeedBuildRunning(Exception):
+    """Another ``build_feeds`` run holds the feed directory lock."""
+
+
+def feed_settings():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "STORE_FEEDS", {}))
+    config["BASE_URL"] = config["BASE_URL"].rstrip("/")
+    return config
+
+
+def feed_dir():
+    return Path(settings.MEDIA_ROOT) / FEED_DIR
+
+
+def _absolute(base_url, path):
+    return path if path.startswith(("http://", "https://")) else base_url + path
+
+
+def _w3c(moment):
+    return moment.astimezone(dt_timezone.utc).isoformat(timespec="seconds")
+
+
+class _GzipPart:
+    """A gzipped text file written under a temp name and moved into place on ``commit``."""
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        self._raw = open(self._tmp, "wb")
+        # mtime=0: unchanged content gives byte-identical files
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb", mtime=0)
+        self.text = io.TextIOWrapper(self._gzip, encoding="utf-8", newline="")
+
+    def commit(self):
+        self.text.close()
+        self._raw.close()
+        os.replace(self._tmp, self.path)
+
+    def discard(self):
+        if not self._raw.closed:
+            self._raw.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+def _items(rows, config):
+    """Feed-ready dicts for ``values_list(*FIELDS)`` rows."""
+    storage = Product._meta.get_field("image1").storage
+    base_url, currency = config["BASE_URL"], config["CURRENCY"]
+    for pk, name, slug, code, description, price, discount, stock, image1, image2, category, updated_at in rows:
+        sale = discount if discount and discount < price else None
+        yield {
+            "id": code or str(pk),
+            "title": name,
+            # Both feeds require a description
+            "description": " ".join((description or name).split()),
+            "in_stock": stock > 0,
+            "stock": stock,
+            "price": f"{price} {currency}",
+            "sale_price": f"{sale} {currency}" if sale else "",
+            "link": base_url + reverse("product_detail", args=[slug]),
+            "image": _absolute(base_url, storage.url(image1)) if image1 else "",
+            "extra_image": _absolute(base_url, storage.url(image2)) if image2 else "",
+            # Categories are the fashion houses (Khaadi, Gul Ahmed, ...)
+            "brand": category or "",
+            "updated_at": updated_at,
+        }
+
+
+def _sitemap_entry(item):
+    return f"<url><loc>{escape(item['link'])}</loc><lastmod>{_w3c(item['updated_at'])}</lastmod></url>\n"
+
+
+def _google_entry(item):
+    tags = [
+        ("g:id", item["id"]),
+        ("g:title", item["title"][:150]),
+        ("g:description", item["description"][:5000]),
+        ("g:link", item["link"]),
+        ("g:image_link", item["image"]),
+        ("g:additional_image_link", item["extra_image"]),
+        ("g:availability", "in_stock" if item["in_stock"] else "out_of_stock"),
+        ("g:condition", "new"),
+        ("g:price", item["price"]),
+        ("g:sale_price", item["sale_price"]),
+        ("g:brand", item["brand"]),
+        ("g:product_type", item["brand"]),
+    ]
+    body = "".join(f"<{tag}>{escape(value)}</{tag}>" for tag, value in tags if value)
+    return f"<item>{body}</item>\n"
+
+
+def _facebook_row(item):
+    return [
+        item["id"], item["title"], item["description"],
+        "in stock" if item["in_stock"] else "out of stock", "new",
+        item["price"], item["sale_price"], item["link"], item["image"], item["extra_image"],
+        item["brand"], item["brand"], item["stock"],
+    ]
+
+
+def write_shard(shard, config=None):
+    """
+    (Re)write the three files of ``shard`` from its active products.
+    Returns ``(products written, latest updated_at)``; with no products the
+    shard's files are removed instead.
+    """
+    config = config or feed_settings()
+    size = config["SHARD_SIZE"]
+    rows = (
+        Product.objects.filter(id__gte=shard * size, id__lt=(shard + 1) * size, is_active=True)
+        .order_by("id").values_list(*FIELDS).iterator(chunk_size=CHUNK_SIZE)
+    )
+    directory = feed_dir()
+    parts = {kind: _GzipPart(directory / pattern.format(shard)) for kind, pattern in _FILES.items()}
+    count, lastmod = 0, None
+    try:
+        parts["sitemap"].text.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        parts["google"].text.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0"><channel>\n'
+            f"<title>Products</title><link>{escape(config['BASE_URL'])}/</link><description>Product feed</description>\n"
+        )
+        facebook = csv.writer(parts["facebook"].text)
+        facebook.writerow(FACEBOOK_COLUMNS)
+
+        for item in _items(rows, config):
+            parts["sitemap"].text.write(_sitemap_entry(item))
+            parts["google"].text.write(_google_entry(item))
+            facebook.writerow(_facebook_row(item))
+            count += 1
+            lastmod = max(lastmod, item["updated_at"]) if lastmod else item["updated_at"]
+
+        parts["sitemap"].text.write("</urlset>\n")
+        parts["google"].text.write("</channel></rss>\n")
+    except BaseException:
+        for part in parts.values():
+            part.discard()
+        raise
+
+    for part in parts.values():
+        if count:
+            part.commit()
+        else:
+            part.discard()
+    if not count:
+        remove_shard(shard)
+    return count, lastmod
+
+
+def remove_shard(shard):
+    for pattern in _FILES.values():
+        (feed_dir() / pattern.format(shard)).unlink(missing_ok=True)
+
+
+def shard_signatures(shard_size):
+    """``{shard: [rows, version sum]}`` over every product, active or not, in one GROUP BY."""
+    shards = (
+        Product.objects.order_by()
+        .annotate(shard=Floor(F("id") / shard_size, output_field=IntegerField()))
+        .values("shard")
+        .annotate(rows=Count("id"), version=Sum("version"))
+    )
+    return {str(row["shard"]): [row["rows"], row["version"]] for row in shards}
+
+
+def load_manifest():
+    try:
+        with open(feed_dir() / MANIFEST, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def _build_lock():
+    """
+    Hold ``LOCK_FILE`` (created with O_EXCL, so it works on every OS) for a
+    build; yields its path for ``os.utime`` refreshes. Raises
+    ``FeedBuildRunning`` while another run holds a fresh lock.
+    """
+    path = feed_dir() / LOCK_FILE
+    for attempt in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                age = time.time() - path.stat().st_mtime
+            except FileNotFoundError:
+                continue  # released in the meantime
+            if attempt or age < LOCK_TIMEOUT:
+                raise FeedBuildRunning(f"{path} is held by another build")
+            path.unlink(missing_ok=True)  # left behind by a crashed run
+    else:
+        raise FeedBuildRunning(f"{path} is held by another build")
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield path
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def _replace_text(name, text):
+    tmp = feed_dir() / f"{name}.{os.getpid()}.tmp"
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, feed_dir() / name)
+
+
+def _write_index(manifest):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+    ]
+    for shard, info in sorted(manifest["shards"].items(), key=lambda kv: int(kv[0])):
+        if info["products"]:
+            loc = escape(f"{manifest['base_url']}{reverse('sitemap_part', args=[f'{int(shard):04d}'])}")
+            lines.append(f"<sitemap><loc>{loc}</loc><lastmod>{info['lastmod']}</lastmod></sitemap>\n")
+    lines.append("</sitemapindex>\n")
+    _replace_text("sitemap.xml", "".join(lines))
+    _replace_text(MANIFEST, json.dumps(manifest, indent=1, sort_keys=True))
+
+
+def build_feeds(full=False, log=None):
+    """
+    Bring the sitemap and feeds up to date, rewriting only shards whose
+    products changed since the last run (everything with ``full``).
+    Raises ``FeedBuildRunning`` if another run is in progress.
+
+    Returns ``{"version", "shards", "rebuilt", "removed", "products"}``.
+    """
+    feed_dir().mkdir(parents=True, exist_ok=True)
+    with _build_lock() as lock:
+        return _build(full, log or (lambda message: None), lock)
+
+
+def _build(full, log, lock):
+    config = feed_settings()
+    # read before the scan (not cached, the job worker has its own cache):
+    # anything committed after it is picked up next run
+    version, _, fingerprint = CatalogVersion.read()
+
+    manifest = None if full else load_manifest()
+    if manifest and (manifest["base_url"] != config["BASE_URL"] or manifest["shard_size"] != config["SHARD_SIZE"]):
+        manifest = None
+    report = {"version": version, "shards": 0, "rebuilt": 0, "removed": 0, "products": 0}
+    if manifest and manifest.get("catalog") == fingerprint:
+        report["shards"] = len(manifest["shards"])
+        return report
+
+    old = manifest["shards"] if manifest else {}
+    signatures = shard_signatures(config["SHARD_SIZE"])
+    shards = {}
+    for shard, signature in signatures.items():
+        if shard in old and old[shard]["signature"] == signature:
+            shards[shard] = old[shard]
+            continue
+        count, lastmod = write_shard(int(shard), config)
+        os.utime(lock)
+        shards[shard] = {
+            "signature": signature,
+            "products": count,
+            "lastmod": _w3c(lastmod) if lastmod else None,
+            "files": [pattern.format(int(shard)) for pattern in _FILES.values()] if count else [],
+        }
+        report["rebuilt"] += 1
+        report["products"] += count
+        log(f"shard {shard}: {count} products")
+    for shard in set(old) - set(signatures):
+        remove_shard(int(shard))
+        report["removed"] += 1
+        log(f"shard {shard}: removed")
+
+    _write_index({
+        "version": version,
+        "catalog": fingerprint,
+        "base_url": config["BASE_URL"],
+        "shard_size": config["SHARD_SIZE"],
+        "generated_at": timezone.now().isoformat(timespec="seconds"),
+        "shards": shards,
+    })
+    report["shards"] = len(shards)
+    return report
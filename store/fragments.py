@@ -0,0 +1,88 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# -----------------------------
+# Fragment cache version stamps
+# -----------------------------
+# Every product has a version stamp in the cache. Templates put it in their
+# ``{% cache %}`` keys (``product|version_stamp``), so bumping one product's
+# stamp retires exactly the fragments that render it (its cards, the discount
+# strip it sits in, its review list) and nothing else. A global generation
+# is mixed into every stamp for bulk rewrites that touch the whole catalog.
+# The product row's catalog version (``Product.version``) is appended too, so
+# changes made in another process with its own local-memory cache (the job
+# worker) still retire fragments once they stamp the row (``Product.touch``).
+
+_PREFIX = "store:pv:"
+_GENERATION = _PREFIX + "all"
+
+
+def fragment_timeout():
+    return getattr(settings, "STORE_FRAGMENT_CACHE_TIMEOUT", 60 * 15)
+
+
+def _new_stamp():
+    # Time-based, so a stamp lost to cache eviction is never handed out again.
+    return time.time_ns()
+
+
+def product_versions(product_ids):
+    """``{product_id: stamp}`` in one cache round trip, creating missing stamps."""
+    keys = {f"{_PREFIX}{pid}": pid for pid in product_ids}
+    found = cache.get_many([_GENERATION, *keys])
+    missing = {key: _new_stamp() for key in [_GENERATION, *keys] if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    generation = found.pop(_GENERATION)
+    return {keys[key]: f"{generation}.{stamp}" for key, stamp in found.items()}
+
+
+def _set_stamps(keys):
+    stamp = _new_stamp()
+    cache.set_many({key: stamp for key in keys}, None)
+    if transaction.get_connection().in_atomic_block:
+        # Bump again on commit: a concurrent render may have re-cached the
+        # old rows under the new stamp before this transaction was visible.
+        transaction.on_commit(lambda: cache.set_many({key: _new_stamp() for key in keys}, None))
+
+
+def bump_products(product_ids):
+    """Retire every fragment rendering any of ``product_ids``."""
+    keys = [f"{_PREFIX}{pid}" for pid in set(product_ids)]
+    if keys:
+        _set_stamps(keys)
+
+
+def bump_all_products():
+    """Retire every product fragment (bulk rebuilds)."""
+    _set_stamps([_GENERATION])
+
+
+def _with_row_version(product, stamp):
+    # Only if loaded: a deferred field would cost a query per product.
+    return f"{stamp}.{product.__dict__.get('version', '')}"
+
+
+def attach_versions(products):
+    """Fetch stamps for ``products`` in bulk and keep them on the instances."""
+    products = list(products)
+    versions = product_versions([p.pk for p in products])
+    for product in products:
+        product._version_stamp = _with_row_version(product, versions[product.pk])
+    return products
+
+
+def version_stamp(product):
+    stamp = getattr(product, "_version_stamp", None)
+    if stamp is None:
+        stamp = product._version_stamp = _with_row_version(product, product_versions([product.pk])[product.pk])
+    return stamp
+
+
+def list_stamp(products):
+    """One stamp for an ordered list of products (e.g. the discount strip)."""
+    return "-".join(f"{p.pk}:{version_stamp(p)}" for p in products)
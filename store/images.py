@@ -0,0 +1,140 @@
+import hashlib
+import io
+import json
+import logging
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Responsive image derivatives
+# -----------------------------
+# Every product image gets resized WebP + JPEG variants stored under
+# MEDIA_ROOT/derivatives/ with content-hash names, so identical uploads share
+# files and a replaced image never serves a stale derivative.
+#
+# The worker that builds them also writes a small JSON manifest per source
+# image (derivatives/<hash of the source name>.json) to the same storage.
+# That is what other processes (web workers with their own local-memory
+# cache) read to find a finished build; the cache only saves them the read.
+
+VARIANTS = {
+    "thumb": 200,
+    "card": 480,
+    "zoom": 1200,
+}
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+DERIVATIVE_DIR = "derivatives"
+CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def _cache_key(name):
+    return "store:img:" + hashlib.md5(name.encode()).hexdigest()
+
+
+def _manifest_name(name):
+    return f"{DERIVATIVE_DIR}/{hashlib.md5(name.encode()).hexdigest()}.json"
+
+
+def _save_manifest(field_file, derivatives):
+    storage, name = field_file.storage, _manifest_name(field_file.name)
+    storage.delete(name)  # save() would pick a new name instead of overwriting
+    storage.save(name, ContentFile(json.dumps(derivatives).encode()))
+    cache.set(_cache_key(field_file.name), derivatives, CACHE_TIMEOUT)
+
+
+def _load_manifest(field_file):
+    """The derivative map a worker wrote for ``field_file``, or ``None`` if it isn't built yet."""
+    try:
+        with field_file.storage.open(_manifest_name(field_file.name), "rb") as f:
+            derivatives = json.load(f)
+    except (OSError, ValueError):
+        return None
+    cache.set(_cache_key(field_file.name), derivatives, CACHE_TIMEOUT)
+    return derivatives
+
+
+def _encode(image, width, fmt):
+    pil_format, options = FORMATS[fmt]
+    if image.width > width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.LANCZOS)
+    if pil_format == "JPEG" and image.mode != "RGB":
+        background = Image.new("RGB", image.size, "white")
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.split()[-1])
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue(), image.width
+
+
+def generate_derivatives(field_file):
+    """
+    Build (or reuse) every variant of ``field_file``.
+
+    Returns ``{variant: {fmt: [url, width]}}`` and records it in the source
+    image's manifest, or ``None`` if the file is missing or not an image (the
+    manifest then holds an empty map, so the build isn't queued again).
+    """
+    if not field_file:
+        return None
+    storage = field_file.storage
+
+    try:
+        with storage.open(field_file.name, "rb") as f:
+            data = f.read()
+        source = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+        source.load()
+    except (OSError, ValueError) as e:
+        logger.warning("Cannot build derivatives for %s: %s", field_file.name, e)
+        _save_manifest(field_file, {})
+        return None
+
+    digest = hashlib.sha1(data).hexdigest()[:16]
+    derivatives = {}
+    for variant, width in VARIANTS.items():
+        derivatives[variant] = {}
+        for fmt in FORMATS:
+            name = f"{DERIVATIVE_DIR}/{digest}-{variant}.{fmt}"
+            if storage.exists(name):
+                actual_width = min(width, source.width)
+            else:
+                content, actual_width = _encode(source, width, fmt)
+                storage.save(name, ContentFile(content))
+            derivatives[variant][fmt] = [storage.url(name), actual_width]
+
+    _save_manifest(field_file, derivatives)
+    return derivatives
+
+
+def queue_derivatives(field_file):
+    """Queue a background build for ``field_file`` (at most once per 5 minutes)."""
+    from .jobs import enqueue
+
+    if cache.add(_cache_key(field_file.name) + ":queued", 1, 300):
+        enqueue("store.build_image_derivatives", field_file.name, key=f"images:{field_file.name}")
+
+
+def get_derivatives(field_file):
+    """
+    Derivative map for ``field_file``, or a falsy value while it's still being
+    built by the worker or can't be built (callers should fall back to the
+    original).
+    """
+    if not field_file:
+        return None
+    derivatives = cache.get(_cache_key(field_file.name))
+    if derivatives is None:
+        derivatives = _load_manifest(field_file)
+    if derivatives is None:
+        queue_derivatives(field_file)
+        # With STORE_JOBS["ALWAYS_EAGER"] the build has already happened.
+        derivatives = cache.get(_cache_key(field_file.name))
+    return derivatives
@@ -0,0 +1,326 @@
+from decimal import Decimal, InvalidOperation
+
+import tablib
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils.text import slugify
+
+from .exports import unescape_cell
+from .facets import invalidate_facets
+from .fragments import bump_products
+from .models import CatalogVersion, Category, Product
+
+# -----------------------------
+# Bulk product import
+# -----------------------------
+# CSV/XLSX (anything tablib reads) with the same headers as the product export,
+# so an export can be edited and imported back. Rows with a known "Code"
+# update that product; rows without one create a product with a generated
+# slug and SKU. Rows are validated and upserted in batches with
+# ``bulk_create(update_conflicts=True)`` on ``product_code``.
+
+BATCH_SIZE = 1000
+
+# header -> model field (headers are matched case-insensitively)
+COLUMNS = {
+    "code": "product_code",
+    "name": "name",
+    "slug": "slug",
+    "category": "category",
+    "type": "product_type",
+    "pieces": "piece_type",
+    "fabric": "fabric",
+    "color": "color",
+    "sizes": "sizes",
+    "price": "price",
+    "discount price": "discount_price",
+    "stock": "stock",
+    "active": "is_active",
+    "description": "description",
+}
+# Fields an import may overwrite on existing products (slug/SKU stay stable)
+UPDATE_FIELDS = [
+    "name", "category", "product_type", "piece_type", "fabric", "color", "sizes",
+    "price", "discount_price", "percentage_price", "stock", "is_active", "description",
+]
+_TRUE = {"1", "true", "yes", "y", "active"}
+_FALSE = {"0", "false", "no", "n", "inactive"}
+
+
+class ImportFileError(Exception):
+    """The file can't be read or is missing required columns."""
+
+
+class ImportReport:
+    """What an import did (or, for a dry run, would do)."""
+
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.created = []      # names
+        self.updated = []      # (code, {field: (old, new)})
+        self.unchanged = 0
+        self.errors = []       # (row number, message)
+        self.new_categories = []
+        self.written = False
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def lines(self, limit=50):
+        verb = "Would" if self.dry_run or not self.written else "Did"
+        out = [
+            f"{verb} create {len(self.created)}, update {len(self.updated)}, "
+            f"leave {self.unchanged} unchanged; {len(self.errors)} invalid row(s)."
+        ]
+        if self.new_categories:
+            out.append(f"New categories: {', '.join(self.new_categories)}")
+        for row, message in self.errors[:limit]:
+            out.append(f"  row {row}: {message}")
+        for code, changes in self.updated[:limit]:
+            diff = ", ".join(f"{field} {old!r} -> {new!r}" for field, (old, new) in changes.items())
+            out.append(f"  ~ {code}: {diff}")
+        for name in self.created[:limit]:
+            out.append(f"  + {name}")
+        return out
+
+
+def load_dataset(content, fmt):
+    """Parse an uploaded file (bytes) with tablib."""
+    if fmt == "csv" and isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+    try:
+        return tablib.Dataset().load(content, format=fmt)
+    except Exception as e:  # tablib raises a zoo of parser errors
+        raise ImportFileError(f"Could not read {fmt.upper()} file: {e}") from e
+
+
+def _decimal(value, field, required=False):
+    if value in (None, ""):
+        if required:
+            raise ValueError(f"{field} is required")
+        return None
+    try:
+        number = Decimal(str(value).replace(",", "").strip())
+    except InvalidOperation:
+        raise ValueError(f"{field} {value!r} is not a number")
+    if number < 0:
+        raise ValueError(f"{field} can't be negative")
+    return number.quantize(Decimal("0.01"))
+
+
+def _choice(value, choices, field, default):
+    if value in (None, ""):
+        return default
+    # accept the stored value ("3-piece") or the label ("3 Piece")
+    lookup = {key: key for key, _ in choices} | {label.lower(): key for key, label in choices}
+    try:
+        return lookup[str(value).strip().lower()]
+    except KeyError:
+        raise ValueError(f"{field} must be one of {', '.join(key for key, _ in choices)}")
+
+
+def _clean(raw):
+    """Validate one row (``{model_field: raw value}``) into model values."""
+    name = str(raw.get("name") or "").strip()
+    if not name:
+        raise ValueError("name is required")
+    price = _decimal(raw.get("price"), "price", required=True)
+    discount = _decimal(raw.get("discount_price"), "discount price")
+    if discount is not None and discount >= price:
+        raise ValueError("discount price must be below price")
+
+    stock = raw.get("stock")
+    try:
+        stock = int(Decimal(str(stock))) if stock not in (None, "") else 0
+    except InvalidOperation:
+        raise ValueError(f"stock {raw.get('stock')!r} is not a number")
+    if stock < 0:
+        raise ValueError("stock can't be negative")
+
+    active = raw.get("is_active")
+    if active in (None, ""):
+        active = True
+    elif not isinstance(active, bool):
+        text = str(active).strip().lower()
+        if text not in _TRUE | _FALSE:
+            raise ValueError(f"active {active!r} is not yes/no")
+        active = text in _TRUE
+
+    return {
+        "product_code": str(raw.get("product_code") or "").strip(),
+        "slug": slugify(str(raw.get("slug") or "")),
+        "name": name,
+        "category": str(raw.get("category") or "").strip(),
+        "product_type": _choice(raw.get("product_type"), Product.PRODUCT_TYPE_CHOICES, "type", "unstitched"),
+        "piece_type": _choice(raw.get("piece_type"), Product.PIECE_TYPE_CHOICES, "pieces", "3-piece"),
+        "fabric": str(raw.get("fabric") or "").strip(),
+        "color": str(raw.get("color") or "").strip(),
+        "sizes": str(raw.get("sizes") or "").strip(),
+        "price": price,
+        "discount_price": discount,
+        "percentage_price": Product.discount_percent(price, discount),
+        "stock": stock,
+        "is_active": active,
+        "description": str(raw.get("description") or "").strip(),
+    }
+
+
+def _columns(dataset):
+    """``[(column index, model field)]`` for the recognised headers."""
+    headers = [str(h or "").strip().lower() for h in dataset.headers or []]
+    if "name" not in headers or "price" not in headers:
+        raise ImportFileError("The file needs at least 'Name' and 'Price' columns.")
+    return [(index, COLUMNS[h]) for index, h in enumerate(headers) if h in COLUMNS]
+
+
+class _Namer:
+    """Collision-free slugs and SKUs, checked against the DB once up front."""
+
+    def __init__(self):
+        self.slugs = set(Product.objects.values_list("slug", flat=True).iterator(chunk_size=5000))
+        self.codes = set(Product.objects.values_list("product_code", flat=True).iterator(chunk_size=5000))
+
+    def slug(self, wanted, name):
+        base = (wanted or slugify(name) or "product")[:200]
+        slug, n = base, 1
+        while slug in self.slugs:
+            n += 1
+            slug = f"{base}-{n}"
+        self.slugs.add(slug)
+        return slug
+
+    def code(self, product_type, piece_type):
+        code = Product.generate_code(product_type, piece_type)
+        while code in self.codes:
+            code = Product.generate_code(product_type, piece_type)
+        self.codes.add(code)
+        return code
+
+
+def _categories(names, create):
+    """``{name.lower(): Category}`` (matched case-insensitively), creating missing ones when ``create``."""
+    wanted = {}
+    for name in names:
+        if name:
+            wanted.setdefault(name.lower(), name)  # first spelling in the file wins
+    found = {
+        c.name.lower(): c
+        for c in Category.objects.annotate(name_lower=Lower("name")).filter(name_lower__in=wanted)
+    }
+    missing = sorted((name for key, name in wanted.items() if key not in found), key=str.lower)
+    if missing and create:
+        taken = set(Category.objects.values_list("slug", flat=True))
+        new = []
+        for name in missing:
+            base = slug = slugify(name) or "category"
+            n = 1
+            while slug in taken:
+                n += 1
+                slug = f"{base}-{n}"
+            taken.add(slug)
+            new.append(Category(name=name, slug=slug))
+        Category.objects.bulk_create(new)
+        found.update({c.name.lower(): c for c in Category.objects.filter(name__in=missing)})
+    return found, missing
+
+
+def _display(value):
+    if isinstance(value, Category):
+        return value.name
+    return value
+
+
+def import_products(dataset, dry_run=False, skip_invalid=False, batch_size=BATCH_SIZE):
+    """
+    Upsert the products in ``dataset`` (a ``tablib.Dataset``).
+
+    Nothing is written on a dry run, or when any row is invalid unless
+    ``skip_invalid``. Returns an ``ImportReport`` with a per-product diff.
+    """
+    report = ImportReport(dry_run)
+    columns = _columns(dataset)
+    # Columns missing from the file keep their current values on update
+    present = {field for _, field in columns}
+    keep = [field for field in UPDATE_FIELDS if field not in present and field != "percentage_price"]
+    update_fields = [field for field in UPDATE_FIELDS if field not in keep]
+
+    cleaned = []
+    for number, row in enumerate(dataset, start=2):  # row 1 is the header
+        try:
+            cleaned.append((number, _clean({field: unescape_cell(row[index]) for index, field in columns})))
+        except ValueError as e:
+            report.errors.append((number, str(e)))
+
+    write = not dry_run and (skip_invalid or not report.errors)
+    namer = _Namer()
+    seen = set()  # codes already used by earlier rows of this file
+    touched_ids = []
+    written_codes = []
+
+    with transaction.atomic():
+        categories, report.new_categories = _categories([row["category"] for _, row in cleaned], create=write)
+        if not write:
+            # unsaved placeholders so the dry-run diff still names them
+            categories.update({name.lower(): Category(name=name) for name in report.new_categories})
+
+        for start in range(0, len(cleaned), batch_size):
+            batch = cleaned[start:start + batch_size]
+            codes = [row["product_code"] for _, row in batch if row["product_code"]]
+            existing = Product.objects.select_related("category").in_bulk(codes, field_name="product_code")
+
+            products = []
+            for number, row in batch:
+                code = row["product_code"]
+                if code in seen:
+                    report.errors.append((number, f"code {code} appears more than once in the file"))
+                    continue
+                if code:
+                    seen.add(code)
+                row["category"] = categories.get(row["category"].lower())
+                current = existing.get(code)
+                if current is None:
+                    row["slug"] = namer.slug(row["slug"], row["name"])
+                    row["product_code"] = code or namer.code(row["product_type"], row["piece_type"])
+                    namer.codes.add(row["product_code"])
+                    report.created.append(row["name"])
+                else:
+                    for field in keep:
+                        row[field] = getattr(current, field)
+                    row["percentage_price"] = Product.discount_percent(row["price"], row["discount_price"])
+                    changes = {
+                        field: (_display(getattr(current, field)), _display(row[field]))
+                        for field in UPDATE_FIELDS
+                        if getattr(current, field) != row[field]
+                    }
+                    if not changes:
+                        report.unchanged += 1
+                        continue
+                    row["slug"] = current.slug
+                    report.updated.append((current.product_code, changes))
+                    touched_ids.append(current.pk)
+                products.append(Product(**row))
+
+            if write and products:
+                Product.objects.bulk_create(
+                    products,
+                    update_conflicts=True,
+                    unique_fields=["product_code"],
+                    update_fields=update_fields,
+                )
+                written_codes.extend(product.product_code for product in products)
+
+        if write and report.errors and not skip_invalid:
+            transaction.set_rollback(True)
+            write = False
+        elif write and written_codes:
+            # One catalog version for the whole import
+            stamp = CatalogVersion.claim()
+            for start in range(0, len(written_codes), batch_size):
+                Product.objects.filter(product_code__in=written_codes[start:start + batch_size]).update(**stamp)
+
+    report.written = write
+    if write:
+        invalidate_facets()
+        bump_products(touched_ids)
+    return report
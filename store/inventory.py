@@ -0,0 +1,192 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Func, Sum, Value, When
+from django.db.models.functions import Round, TruncDate
+from django.db.models.lookups import GreaterThan, LessThan
+
+from .facets import invalidate_facets
+from .fragments import bump_all_products, bump_products
+from .models import CatalogVersion, Order, OrderItem, OrderLedgerEntry, Product
+from .rollups import mark_dirty
+from .transitions import run_bulk_status_hooks
+
+# Above this many products a bulk change retires every fragment at once
+# instead of writing one cache stamp per product.
+BULK_BUMP_LIMIT = 500
+
+
+# -----------------------------
+# Restocking
+# -----------------------------
+def restock_orders(order_ids):
+    """
+    Return the items of ``order_ids`` to stock with set-based updates.
+
+    Quantities are summed per product in SQL, then products sharing the same
+    quantity are bumped by a single ``F('stock') + qty`` UPDATE. This skips
+    ``Product.save`` (slug/SKU/percentage logic) entirely. The same UPDATEs
+    stamp the products with one new catalog version.
+    """
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids, product__isnull=False)
+        .order_by()
+        .values("product_id")
+        .annotate(qty=Sum("quantity"))
+    )
+
+    products_by_qty = defaultdict(list)
+    for row in rows:
+        products_by_qty[row["qty"]].append(row["product_id"])
+
+    stamp = CatalogVersion.claim() if products_by_qty else {}
+    for qty, product_ids in products_by_qty.items():
+        Product.objects.filter(pk__in=product_ids).update(stock=F("stock") + qty, **stamp)
+        bump_products(product_ids)
+
+
+@transaction.atomic
+def cancel_orders(queryset):
+    """
+    Cancel every order in ``queryset`` that isn't cancelled yet.
+
+    Flips the status with one UPDATE, moves their totals in the revenue
+    ledger per order day and previous status, then runs the "→ Cancelled"
+    status hooks (restocking, ...) once per previous status for the whole
+    batch. Returns the number of orders cancelled.
+    """
+    orders = queryset.exclude(status="Cancelled").select_for_update()
+    by_status = defaultdict(list)
+    for pk, status in orders.values_list("pk", "status"):
+        by_status[status].append(pk)
+    order_ids = [pk for ids in by_status.values() for pk in ids]
+    if not order_ids:
+        return 0
+
+    moves = (
+        Order.objects.filter(pk__in=order_ids)
+        .order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "status")
+        .annotate(count=Count("id"), total=Sum("total_amount"))
+    )
+    entries, cancelled_by_day = [], defaultdict(lambda: [0, 0])
+    for row in moves:
+        entries.append(OrderLedgerEntry(
+            day=row["day"], status=row["status"], order_count=-row["count"], total_amount=-(row["total"] or 0),
+        ))
+        cancelled_by_day[row["day"]][0] += row["count"]
+        cancelled_by_day[row["day"]][1] += row["total"] or 0
+    entries += [
+        OrderLedgerEntry(day=day, status="Cancelled", order_count=count, total_amount=total)
+        for day, (count, total) in cancelled_by_day.items()
+    ]
+    OrderLedgerEntry.objects.bulk_create(entries)
+    mark_dirty(cancelled_by_day)
+
+    cancelled = Order.objects.filter(pk__in=order_ids).update(status="Cancelled")
+    run_bulk_status_hooks(by_status, "Cancelled")
+    return cancelled
+
+
+# -----------------------------
+# Bulk product updates
+# -----------------------------
+# Admin bulk actions run as one UPDATE over the selection (no per-row
+# Product.save), then write a single admin log entry for the whole batch.
+_MONEY = DecimalField(max_digits=10, decimal_places=2)
+_PERCENT = DecimalField(max_digits=5, decimal_places=2)
+
+
+class _Fractional(Func):
+    """
+    Pass a decimal operand through unchanged, except on SQLite: it stores
+    whole-number decimals as INTEGER, so ``2500 / 2999`` would divide to 0.
+    """
+    arity = 1
+    template = "%(expressions)s"
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template="CAST(%(expressions)s AS REAL)", **extra_context)
+
+
+def discount_percent_sql(discount=F("discount_price")):
+    """``Product.discount_percent`` as an SQL expression over ``price`` and ``discount``."""
+    return Case(
+        When(GreaterThan(discount, 0) & LessThan(discount, F("price")),
+             then=Round((Value(Decimal("1")) - _Fractional(discount) / F("price")) * 100, 2)),
+        default=Value(Decimal("0")),
+        output_field=_PERCENT,
+    )
+
+
+def _audit(user, product_ids, message):
+    if user is None or not product_ids:
+        return
+    LogEntry.objects.create(
+        user_id=user.pk,
+        content_type=ContentType.objects.get_for_model(Product),
+        object_repr=f"{len(product_ids)} products",
+        action_flag=CHANGE,
+        change_message=f"{message} (product ids: {_id_ranges(product_ids)})",
+    )
+
+
+def _id_ranges(ids):
+    """``[1, 2, 3, 7]`` -> ``"1-3, 7"``, so a batch of thousands stays readable."""
+    ranges = []
+    for pk in sorted(ids):
+        if ranges and pk == ranges[-1][1] + 1:
+            ranges[-1][1] = pk
+        else:
+            ranges.append([pk, pk])
+    return ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+@transaction.atomic
+def bulk_update_products(queryset, message, user=None, **updates):
+    """
+    Apply ``updates`` to every product in ``queryset`` with one UPDATE and
+    record one admin log entry for the batch. Returns the number updated.
+    """
+    product_ids = list(queryset.order_by().values_list("pk", flat=True))
+    if not product_ids:
+        return 0
+    _audit(user, product_ids, message)
+    updated = queryset.order_by().update(**updates, **CatalogVersion.claim())
+
+    if len(product_ids) > BULK_BUMP_LIMIT:
+        bump_all_products()
+    else:
+        bump_products(product_ids)
+    invalidate_facets()
+    return updated
+
+
+def restock_products(queryset, quantity, user=None):
+    return bulk_update_products(queryset, f"Restocked by {quantity}", user, stock=F("stock") + quantity)
+
+
+def set_discount(queryset, percent, user=None):
+    """Set ``discount_price`` to ``percent``% off ``price`` (0 clears the discount)."""
+    if not percent:
+        return bulk_update_products(queryset, "Cleared discount", user,
+                                    discount_price=None, percentage_price=Value(Decimal("0")))
+    factor = (100 - Decimal(percent)) / 100
+    discount = Round(F("price") * Value(factor), 2, output_field=_MONEY)
+    # percentage_price is computed from the same expression, not from the
+    # column, so it doesn't depend on the order SET assignments are applied in
+    return bulk_update_products(queryset, f"Set discount to {percent}%", user,
+                                discount_price=discount, percentage_price=discount_percent_sql(discount))
+
+
+def set_active(queryset, active, user=None):
+    return bulk_update_products(queryset, "Activated" if active else "Deactivated", user, is_active=active)
+
+
+def move_to_category(queryset, category, user=None):
+    label = f"Moved to category {category.name}" if category else "Removed category"
+    return bulk_update_products(queryset, label, user, category=category)
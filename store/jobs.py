@@ -0,0 +1,179 @@
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# Background jobs
+# -----------------------------
+# A small DB-backed queue: ``enqueue`` inserts a ``Job`` row (inside the
+# caller's transaction), ``manage.py run_worker`` claims and runs them in a
+# process pool with retries and exponential backoff.
+#
+# settings.STORE_JOBS:
+#   ALWAYS_EAGER   run tasks inline at enqueue time (no worker needed)
+#   MAX_ATTEMPTS   default retry budget per job (3)
+#   RETRY_DELAY    base backoff in seconds, doubled per attempt (10)
+#   STALE_AFTER    seconds before a "running" job is assumed dead (600)
+
+DEFAULTS = {
+    "ALWAYS_EAGER": False,
+    "MAX_ATTEMPTS": 3,
+    "RETRY_DELAY": 10,
+    "STALE_AFTER": 600,
+}
+
+_tasks = {}
+
+
+def job_settings():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "STORE_JOBS", {}))
+    return config
+
+
+def task(name):
+    """Register ``func(*args, **kwargs)`` as a job named ``name``."""
+    def decorator(func):
+        _tasks[name] = func
+        func.task_name = name
+        return func
+    return decorator
+
+
+def enqueue(name, *args, key=None, delay=0, max_attempts=None, **kwargs):
+    """
+    Queue task ``name``. Returns the ``Job`` (or ``None`` when run eagerly).
+
+    ``key`` is an idempotency key: while a job with the same key is queued or
+    running, enqueueing again returns that job instead of adding another.
+    """
+    if name not in _tasks:
+        raise KeyError(f"Unknown task {name!r}")
+
+    config = job_settings()
+    if config["ALWAYS_EAGER"]:
+        _tasks[name](*args, **kwargs)
+        return None
+
+    if key:
+        existing = Job.objects.filter(idempotency_key=key, status__in=["queued", "running"]).first()
+        if existing:
+            return existing
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                task=name,
+                args=list(args),
+                kwargs=kwargs,
+                idempotency_key=key,
+                max_attempts=max_attempts or config["MAX_ATTEMPTS"],
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+    except IntegrityError:
+        # Lost a race with another enqueue of the same key.
+        return Job.objects.filter(idempotency_key=key, status__in=["queued", "running"]).first()
+
+
+def requeue_stale(stale_after=None):
+    """Put "running" jobs whose worker died back on the queue."""
+    stale_after = stale_after if stale_after is not None else job_settings()["STALE_AFTER"]
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    return Job.objects.filter(status="running", locked_at__lt=cutoff).update(status="queued", locked_at=None)
+
+
+def ready_job_ids(limit=100):
+    return list(
+        Job.objects.filter(status="queued", run_after__lte=timezone.now())
+        .order_by("run_after", "id").values_list("id", flat=True)[:limit]
+    )
+
+
+def run_job(job_id):
+    """
+    Claim and run one job. Returns its final status, or ``None`` if another
+    worker claimed it first.
+    """
+    claimed = Job.objects.filter(pk=job_id, status="queued").update(
+        status="running", locked_at=timezone.now(), attempts=F("attempts") + 1
+    )
+    if not claimed:
+        return None
+
+    job = Job.objects.get(pk=job_id)
+    func = _tasks.get(job.task)
+    try:
+        if func is None:
+            raise KeyError(f"Unknown task {job.task!r}")
+        func(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Job %s failed (attempt %s/%s)", job, job.attempts, job.max_attempts)
+        if job.attempts < job.max_attempts:
+            delay = job_settings()["RETRY_DELAY"] * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status="queued", locked_at=None, last_error=error,
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+            return "queued"
+        Job.objects.filter(pk=job.pk).update(status="failed", last_error=error, finished_at=timezone.now())
+        return "failed"
+
+    Job.objects.filter(pk=job.pk).update(status="done", last_error="", finished_at=timezone.now())
+    return "done"
+
+
+def _init_pool_process():
+    # Connections inherited from the parent must not be shared across processes.
+    import django
+    django.setup()
+    for connection in connections.all():
+        connection.close()
+
+
+def run_worker(processes=2, once=False, poll_interval=1.0, batch=100, log=None):
+    """
+    Process jobs until interrupted (or until the queue is empty when ``once``).
+    ``processes=0`` runs jobs in the current process.
+    """
+    log = log or (lambda message: None)
+    executor = None
+    if processes:
+        from concurrent.futures import ProcessPoolExecutor
+        for connection in connections.all():
+            connection.close()
+        executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_pool_process)
+
+    processed = 0
+    try:
+        while True:
+            revived = requeue_stale()
+            if revived:
+                log(f"requeued {revived} stale job(s)")
+            ids = ready_job_ids(batch)
+            if not ids:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+            if executor:
+                statuses = list(executor.map(run_job, ids))
+            else:
+                statuses = [run_job(job_id) for job_id in ids]
+            for job_id, status in zip(ids, statuses):
+                if status:
+                    processed += 1
+                    log(f"job {job_id}: {status}")
+    finally:
+        if executor:
+            executor.shutdown()
+    return processed
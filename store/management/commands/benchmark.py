@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store.benchmark import compare, load_baseline, run_benchmark, save_baseline
+
+
+class Command(BaseCommand):
+    help = "Benchmark the storefront URLs (p50/p95 latency, query counts) against a stored baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--cart-size", type=int, default=10)
+        parser.add_argument("--only", nargs="*", help="Scenario name prefixes, e.g. product_list view_cart")
+        parser.add_argument("--baseline", help="JSON file to compare against")
+        parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+        parser.add_argument("--threshold", type=float, default=20.0,
+                            help="Allowed p95 slowdown in percent before a scenario counts as a regression")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        try:
+            results = run_benchmark(
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+                cart_size=options["cart_size"],
+                only=options["only"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        baseline = load_baseline(options["baseline"]) if options["baseline"] else {}
+        rows, regressions = compare(results, baseline, options["threshold"])
+
+        self.stdout.write(f"{'scenario':<22}{'status':>7}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'vs base':>10}")
+        for name, current, before, delta in rows:
+            versus = "" if before is None else f"{delta:+.1f}%"
+            if before is not None and current["queries"] != before["queries"]:
+                versus += f" q{current['queries'] - before['queries']:+d}"
+            self.stdout.write(
+                f"{name:<22}{current['status']:>7}{current['p50_ms']:>10.2f}{current['p95_ms']:>10.2f}"
+                f"{current['queries']:>9}{versus:>10}"
+            )
+
+        if options["save_baseline"]:
+            save_baseline(options["save_baseline"], results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['save_baseline']}"))
+
+        if regressions:
+            message = f"Regressions: {', '.join(regressions)}"
+            if options["fail_on_regression"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from store.benchmark import run_load
+
+MODES = {"wsgi": "0", "asgi": "1"}  # -> STORE_ASYNC_VIEWS
+
+
+class Command(BaseCommand):
+    help = "Throughput and latency of the storefront under concurrent load, sync (WSGI) vs async (ASGI) views."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=["both", *MODES], default="both")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--cart-size", type=int, default=10)
+        parser.add_argument("--only", nargs="*", help="Scenario name prefixes, e.g. product_list view_cart")
+        parser.add_argument("--json", action="store_true", help="Print the raw results as JSON")
+
+    def handle(self, *args, **options):
+        modes = list(MODES) if options["mode"] == "both" else [options["mode"]]
+        results = [self._run(mode, options) for mode in modes]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results if len(results) > 1 else results[0]))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result['mode'].upper()}: {result['requests']} requests, concurrency {result['concurrency']}, "
+                f"{result['seconds']:.2f}s, {result['rps']:.1f} req/s"
+            )
+            self.stdout.write(f"  {'scenario':<22}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+            for name, row in result["scenarios"].items():
+                self.stdout.write(f"  {name:<22}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['errors']:>8}")
+        if len(results) == 2 and results[0]["rps"]:
+            wsgi, asgi = results
+            self.stdout.write(self.style.SUCCESS(
+                f"ASGI vs WSGI throughput: {(asgi['rps'] - wsgi['rps']) / wsgi['rps'] * 100:+.1f}%"
+            ))
+
+    def _run(self, mode, options):
+        if settings.STORE_ASYNC_VIEWS == (MODES[mode] == "1"):
+            try:
+                return run_load(
+                    concurrency=options["concurrency"],
+                    requests=options["requests"],
+                    cart_size=options["cart_size"],
+                    only=options["only"],
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        # The URLconf picks sync or async views at import, so the other mode needs its own process
+        command = [
+            sys.executable, str(settings.BASE_DIR / "manage.py"), "benchmark_concurrency",
+            "--mode", mode, "--json",
+            "--concurrency", str(options["concurrency"]),
+            "--requests", str(options["requests"]),
+            "--cart-size", str(options["cart_size"]),
+        ]
+        if options["only"]:
+            command += ["--only", *options["only"]]
+        env = {**os.environ, "STORE_ASYNC_VIEWS": MODES[mode]}
+        process = subprocess.run(command, env=env, capture_output=True, text=True)
+        if process.returncode:
+            raise CommandError(f"{mode} run failed:\n{process.stderr.strip()}")
+        return json.loads(process.stdout)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from store.feeds import FeedBuildRunning, build_feeds, feed_dir
+
+
+class Command(BaseCommand):
+    help = "Write the product sitemap and Google Shopping / Facebook catalog feeds to MEDIA_ROOT/feeds/."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Rewrite every shard instead of only those with products changed since the last run.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = build_feeds(full=options["full"], log=self.stdout.write)
+        except FeedBuildRunning as e:
+            self.stdout.write(self.style.WARNING(f"Skipped: {e}."))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Catalog version {report['version']}: rebuilt {report['rebuilt']} of {report['shards']} shards "
+            f"({report['products']} products), removed {report['removed']}, in {feed_dir()}."
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from store.images import generate_derivatives
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = "Generate WebP/JPEG thumbnail, card and zoom variants for every product image."
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        products = Product.objects.exclude(image1="", image2="").only("image1", "image2")
+        for product in products.iterator(chunk_size=500):
+            for image in (product.image1, product.image2):
+                if not image:
+                    continue
+                if generate_derivatives(image):
+                    built += 1
+                else:
+                    failed += 1
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {built} images ({failed} failed)."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from store.recommendations import refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = "Refresh the \"customers also bought\" neighbour table from orders and wishlists."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Rebuild every product instead of only those in orders placed since the last run.",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_recommendations(full=options["full"])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed recommendations for {refreshed} products."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from store.models import OrderLedgerEntry
+
+
+class Command(BaseCommand):
+    help = "Fold the revenue ledger into one entry per order day and status."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="Recompute the ledger from the orders table instead.")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            OrderLedgerEntry.rebuild()
+            self.stdout.write(self.style.SUCCESS("Rebuilt the revenue ledger from orders."))
+            return
+        entries = OrderLedgerEntry.compact()
+        self.stdout.write(self.style.SUCCESS(f"Compacted the revenue ledger to {entries} entries."))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store.query_plans import check_plans
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the storefront's hot queries and fail if any of them falls back to a full table scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", nargs="*", help="Query names to check (default: all).")
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not just problems.")
+
+    def handle(self, *args, **options):
+        failures = []
+        for name, index, status, plan in check_plans(options["only"]):
+            expected = index or "any index"
+            if status == "ok":
+                self.stdout.write(f"{self.style.SUCCESS('ok  ')} {name:<24} {expected}")
+            elif status == "other-index":
+                self.stdout.write(f"{self.style.WARNING('warn')} {name:<24} indexed, but not by {expected}")
+            else:
+                failures.append(name)
+                self.stdout.write(f"{self.style.ERROR('FAIL')} {name:<24} full table scan (expected {expected})")
+            if status != "ok" or options["verbose_plans"]:
+                for line in plan.splitlines():
+                    self.stdout.write(f"       {line}")
+
+        if failures:
+            raise CommandError(
+                f"{len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} not using an index: "
+                + ", ".join(failures)
+            )
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.imports import ImportFileError, import_products, load_dataset
+
+
+class Command(BaseCommand):
+    help = "Create/update products from a CSV or XLSX file with the product export's columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or XLSX file.")
+        parser.add_argument("--format", choices=["csv", "xlsx"], help="File format (default: from the extension).")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without saving.")
+        parser.add_argument("--skip-invalid", action="store_true", help="Import the valid rows even if some are invalid.")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        fmt = options["format"] or ("xlsx" if path.suffix.lower() == ".xlsx" else "csv")
+        try:
+            report = import_products(
+                load_dataset(path.read_bytes(), fmt),
+                dry_run=options["dry_run"],
+                skip_invalid=options["skip_invalid"],
+            )
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        for line in report.lines(limit=None if options["verbosity"] > 1 else 20):
+            self.stdout.write(line)
+        if report.written:
+            self.stdout.write(self.style.SUCCESS("Import saved."))
+        elif not report.dry_run:
+            raise CommandError("Nothing was imported: fix the invalid rows or use --skip-invalid.")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from store.cart import purge_abandoned_carts
+
+
+class Command(BaseCommand):
+    help = "Delete anonymous carts that haven't been touched for a while."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="Age in days (default: 30).")
+
+    def handle(self, *args, **options):
+        deleted = purge_abandoned_carts(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} abandoned carts."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = "Recompute Product rating_count / rating_sum / rating_average from reviews."
+
+    def handle(self, *args, **options):
+        updated = Product.rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings for {updated} products."))
@@ -0,0 +1,17 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from store.rollups import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard's daily/hourly sales rollups from the orders table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, help="First day to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--end", type=date.fromisoformat, help="Last day to rebuild (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        days = rebuild_all(options["start"], options["end"], log=self.stdout.write if options["verbosity"] > 1 else None)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt sales rollups for {days} days."))
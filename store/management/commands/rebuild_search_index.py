@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from store.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = "Create the product full-text search index (if missing) and reindex every product."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        install_search_index(using=options["database"], rebuild=True)
+        self.stdout.write(self.style.SUCCESS("Product search index rebuilt."))
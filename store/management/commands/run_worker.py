@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from store.jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (image derivatives, aggregate rebuilds, ...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=2,
+                            help="Worker processes; 0 runs jobs in this process")
+        parser.add_argument("--once", action="store_true", help="Exit when no jobs are ready")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument("--batch", type=int, default=100)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Worker started with {options['processes'] or 'no'} pool processes.")
+        try:
+            processed = run_worker(
+                processes=options["processes"],
+                once=options["once"],
+                poll_interval=options["poll_interval"],
+                batch=options["batch"],
+                log=lambda message: self.stdout.write(f"  {message}"),
+            )
+        except KeyboardInterrupt:
+            return
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s)."))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.benchmark import seed_catalog
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert a synthetic catalog (products, categories, users, reviews, orders, wishlists)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=20000)
+        parser.add_argument("--categories", type=int, default=8)
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--reviews", type=int, default=40000)
+        parser.add_argument("--orders", type=int, default=15000)
+        parser.add_argument("--items-per-order", type=int, default=3)
+        parser.add_argument("--wishlist-items", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for a repeatable catalog")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        created = seed_catalog(
+            products=options["products"],
+            categories=options["categories"],
+            users=options["users"],
+            reviews=options["reviews"],
+            orders=options["orders"],
+            items_per_order=options["items_per_order"],
+            wishlist_items=options["wishlist_items"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+            log=lambda message: self.stdout.write(f"  {message}"),
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {sum(created.values())} rows in {elapsed:.1f}s."
+        ))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:15
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_ledger(apps, schema_editor):
+    Order = apps.get_model('store', 'Order')
+    OrderStatusTotal = apps.get_model('store', 'OrderStatusTotal')
+    totals = {
+        status: OrderStatusTotal(status=status)
+        for status in ('Pending', 'Confirmed', 'Shipped', 'Delivered', 'Cancelled')
+    }
+    for row in Order.objects.order_by().values('status').annotate(count=Count('id'), total=Sum('total_amount')):
+        totals.setdefault(row['status'], OrderStatusTotal(status=row['status']))
+        totals[row['status']].order_count = row['count']
+        totals[row['status']].total_amount = row['total'] or 0
+    OrderStatusTotal.objects.bulk_create(totals.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0011_product_percentage_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Confirmed', 'Confirmed'), ('Shipped', 'Shipped'), ('Delivered', 'Delivered'), ('Cancelled', 'Cancelled')], max_length=20, unique=True)),
+                ('order_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name_plural': 'Order status totals',
+            },
+        ),
+        migrations.RunPython(build_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:17
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def build_ratings(apps, schema_editor):
+    Product = apps.get_model('store', 'Product')
+    Review = apps.get_model('store', 'Review')
+    reviews = Review.objects.filter(product=OuterRef('pk')).order_by().values('product')
+    Product.objects.update(
+        rating_count=Coalesce(Subquery(reviews.annotate(n=Count('id')).values('n')), 0),
+        rating_sum=Coalesce(Subquery(reviews.annotate(n=Sum('rating')).values('n')), 0),
+        rating_average=Coalesce(
+            Subquery(reviews.annotate(n=Avg('rating')).values('n')), Value(0.0),
+            output_field=models.FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0012_orderstatustotal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_average',
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(build_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CartItem was never used (the cart lived in the session), so it's
+    # recreated with the new cart FK instead of altered.
+
+    dependencies = [
+        ('store', '0017_salesrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Cart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_count', models.PositiveIntegerField(default=0, help_text='Number of lines (for the navbar)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cart', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('user__isnull', True)), fields=['updated_at'], name='store_cart_anon_idx')],
+            },
+        ),
+        migrations.DeleteModel(
+            name='CartItem',
+        ),
+        migrations.CreateModel(
+            name='CartItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('cart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='store.cart')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('cart', 'product'), name='store_cartitem_uniq')],
+            },
+        ),
+    ]
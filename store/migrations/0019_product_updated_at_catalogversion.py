@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:40
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill(apps, schema_editor):
+    Product = apps.get_model('store', 'Product')
+    CatalogVersion = apps.get_model('store', 'CatalogVersion')
+    # Existing products count as last changed when they were created, at version 0
+    Product.objects.update(updated_at=F('created_at'))
+    CatalogVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0018_cart'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='version',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Catalog version of the last change (see CatalogVersion)'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['version'], name='store_prod_version_idx'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:13
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0019_product_updated_at_catalogversion'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='OrderStatusTotal',
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:17
+
+import django.db.models.deletion
+import store.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0020_delete_orderstatustotal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchIndex',
+            fields=[
+                ('product', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='store.product')),
+                ('document', store.models.SearchDocumentField(db_column='store_product_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'store_product_fts',
+                'managed': False,
+            },
+        ),
+    ]
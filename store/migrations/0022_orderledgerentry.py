@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:28
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def build_ledger(apps, schema_editor):
+    Order = apps.get_model('store', 'Order')
+    OrderLedgerEntry = apps.get_model('store', 'OrderLedgerEntry')
+    rows = (
+        Order.objects.order_by().annotate(day=TruncDate('created_at'))
+        .values('day', 'status').annotate(count=Count('id'), total=Sum('total_amount'))
+    )
+    OrderLedgerEntry.objects.bulk_create([
+        OrderLedgerEntry(day=row['day'], status=row['status'], order_count=row['count'], total_amount=row['total'] or 0)
+        for row in rows
+    ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0021_productsearchindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Confirmed', 'Confirmed'), ('Shipped', 'Shipped'), ('Delivered', 'Delivered'), ('Cancelled', 'Cancelled')], max_length=20)),
+                ('order_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name_plural': 'Order ledger entries',
+                'indexes': [models.Index(fields=['status', 'day'], name='store_ledger_status_day_idx')],
+            },
+        ),
+        migrations.RunPython(build_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0022_orderledgerentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductNorm',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='store.product')),
+                ('norm', models.FloatField(default=0)),
+                ('dirty', models.BooleanField(default=False)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('dirty', True)), fields=['product'], name='store_norm_dirty_idx')],
+            },
+        ),
+    ]
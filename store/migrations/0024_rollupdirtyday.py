@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0023_productnorm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupDirtyDay',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('marked_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0024_rollupdirtyday'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='removed_count',
+            field=models.PositiveIntegerField(default=0, help_text='Lines dropped because their product was deleted, not yet shown to the buyer'),
+        ),
+    ]
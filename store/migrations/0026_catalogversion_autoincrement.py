@@ -0,0 +1,44 @@
+from django.core.management.color import no_style
+from django.db import migrations
+
+
+def carry_version(apps, schema_editor):
+    # The single counter row (pk=1) becomes the newest claim: its id is the
+    # version, so the autoincrement continues from where the counter was.
+    CatalogVersion = apps.get_model('store', 'CatalogVersion')
+    row = CatalogVersion.objects.filter(pk=1).values('version', 'changed_at').first()
+    CatalogVersion.objects.all().delete()
+    if row and row['version']:
+        CatalogVersion.objects.create(pk=row['version'], version=row['version'], changed_at=row['changed_at'])
+
+
+def reset_sequence(apps, schema_editor):
+    # SQLite's AUTOINCREMENT follows the explicit id; sequence-based backends don't
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [apps.get_model('store', 'CatalogVersion')]):
+            cursor.execute(sql)
+
+
+def restore_counter(apps, schema_editor):
+    CatalogVersion = apps.get_model('store', 'CatalogVersion')
+    row = CatalogVersion.objects.order_by('-pk').values('pk', 'changed_at').first()
+    CatalogVersion.objects.all().delete()
+    if row:
+        CatalogVersion.objects.create(pk=1, version=row['pk'], changed_at=row['changed_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0025_cart_removed_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(carry_version, restore_counter),
+        migrations.RemoveField(
+            model_name='catalogversion',
+            name='version',
+        ),
+        migrations.RunPython(reset_sequence, migrations.RunPython.noop),
+    ]
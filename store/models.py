@@ -2,9 +2,16 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.text import slugify
-from django.db.models import Avg,Sum
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Avg, Case, Count, F, Lookup, Max, Min, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Lower, TruncDate
 import uuid
 from django.contrib import admin
+from django.core.cache import cache
+
+from .fragments import bump_all_products
+from .transitions import run_status_hooks
 
 
 # -----------------------------
@@ -79,6 +86,11 @@ class Product(models.Model):
     stock = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
 
+    # Ratings (maintained from Review saves/deletes, see rebuild_ratings)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_average = models.FloatField(default=0, db_index=True, editable=False)
+
     # Media
     image1 = models.ImageField(upload_to="products/", blank=True, null=True)
     image2 = models.ImageField(upload_to="products/", blank=True, null=True)
@@ -89,9 +101,35 @@ class Product(models.Model):
 
     # Meta
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.BigIntegerField(
+        default=0, editable=False, help_text="Catalog version of the last change (see CatalogVersion)"
+    )
 
     class Meta:
         ordering = ['-created_at']
+        # Storefront paths only ever read active products, so these are
+        # partial indexes (see `manage.py explain_hot_queries`).
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], condition=models.Q(is_active=True),
+                name='store_prod_active_new_idx',
+            ),
+            models.Index(
+                fields=['category', '-created_at'], condition=models.Q(is_active=True),
+                name='store_prod_active_cat_idx',
+            ),
+            models.Index(
+                Lower('fabric'), F('created_at').desc(), condition=models.Q(is_active=True),
+                name='store_prod_fabric_lower_idx',
+            ),
+            models.Index(
+                fields=['-percentage_price'], condition=models.Q(is_active=True, percentage_price__gt=0),
+                name='store_prod_discount_idx',
+            ),
+            # Sitemaps / feeds / exports: what changed since version n
+            models.Index(fields=['version'], name='store_prod_version_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.product_code})"
@@ -103,19 +141,29 @@ class Product(models.Model):
 
         # Auto-generate unique product_code
         if not self.product_code:
-            prefix = f"{self.product_type[:3].upper()}-{self.piece_type[0]}P"
-            unique_id = uuid.uuid4().hex[:5].upper()
-            self.product_code = f"{prefix}-{unique_id}"
+            self.product_code = self.generate_code(self.product_type, self.piece_type)
 
         # Auto-calculate discount percentage
-        if self.discount_price and self.discount_price < self.price:
-            self.percentage_price = round(
-                (1 - (self.discount_price / self.price)) * 100, 2
-            )
-        else:
-            self.percentage_price = 0
-
-        super().save(*args, **kwargs)
+        self.percentage_price = self.discount_percent(self.price, self.discount_price)
+
+        with transaction.atomic():
+            self.version = CatalogVersion.claim()["version"]
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version", "updated_at"}
+            super().save(*args, **kwargs)
+
+    @staticmethod
+    def generate_code(product_type, piece_type):
+        prefix = f"{product_type[:3].upper()}-{piece_type[0]}P"
+        unique_id = uuid.uuid4().hex[:5].upper()
+        return f"{prefix}-{unique_id}"
+
+    @staticmethod
+    def discount_percent(price, discount_price):
+        if discount_price and discount_price < price:
+            return round((1 - (discount_price / price)) * 100, 2)
+        return 0
 
     # === Pricing Helpers ===
     @property
@@ -131,13 +179,167 @@ class Product(models.Model):
     # === Extra Helpers ===
     @property
     def average_rating(self):
-        return self.reviews.aggregate(Avg('rating'))['rating__avg'] or 0
+        return self.rating_average
+
+    @classmethod
+    def add_ratings(cls, product_id, count, total):
+        """Apply a review count/rating-sum delta with a single UPDATE."""
+        if not count and not total:
+            return
+        new_count = F("rating_count") + count
+        new_sum = F("rating_sum") + total
+        with transaction.atomic():
+            cls.objects.filter(pk=product_id).update(
+                rating_count=new_count,
+                rating_sum=new_sum,
+                rating_average=Case(
+                    When(rating_count__lte=-count, then=Value(0.0)),
+                    default=Cast(new_sum, models.FloatField()) / new_count,
+                    output_field=models.FloatField(),
+                ),
+                **CatalogVersion.claim(),
+            )
+
+    @classmethod
+    def rebuild_ratings(cls, queryset=None):
+        """Recompute rating columns from the reviews table."""
+        from .facets import invalidate_facets
+
+        reviews = Review.objects.filter(product=OuterRef("pk")).order_by().values("product")
+        queryset = cls.objects.all() if queryset is None else queryset
+        bump_all_products()
+        invalidate_facets()
+        with transaction.atomic():
+            return queryset.update(
+                rating_count=Coalesce(Subquery(reviews.annotate(n=Count("id")).values("n")), 0),
+                rating_sum=Coalesce(Subquery(reviews.annotate(n=Sum("rating")).values("n")), 0),
+                rating_average=Coalesce(
+                    Subquery(reviews.annotate(n=Avg("rating")).values("n")), Value(0.0),
+                    output_field=models.FloatField(),
+                ),
+                **CatalogVersion.claim(),
+            )
+
+    @classmethod
+    def touch(cls, product_ids):
+        """Record a change to ``product_ids`` (new version and ``updated_at``) without other edits."""
+        with transaction.atomic(savepoint=False):
+            return cls.objects.filter(pk__in=list(product_ids)).update(**CatalogVersion.claim())
 
     @property
     def is_low_stock(self):
         return self.stock < 5
 
 
+# -----------------------------
+# Catalog version
+# -----------------------------
+class CatalogVersion(models.Model):
+    """
+    One row per catalog change; the row's autoincrement id is the version,
+    stored in ``Product.version`` of the products the change touched.
+
+    ``claim()`` is a plain INSERT, so writers never queue on a shared row and
+    may claim anywhere in their transaction. Versions increase in claim
+    order, but where the database runs writers concurrently a transaction
+    can commit after one holding a later version: ``version__gt=n`` selects
+    what changed after version ``n`` was claimed, not necessarily everything
+    committed since it was read. Consumers that must not miss a change
+    compare ``fingerprint()`` instead, which also moves when such a late
+    claim commits. Only the last ``KEEP`` rows are kept.
+    ``CatalogVersion.current()`` is the cheap lookup for cache keys.
+    """
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    CACHE_KEY = "store:catalog:version"
+    CACHE_TIMEOUT = 60
+    KEEP = 1000
+
+    def __str__(self):
+        return f"Catalog version {self.pk}"
+
+    @classmethod
+    def claim(cls):
+        """
+        Take the next version for the current transaction. Returns the
+        ``{"version", "updated_at"}`` to write on the changed products.
+        """
+        now = timezone.now()
+        version = cls.objects.create(changed_at=now).pk
+        cache.delete(cls.CACHE_KEY)
+        transaction.on_commit(lambda: cls._committed(version))
+        return {"version": version, "updated_at": now}
+
+    @classmethod
+    def _committed(cls, version):
+        if version % cls.KEEP == 0:
+            cls.objects.filter(pk__lte=version - cls.KEEP).delete()
+        cache.delete(cls.CACHE_KEY)
+
+    @classmethod
+    def read(cls):
+        """``(version, changed_at, fingerprint)`` straight from the database."""
+        row = cls.objects.aggregate(last=Max("pk"), changed_at=Max("changed_at"), first=Min("pk"), rows=Count("pk"))
+        version = row["last"] or 0
+        return version, row["changed_at"], f"{row['first'] or 0}-{version}-{row['rows']}"
+
+    @classmethod
+    def _cached(cls):
+        value = cache.get(cls.CACHE_KEY)
+        if value is None:
+            value = cls.read()
+            cache.add(cls.CACHE_KEY, value, cls.CACHE_TIMEOUT)
+        return value
+
+    @classmethod
+    def current(cls):
+        """``(version, changed_at)`` of the catalog; a cache hit on most calls."""
+        return cls._cached()[:2]
+
+    @classmethod
+    def fingerprint(cls):
+        """
+        A string that changes with every committed claim, including one that
+        commits after a later version (and with every prune); cached.
+        """
+        return cls._cached()[2]
+
+
+# -----------------------------
+# Search index (see store/search.py)
+# -----------------------------
+class SearchDocumentField(models.TextField):
+    """The FTS5 hidden column named after its table; supports ``__match``."""
+
+
+@SearchDocumentField.register_lookup
+class FullTextMatch(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class ProductSearchIndex(models.Model):
+    """
+    The SQLite FTS5 table over product names and descriptions, created by
+    ``install_search_index`` (not by migrations). Searches join it on
+    ``rowid`` so bm25 (``rank``) is computed once per matching row.
+    """
+    product = models.OneToOneField(
+        Product, primary_key=True, db_column="rowid", db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name="search_index",
+    )
+    document = SearchDocumentField(db_column="store_product_fts")
+    rank = models.FloatField()  # bm25, lower is better
+
+    class Meta:
+        managed = False
+        db_table = "store_product_fts"
+
+
 # -----------------------------
 # Wishlist
 # -----------------------------
@@ -152,14 +354,6 @@ class Wishlist(models.Model):
 # -----------------------------
 # Order
 # -----------------------------
-from django.db import models
-from django.contrib.auth.models import User
-from django.db.models import Sum
-
-from django.db import models
-from django.contrib.auth.models import User
-from django.db.models import Sum
-
 class Order(models.Model):
     STATUS_CHOICES = [
         ("Pending", "Pending"),
@@ -195,37 +389,212 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # "My orders" page
+            models.Index(fields=['user', '-created_at'], name='store_order_user_new_idx'),
+            # Status counts / revenue by status and date range
+            models.Index(fields=['status', 'created_at'], name='store_order_status_date_idx'),
+            # Per-day sales rollup rebuilds
+            models.Index(fields=['created_at'], name='store_order_created_idx'),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_state()
+        return instance
+
+    def _remember_state(self):
+        # Snapshot of the persisted status/total, used for ledger deltas and
+        # transition hooks on the next save without re-fetching the row.
+        self._loaded_state = {
+            "status": self.__dict__.get("status"),
+            "total_amount": self.__dict__.get("total_amount"),
+        }
+
+    def _persisted_state(self):
+        if self._state.adding:
+            return None, 0
+        state = getattr(self, "_loaded_state", None)
+        if state is None or None in state.values():
+            state = Order.objects.filter(pk=self.pk).values("status", "total_amount").first()
+            if state is None:
+                return None, 0
+        return state["status"], state["total_amount"]
+
     def calculate_total(self):
         return sum(item.get_total() for item in self.items.all())
 
     def save(self, *args, **kwargs):
-        is_new = self.pk is None
+        old_status, old_total = self._persisted_state()
+        new_status, new_total = self.status, self.total_amount
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and old_status is not None:
+            if "status" not in update_fields:
+                new_status = old_status
+            if "total_amount" not in update_fields:
+                new_total = old_total
+
+        if old_status == new_status and old_total == new_total:
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                OrderLedgerEntry.record(self.created_at, old_status, old_total, new_status, new_total)
+                if old_status != new_status:
+                    run_status_hooks(self, old_status, new_status)
 
-        if not is_new:
-            old_order = Order.objects.get(pk=self.pk)
-            old_status = old_order.status
+        self._remember_state()
 
-            if old_status != "Cancelled" and self.status == "Cancelled":
-                for item in self.items.all():
-                    if item.product:
-                        item.product.stock += item.quantity
-                        item.product.save()
 
-        super().save(*args, **kwargs)
+# -----------------------------
+# Revenue Ledger
+# -----------------------------
+class OrderLedgerEntry(models.Model):
+    """
+    Order count and revenue deltas per order status, bucketed by the day the
+    order was placed.
+
+    ``Order.save`` (and order deletion) only ever *inserts* entries, so
+    concurrent checkouts and status changes never contend on a shared
+    counter row. ``totals`` sums the entries; ``compact`` folds them into
+    one entry per (day, status) so the sums stay cheap.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    order_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "Order ledger entries"
+        indexes = [models.Index(fields=["status", "day"], name="store_ledger_status_day_idx")]
 
-        self.total_amount = self.calculate_total()
-        super().save(update_fields=["total_amount"])
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.order_count:+} orders, {self.total_amount:+}"
+
+    @classmethod
+    def changes(cls, day, old_status, old_total, new_status, new_total):
+        """Unsaved entries moving one order from (old status, total) to (new status, total)."""
+        if old_status == new_status:
+            delta = (new_total or 0) - (old_total or 0)
+            return [cls(day=day, status=new_status, total_amount=delta)] if delta else []
+        entries = []
+        if old_status is not None:
+            entries.append(cls(day=day, status=old_status, order_count=-1, total_amount=-(old_total or 0)))
+        if new_status is not None:
+            entries.append(cls(day=day, status=new_status, order_count=1, total_amount=new_total or 0))
+        return entries
+
+    @classmethod
+    def record(cls, created_at, old_status, old_total, new_status, new_total):
+        entries = cls.changes(timezone.localdate(created_at), old_status, old_total, new_status, new_total)
+        if entries:
+            cls.objects.bulk_create(entries)
+
+    @classmethod
+    def totals(cls, start=None, end=None):
+        """``{status: (order count, revenue)}``, optionally for order days ``start``..``end``."""
+        entries = cls.objects.all()
+        if start:
+            entries = entries.filter(day__gte=start)
+        if end:
+            entries = entries.filter(day__lte=end)
+        return {
+            row["status"]: (row["count"], row["total"])
+            for row in entries.order_by().values("status").annotate(
+                count=Sum("order_count"), total=Sum("total_amount")
+            )
+        }
+
+    @classmethod
+    def revenue(cls, status="Delivered", start=None, end=None):
+        return cls.totals(start, end).get(status, (0, 0))[1] or 0
+
+    @classmethod
+    def _replace(cls, entries, rows):
+        """Swap ``entries`` for one entry per summed (day, status) row, dropping zeros."""
+        entries.delete()
+        cls.objects.bulk_create([
+            cls(day=row["day"], status=row["status"], order_count=row["count"], total_amount=row["total"] or 0)
+            for row in rows if row["count"] or row["total"]
+        ], batch_size=2000)
+
+    @classmethod
+    def compact(cls):
+        """
+        Fold every (day, status) into a single entry. Entries inserted while
+        this runs are left alone and folded by the next run.
+        """
+        with transaction.atomic():
+            last = cls.objects.order_by("-pk").values_list("pk", flat=True).first()
+            if last is None:
+                return 0
+            entries = cls.objects.filter(pk__lte=last)
+            rows = list(entries.order_by().values("day", "status").annotate(
+                count=Sum("order_count"), total=Sum("total_amount")
+            ))
+            cls._replace(entries, rows)
+            return len(rows)
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute the ledger from the orders table (e.g. after raw SQL edits)."""
+        with transaction.atomic():
+            rows = (
+                Order.objects.order_by().annotate(day=TruncDate("created_at"))
+                .values("day", "status").annotate(count=Count("id"), total=Sum("total_amount"))
+            )
+            cls._replace(cls.objects.all(), list(rows))
 
-        total_revenue = Order.objects.filter(status="Delivered").aggregate(
-            total=Sum("total_amount")
-        )["total"] or 0
 
-        print("Total Revenue from Delivered Orders:", total_revenue)
+# -----------------------------
+# Sales rollups (see store/rollups.py)
+# -----------------------------
+class SalesRollup(models.Model):
+    """
+    Pre-aggregated sales for one time bucket and one dimension value, e.g.
+    (day, 2026-10-01, "product", "42"). Rebuilt per day from the orders table.
+    """
+
+    PERIOD_CHOICES = [
+        ("hour", "Hour"),
+        ("day", "Day"),
+    ]
+    DIMENSION_CHOICES = [
+        ("status", "Order status"),
+        ("product", "Product"),
+        ("region", "City / province"),
+    ]
 
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField()
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=255)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["period", "dimension", "bucket", "key"], name="store_rollup_bucket_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.period} {self.bucket:%Y-%m-%d %H:%M} {self.dimension}={self.key}"
+
+
+class RollupDirtyDay(models.Model):
+    """A day with order events whose rollup rebuild is queued but hasn't started yet."""
+
+    day = models.DateField(primary_key=True)
+    marked_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.day} (marked {self.marked_at:%H:%M:%S})"
 
 
 # -----------------------------
@@ -278,17 +647,105 @@ class Review(models.Model):
     rating = models.PositiveSmallIntegerField(default=5)  # 1-5 stars
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Paginated review list on the product page
+        indexes = [models.Index(fields=['product', '-created_at', '-id'], name='store_review_product_new_idx')]
+
     def __str__(self):
         return f"{self.product.name} - {self.rating} Stars"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_rating()
+        return instance
+
+    def _remember_rating(self):
+        # Persisted (product, rating) pair, so rating aggregates can be moved
+        # by a delta when the review is edited or deleted.
+        self._loaded_rating = (self.__dict__.get("product_id"), self.__dict__.get("rating"))
+
+
+# -----------------------------
+# Recommendations (see store/recommendations.py)
+# -----------------------------
+class ProductNeighbor(models.Model):
+    """One of a product's top-K "customers also bought" neighbours."""
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="neighbors")
+    neighbor = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="neighbor_of")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ["product", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["product", "rank"], name="store_neighbor_rank_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.neighbor_id} ({self.score:.3f})"
+
+
+class ProductNorm(models.Model):
+    """
+    A product's weighted basket count (the norm in its neighbour scores),
+    stored so incremental refreshes don't recount every basket. ``dirty``
+    marks products whose wishlist baskets changed since the last refresh.
+    """
+
+    product = models.OneToOneField(Product, primary_key=True, on_delete=models.CASCADE, related_name="+")
+    norm = models.FloatField(default=0)
+    dirty = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["product"], condition=models.Q(dirty=True), name="store_norm_dirty_idx")]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.norm}"
+
+    @classmethod
+    def mark_dirty(cls, product_ids):
+        """Queue ``product_ids`` for the next incremental refresh (one upsert)."""
+        rows = [cls(product_id=pk, dirty=True) for pk in set(product_ids)]
+        if rows:
+            cls.objects.bulk_create(rows, update_conflicts=True, unique_fields=["product"], update_fields=["dirty"])
+
 
 # -----------------------------
-# Cart Item (Session Based)
+# Cart (see store/cart.py)
 # -----------------------------
+class Cart(models.Model):
+    # Logged-in carts belong to the user; anonymous carts are found through a
+    # signed cookie holding their id.
+    user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True, related_name="cart")
+    item_count = models.PositiveIntegerField(default=0, help_text="Number of lines (for the navbar)")
+    removed_count = models.PositiveIntegerField(
+        default=0, help_text="Lines dropped because their product was deleted, not yet shown to the buyer"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # purge_carts
+            models.Index(fields=['updated_at'], condition=models.Q(user__isnull=True), name='store_cart_anon_idx'),
+        ]
+
+    def __str__(self):
+        return f"Cart #{self.pk} ({self.user or 'anonymous'})"
+
+
 class CartItem(models.Model):
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["cart", "product"], name="store_cartitem_uniq"),
+        ]
+
     @property
     def price(self):
         return self.product.discount_price or self.product.price
@@ -298,10 +755,46 @@ class CartItem(models.Model):
         return self.price * self.quantity
 
 
-
 # -----------------------------
-# Profile (Session Based)
+# Background Job (see store/jobs.py)
 # -----------------------------
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    task = models.CharField(max_length=100)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    idempotency_key = models.CharField(max_length=200, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        ordering = ["run_after", "id"]
+        indexes = [models.Index(fields=["status", "run_after"], name="store_job_ready_idx")]
+        constraints = [
+            # Only one live job per idempotency key; finished jobs don't block re-enqueueing.
+            models.UniqueConstraint(
+                fields=["idempotency_key"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="store_job_live_key_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
 
 
+# -----------------------------
+# Profile (Session Based)
+# -----------------------------
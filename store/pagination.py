@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = "store.pagination.cursor"
+
+
+# -----------------------------
+# Keyset (cursor) pagination
+# -----------------------------
+# Pages are keyed on (-created_at, -id) — the default Product ordering plus a
+# tiebreaker — so page N costs the same as page 1: no OFFSET and no COUNT(*).
+# Cursors are signed, opaque tokens carrying the boundary row's key.
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def encode_cursor(obj, direction):
+    return signing.dumps([obj.created_at.isoformat(), obj.pk, direction], salt=CURSOR_SALT)
+
+
+def decode_cursor(token):
+    """Return ``(created_at, pk, direction)`` or ``None`` for a bad token."""
+    try:
+        created_at, pk, direction = signing.loads(token, salt=CURSOR_SALT)
+        return datetime.fromisoformat(created_at), int(pk), direction
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, per_page=8):
+    """
+    Return the ``KeysetPage`` after (or before) ``cursor``.
+
+    ``queryset`` must be unordered or ordered by ``-created_at``; it's
+    re-ordered on ``(-created_at, -id)``.
+    """
+    key = decode_cursor(cursor) if cursor else None
+    backwards = key is not None and key[2] == "prev"
+
+    if key:
+        created_at, pk, _ = key
+        if backwards:
+            queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+        else:
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+    ordering = ("created_at", "pk") if backwards else ("-created_at", "-pk")
+    rows = list(queryset.order_by(*ordering)[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if backwards:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, key is not None
+
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], "next") if rows and has_next else None,
+        previous_cursor=encode_cursor(rows[0], "prev") if rows and has_previous else None,
+    )
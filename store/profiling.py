@@ -0,0 +1,236 @@
+import contextvars
+import functools
+import json
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+# -----------------------------
+# Per-view profiling
+# -----------------------------
+# Configured through ``settings.STORE_PROFILER``:
+#
+#   ENABLED        record stats for every request (default: DEBUG)
+#   LOG_FILE       append one JSON line per request to this path
+#   QUERY_BUDGETS  {url_name: max_queries}
+#   STRICT         raise QueryBudgetExceeded when a budget is blown (tests)
+#   SAMPLES        requests kept per URL name for percentiles (default 200)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "LOG_FILE": None,
+    "QUERY_BUDGETS": {},
+    "STRICT": False,
+    "SAMPLES": 200,
+}
+
+_current = contextvars.ContextVar("store_profile", default=None)
+_stats = defaultdict(lambda: deque(maxlen=profiler_settings()["SAMPLES"]))
+_stats_lock = threading.Lock()
+_NUMBERS = re.compile(r"\b\d+\b")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def profiler_settings():
+    config = dict(DEFAULTS, ENABLED=settings.DEBUG)
+    config.update(getattr(settings, "STORE_PROFILER", {}))
+    return config
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = []
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # ``connection.execute_wrapper`` hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.db_time += elapsed
+            self.queries.append(sql)
+
+    def duplicates(self):
+        """Statements repeated with only parameters changing (N+1 suspects)."""
+        shapes = Counter(_NUMBERS.sub("?", sql) for sql in self.queries)
+        return {sql: n for sql, n in shapes.items() if n > 1}
+
+
+def _profile_query(execute, sql, params, many, context):
+    # Installed on every connection; a no-op unless a request is being profiled.
+    # The active profile is a context variable, so queries the async views run
+    # through sync_to_async (on another thread's connection) are counted too.
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile(execute, sql, params, many, context)
+
+
+def _add_query_hook(connection, **kwargs):
+    if _profile_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_profile_query)
+
+
+def install_query_hook():
+    connection_created.connect(_add_query_hook, dispatch_uid="store.profiling")
+    for connection in connections.all():
+        _add_query_hook(connection)
+
+
+def _install_template_timer():
+    """Time top-level ``Template.render`` calls for the active profile."""
+    original = Template.render
+    if getattr(original, "_store_profiled", False):
+        return
+
+    @functools.wraps(original)
+    def render(self, context):
+        profile = _current.get()
+        if profile is None:
+            return original(self, context)
+        profile.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            profile.template_depth -= 1
+            if not profile.template_depth:
+                profile.template_time += time.perf_counter() - start
+
+    render._store_profiled = True
+    Template.render = render
+
+
+def record(sample):
+    with _stats_lock:
+        _stats[sample["view"]].append(sample)
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def summary():
+    """Aggregated stats per URL name, slowest p95 first."""
+    with _stats_lock:
+        snapshot = {view: list(samples) for view, samples in _stats.items()}
+
+    rows = []
+    for view, samples in snapshot.items():
+        latencies = [s["total_ms"] for s in samples]
+        rows.append({
+            "view": view,
+            "requests": len(samples),
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "avg_queries": sum(s["queries"] for s in samples) / len(samples),
+            "max_queries": max(s["queries"] for s in samples),
+            "duplicate_queries": max(s["duplicates"] for s in samples),
+            "avg_db_ms": sum(s["db_ms"] for s in samples) / len(samples),
+            "avg_template_ms": sum(s["template_ms"] for s in samples) / len(samples),
+            "worst_duplicates": max(samples, key=lambda s: s["duplicates"])["duplicate_sql"],
+        })
+    return sorted(rows, key=lambda r: r["p95_ms"], reverse=True)
+
+
+class QueryProfilerMiddleware:
+    """
+    Records query count, duplicate queries, DB time, template time and total
+    latency per URL name. See ``summary()`` and the staff profiling page.
+    Works under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        _install_template_timer()
+        install_query_hook()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        config = profiler_settings()
+        if not config["ENABLED"]:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, profile, time.perf_counter() - start, config)
+
+    async def __acall__(self, request):
+        config = profiler_settings()
+        if not config["ENABLED"]:
+            return await self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, profile, time.perf_counter() - start, config)
+
+    def _finish(self, request, response, profile, total, config):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else None) or request.path
+        duplicates = profile.duplicates()
+        sample = {
+            "view": view,
+            "path": request.path,
+            "method": request.method,
+            "status": response.status_code,
+            "queries": len(profile.queries),
+            "duplicates": sum(n - 1 for n in duplicates.values()),
+            "duplicate_sql": sorted(duplicates, key=duplicates.get, reverse=True)[:3],
+            "db_ms": round(profile.db_time * 1000, 2),
+            "template_ms": round(profile.template_time * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+        }
+        record(sample)
+
+        if config["LOG_FILE"]:
+            with open(config["LOG_FILE"], "a", encoding="utf-8") as log:
+                log.write(json.dumps(sample) + "\n")
+
+        budget = config["QUERY_BUDGETS"].get(view)
+        if budget is not None and sample["queries"] > budget:
+            message = f"{view} ran {sample['queries']} queries (budget {budget})"
+            if config["STRICT"]:
+                raise QueryBudgetExceeded(message)
+            response.headers["X-Query-Budget-Exceeded"] = message
+
+        return response
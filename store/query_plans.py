@@ -0,0 +1,113 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.http import QueryDict
+from django.utils import timezone
+
+from .models import Category, Order, Product, Review, SalesRollup
+
+# -----------------------------
+# Hot query plans
+# -----------------------------
+# Each entry is (name, expected index, queryset builder). Builders reproduce
+# the querysets the storefront runs, with sample values from the database
+# where they exist. ``check_plans`` EXPLAINs every one: a full table scan is a
+# failure, an index other than the expected one is reported but allowed
+# (``None`` means any index will do).
+
+_FULL_SCAN = {
+    "sqlite": re.compile(r"\bSCAN (?!CONSTANT)\S+(?: AS \S+)?$", re.MULTILINE),
+    "postgresql": re.compile(r"\bSeq Scan on\b"),
+    "mysql": re.compile(r"\btype: ALL\b|\bFull scan\b", re.IGNORECASE),
+}
+
+
+def _sample(queryset, field, default):
+    value = queryset.values_list(field, flat=True).first()
+    return value if value is not None else default
+
+
+def _catalog(**params):
+    from .views import catalog_queryset
+
+    query = QueryDict(mutable=True)
+    query.update(params)
+    return catalog_queryset(query)[0]
+
+
+def hot_queries():
+    category = _sample(Category.objects.order_by("pk"), "slug", "sample")
+    fabric = _sample(Product.objects.exclude(fabric="").order_by("pk"), "fabric", "lawn")
+    product_id = _sample(Product.objects.order_by("pk"), "pk", 0)
+    user_id = _sample(User.objects.order_by("pk"), "pk", 0)
+    since = timezone.now() - timedelta(days=30)
+
+    return [
+        ("product_list", "store_prod_active_new_idx",
+         lambda: _catalog()[:8]),
+        ("product_list?category", "store_prod_active_cat_idx",
+         lambda: _catalog(category=category)[:8]),
+        ("product_list?fabric", "store_prod_fabric_lower_idx",
+         lambda: _catalog(fabric=fabric)[:8]),
+        ("discounted_products", "store_prod_discount_idx",
+         lambda: Product.objects.filter(is_active=True, stock__gt=0, percentage_price__gt=0)
+         .order_by("-percentage_price").values_list("id", flat=True)[:10]),
+        ("product_reviews", "store_review_product_new_idx",
+         lambda: Review.objects.filter(product_id=product_id).select_related("user")
+         .order_by("-created_at", "-pk")[:10]),
+        # unique (product, rank); SQLite names it sqlite_autoindex_*
+        ("related_products", None,
+         lambda: Product.objects.filter(neighbor_of__product_id=product_id, is_active=True)
+         .order_by("neighbor_of__rank")[:4]),
+        ("my_orders", "store_order_user_new_idx",
+         lambda: Order.objects.filter(user_id=user_id).order_by("-created_at")),
+        ("rollup_day", "store_order_created_idx",
+         lambda: Order.objects.filter(created_at__gte=since, created_at__lt=since + timedelta(days=1))
+         .order_by().values("status").annotate(n=Count("id"))),
+        # unique (period, dimension, bucket, key)
+        ("dashboard_rollups", None,
+         lambda: SalesRollup.objects.filter(period="day", dimension="product", bucket__gte=since)
+         .values("key").annotate(revenue=Sum("revenue")).order_by("-revenue")[:10]),
+        ("orders_by_status", "store_order_status_date_idx",
+         lambda: Order.objects.filter(status="Delivered", created_at__gte=since).order_by()
+         .values("status").annotate(n=Count("id"), revenue=Sum("total_amount"))),
+    ]
+
+
+def explain(queryset):
+    """EXPLAIN output for ``queryset``; on PostgreSQL with seq scans disabled,
+    so tiny dev/test tables still show which index *would* be used."""
+    if connection.vendor != "postgresql":
+        return queryset.explain()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+
+def full_scans(plan):
+    pattern = _FULL_SCAN.get(connection.vendor)
+    return pattern.findall(plan) if pattern else []
+
+
+def check_plans(only=None):
+    """
+    ``[(name, expected_index, status, plan)]`` for every hot query, where
+    status is ``"ok"``, ``"other-index"`` or ``"full-scan"``.
+    """
+    results = []
+    for name, index, build in hot_queries():
+        if only and name not in only:
+            continue
+        plan = explain(build())
+        if full_scans(plan):
+            status = "full-scan"
+        elif index and index not in plan:
+            status = "other-index"
+        else:
+            status = "ok"
+        results.append((name, index, status, plan))
+    return results
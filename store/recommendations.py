@@ -0,0 +1,200 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import OrderItem, Product, ProductNeighbor, ProductNorm, Wishlist
+
+# -----------------------------
+# "Customers also bought" index
+# -----------------------------
+# Products are vectors over baskets (orders and wishlists); two products are
+# neighbours when they share baskets. Scores are the cosine similarity of the
+# weighted vectors:
+#
+#   score(a, b) = sum_s w_s * co_s(a, b) / sqrt(norm(a) * norm(b))
+#   norm(p)     = sum_s w_s * baskets_s(p)
+#
+# Only the top TOP_K neighbours per product are stored, so serving them is
+# one lookup on (product, rank). Norms are stored too (``ProductNorm``):
+# an incremental refresh recounts only the products in new orders or edited
+# wishlists, then rescores them and every product that ranks one of them.
+
+TOP_K = 12
+SOURCE_WEIGHTS = {
+    "orders": 1.0,
+    "wishlists": 0.5,
+}
+BATCH_SIZE = 2000
+
+
+def _baskets(source, product_ids=None):
+    """``(basket_id, product_id)`` pairs grouped by basket, streamed in chunks."""
+    if source == "orders":
+        rows = OrderItem.objects.filter(product__isnull=False)
+        basket, item = "order_id", "product_id"
+    else:
+        rows = Wishlist.products.through.objects.all()
+        basket, item = "wishlist_id", "product_id"
+    if product_ids is not None:
+        # Only baskets touching the products being refreshed
+        touching = rows.filter(**{f"{item}__in": product_ids}).values(basket)
+        rows = rows.filter(**{f"{basket}__in": touching})
+    pairs = rows.order_by(basket).values_list(basket, item).iterator(chunk_size=BATCH_SIZE)
+    for _, group in groupby(pairs, key=itemgetter(0)):
+        yield {product_id for _, product_id in group}
+
+
+def _basket_counts(source, product_ids=None):
+    """``{product_id: number of baskets containing it}`` (for all products or ``product_ids``)."""
+    if source == "orders":
+        rows = OrderItem.objects.filter(product__isnull=False)
+        basket = "order_id"
+    else:
+        rows = Wishlist.products.through.objects.all()
+        basket = "wishlist_id"
+    if product_ids is not None:
+        rows = rows.filter(product_id__in=list(product_ids))
+    rows = rows.values("product_id").annotate(n=Count(basket, distinct=source == "orders"))
+    return {row["product_id"]: row["n"] for row in rows.order_by()}
+
+
+def basket_norms(product_ids=None):
+    """``{product_id: norm}`` counted from the baskets."""
+    norms = Counter()
+    for source, weight in SOURCE_WEIGHTS.items():
+        for product_id, n in _basket_counts(source, product_ids).items():
+            norms[product_id] += weight * n
+    return norms
+
+
+def save_norms(norms, product_ids=None):
+    """Store ``norms`` (products in ``product_ids`` without baskets get 0) and clear their dirty marks."""
+    product_ids = norms.keys() if product_ids is None else product_ids
+    ProductNorm.objects.bulk_create(
+        [ProductNorm(product_id=pk, norm=norms.get(pk, 0), dirty=False) for pk in product_ids],
+        update_conflicts=True, unique_fields=["product"], update_fields=["norm", "dirty"], batch_size=BATCH_SIZE,
+    )
+
+
+def stored_norms(product_ids):
+    """Stored norms for ``product_ids``; any not stored yet are counted and saved."""
+    product_ids = set(product_ids)
+    norms = dict(ProductNorm.objects.filter(product_id__in=list(product_ids)).values_list("product_id", "norm"))
+    missing = product_ids - norms.keys()
+    if missing:
+        counted = basket_norms(missing)
+        save_norms(counted, missing)
+        norms.update((pk, counted.get(pk, 0)) for pk in missing)
+    return norms
+
+
+def compute_neighbors(product_ids=None, top_k=TOP_K, norms=None):
+    """
+    ``{product_id: [(neighbor_id, score), ...]}`` best first, for every product
+    (or just ``product_ids``) that shares at least one basket with another.
+
+    ``norms`` defaults to counting every basket for a full run and to the
+    stored norms (``ProductNorm``) when refreshing ``product_ids``.
+    """
+    targets = None if product_ids is None else set(product_ids)
+    co = defaultdict(Counter)
+
+    for source, weight in SOURCE_WEIGHTS.items():
+        for basket in _baskets(source, None if targets is None else list(targets)):
+            if len(basket) < 2:
+                continue
+            for a in basket if targets is None else basket & targets:
+                row = co[a]
+                for b in basket:
+                    if b != a:
+                        row[b] += weight
+
+    if norms is None:
+        norms = basket_norms() if targets is None else stored_norms({*co, *(b for row in co.values() for b in row)})
+
+    neighbors = {}
+    for a, row in co.items():
+        scored = ((b, shared / math.sqrt(norms[a] * norms[b])) for b, shared in row.items() if norms[a] and norms[b])
+        neighbors[a] = heapq.nlargest(top_k, scored, key=lambda pair: (pair[1], -pair[0]))
+    return neighbors
+
+
+def last_refresh():
+    return ProductNeighbor.objects.aggregate(at=Max("computed_at"))["at"]
+
+
+def changed_products(since):
+    """Products bought in orders placed since ``since``."""
+    return set(
+        OrderItem.objects.filter(order__created_at__gte=since, product__isnull=False)
+        .values_list("product_id", flat=True).distinct()
+    )
+
+
+@transaction.atomic
+def refresh_neighbors(product_ids=None, top_k=TOP_K):
+    """
+    Recompute and store neighbours for ``product_ids`` (all products when
+    ``None``). Returns the number of products refreshed.
+    """
+    now = timezone.now()
+    norms = None
+    if product_ids is None:
+        norms = basket_norms()
+        ProductNorm.objects.all().delete()
+        save_norms(norms)
+    neighbors = compute_neighbors(product_ids, top_k, norms)
+
+    stale = ProductNeighbor.objects.all()
+    if product_ids is not None:
+        stale = stale.filter(product_id__in=list(product_ids))
+    stale.delete()
+
+    ProductNeighbor.objects.bulk_create(
+        [
+            ProductNeighbor(product_id=a, neighbor_id=b, rank=rank, score=score, computed_at=now)
+            for a, row in neighbors.items()
+            for rank, (b, score) in enumerate(row)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    return len(neighbors)
+
+
+@transaction.atomic
+def refresh_recommendations(full=False):
+    """
+    Incremental refresh. Products in orders placed since the last run or in
+    edited wishlists (their partners are in the same baskets, so they're
+    included too) get their norms recounted. They are rescored along with
+    every product that currently ranks one of them, since a changed norm
+    moves those scores as well. Falls back to a full rebuild on the first
+    run or with ``full=True``.
+
+    A norm that *drops* (deleted orders, wishlist removals) can't raise a
+    product into a list it isn't already in until the next full rebuild.
+    """
+    since = None if full else last_refresh()
+    if since is None:
+        return refresh_neighbors()
+    changed = changed_products(since)
+    changed |= set(ProductNorm.objects.filter(dirty=True).values_list("product_id", flat=True))
+    if not changed:
+        return 0
+    save_norms(basket_norms(changed), changed)
+    ranking = ProductNeighbor.objects.filter(neighbor_id__in=list(changed)).values_list("product_id", flat=True)
+    return refresh_neighbors(changed | set(ranking))
+
+
+def recommended_products(product, limit):
+    """Active neighbours of ``product`` in rank order (one indexed lookup)."""
+    return list(
+        Product.objects.filter(neighbor_of__product=product, is_active=True)
+        .order_by("neighbor_of__rank")[:limit]
+    )
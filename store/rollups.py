@@ -0,0 +1,211 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import Order, OrderItem, Product, RollupDirtyDay, SalesRollup
+
+# -----------------------------
+# Sales rollups
+# -----------------------------
+# The dashboard never touches the orders table. Order events mark the order's
+# (local) day dirty; a background job then rebuilds that day's rollup rows:
+#
+#   hour + day  x  status   orders, units, revenue (order totals)
+#   day         x  product  orders, units, revenue (item price x qty)
+#   day         x  region   orders, units, revenue (order totals)
+#
+# Product and region rows only count orders that aren't cancelled.
+# Rebuilding a whole day is idempotent, so late or duplicate jobs are harmless.
+
+CANCELLED = "Cancelled"
+REBUILD_DELAY = 30  # seconds; lets a burst of order events share one rebuild
+MARK_TIMEOUT = 60 * 60  # a mark this old belongs to a rebuild that never ran
+
+
+def local_day(value):
+    return timezone.localtime(value).date()
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def region_label(city, province):
+    parts = [part.strip().title() for part in (city, province) if part and part.strip()]
+    return ", ".join(parts) or "Unknown"
+
+
+# -----------------------------
+# Maintenance
+# -----------------------------
+def rebuild_day(day):
+    """Recompute every rollup row for ``day`` (a ``date`` in the current timezone)."""
+    start, end = day_bounds(day)
+    orders = Order.objects.filter(created_at__gte=start, created_at__lt=end).order_by()
+    items = OrderItem.objects.filter(order__created_at__gte=start, order__created_at__lt=end).order_by()
+    sold_items = items.exclude(order__status=CANCELLED)
+
+    rows = defaultdict(lambda: [0, 0, Decimal("0")])  # (period, bucket, dimension, key) -> totals
+
+    def add(buckets, dimension, key, orders=0, units=0, revenue=0):
+        for period, bucket in buckets:
+            row = rows[(period, bucket, dimension, key)]
+            row[0] += orders
+            row[1] += units
+            row[2] += revenue or 0
+
+    for r in orders.annotate(hour=TruncHour("created_at")).values("hour", "status").annotate(
+        n=Count("id"), revenue=Sum("total_amount")
+    ):
+        add([("hour", r["hour"]), ("day", start)], "status", r["status"], orders=r["n"], revenue=r["revenue"])
+    for r in items.annotate(hour=TruncHour("order__created_at")).values("hour", "order__status").annotate(
+        units=Sum("quantity")
+    ):
+        add([("hour", r["hour"]), ("day", start)], "status", r["order__status"], units=r["units"])
+
+    for r in sold_items.filter(product__isnull=False).values("product_id").annotate(
+        n=Count("order_id", distinct=True),
+        units=Sum("quantity"),
+        revenue=Sum(F("price") * F("quantity"), output_field=DecimalField()),
+    ):
+        add([("day", start)], "product", str(r["product_id"]), orders=r["n"], units=r["units"], revenue=r["revenue"])
+
+    for r in orders.exclude(status=CANCELLED).values("city", "province").annotate(
+        n=Count("id"), revenue=Sum("total_amount")
+    ):
+        add([("day", start)], "region", region_label(r["city"], r["province"]), orders=r["n"], revenue=r["revenue"])
+    for r in sold_items.values("order__city", "order__province").annotate(units=Sum("quantity")):
+        add([("day", start)], "region", region_label(r["order__city"], r["order__province"]), units=r["units"])
+
+    with transaction.atomic():
+        SalesRollup.objects.filter(bucket__gte=start, bucket__lt=end).delete()
+        SalesRollup.objects.bulk_create([
+            SalesRollup(period=period, bucket=bucket, dimension=dimension, key=key,
+                        orders=n, units=units, revenue=revenue)
+            for (period, bucket, dimension, key), (n, units, revenue) in rows.items()
+        ], batch_size=2000)
+    return len(rows)
+
+
+def rebuild_all(start=None, end=None, log=None):
+    """
+    Rebuild every day that has orders (optionally only ``start``..``end``).
+
+    Runs in one transaction: readers keep seeing the old rollups until it
+    commits, and a failure leaves them untouched.
+    """
+    log = log or (lambda message: None)
+    orders, stale = Order.objects.all(), SalesRollup.objects.all()
+    if start:
+        orders = orders.filter(created_at__gte=day_bounds(start)[0])
+        stale = stale.filter(bucket__gte=day_bounds(start)[0])
+    if end:
+        orders = orders.filter(created_at__lt=day_bounds(end)[1])
+        stale = stale.filter(bucket__lt=day_bounds(end)[1])
+    with transaction.atomic():
+        days = list(orders.order_by().dates("created_at", "day"))
+        stale.delete()  # also clears days that no longer have orders
+        for day in days:
+            log(f"{day}: {rebuild_day(day)} rows")
+    return len(days)
+
+
+def _queue_rebuild(day):
+    from .jobs import enqueue
+
+    # The mark is a DB row, not a cache key, so the worker process clearing it
+    # is seen by every web process. The job clears it before reading, so
+    # events committed after it started queue another rebuild instead of
+    # being lost.
+    mark, created = RollupDirtyDay.objects.get_or_create(day=day)
+    if not created:
+        now = timezone.now()
+        if mark.marked_at > now - timedelta(seconds=MARK_TIMEOUT):
+            return
+        if not RollupDirtyDay.objects.filter(day=day, marked_at=mark.marked_at).update(marked_at=now):
+            return  # another process re-marked it first
+    enqueue("store.rebuild_sales_rollups", day.isoformat(), delay=REBUILD_DELAY)
+
+
+def mark_dirty(days):
+    """Queue a rollup rebuild for each of ``days`` once the current transaction commits."""
+    for day in set(days):
+        transaction.on_commit(partial(_queue_rebuild, day))
+
+
+def clear_dirty(day):
+    RollupDirtyDay.objects.filter(day=day).delete()
+
+
+# -----------------------------
+# Dashboard queries (rollups only)
+# -----------------------------
+def _rollups(period, dimension, start, end):
+    return SalesRollup.objects.filter(
+        period=period, dimension=dimension,
+        bucket__gte=day_bounds(start)[0], bucket__lt=day_bounds(end)[1],
+    )
+
+
+def sales_summary(start, end, top=10):
+    """Totals, status breakdown, top products and top regions for ``start``..``end`` (dates)."""
+    by_status = list(
+        _rollups("day", "status", start, end).values("key")
+        .annotate(orders=Sum("orders"), units=Sum("units"), revenue=Sum("revenue")).order_by("key")
+    )
+    sold = [row for row in by_status if row["key"] != CANCELLED]
+
+    top_products = list(
+        _rollups("day", "product", start, end).values("key")
+        .annotate(orders=Sum("orders"), units=Sum("units"), revenue=Sum("revenue")).order_by("-revenue")[:top]
+    )
+    names = Product.objects.only("name").in_bulk([int(row["key"]) for row in top_products])
+    for row in top_products:
+        product = names.get(int(row["key"]))
+        row["name"] = product.name if product else f"Deleted product #{row['key']}"
+
+    top_regions = list(
+        _rollups("day", "region", start, end).values("key")
+        .annotate(orders=Sum("orders"), units=Sum("units"), revenue=Sum("revenue")).order_by("-revenue")[:top]
+    )
+
+    return {
+        "orders": sum(row["orders"] for row in by_status),
+        "sold_orders": sum(row["orders"] for row in sold),
+        "units": sum(row["units"] for row in sold),
+        "revenue": sum((row["revenue"] for row in sold), Decimal("0")),
+        "by_status": by_status,
+        "top_products": top_products,
+        "top_regions": top_regions,
+    }
+
+
+def sales_series(start, end, period="day"):
+    """
+    ``[{"bucket", "orders", "revenue", "pct"}]`` for every bucket in range
+    (gaps filled with zeros) for charting; ``pct`` is revenue relative to
+    the best bucket. Cancelled orders are left out.
+    """
+    rows = {
+        row["bucket"]: row
+        for row in _rollups(period, "status", start, end).exclude(key=CANCELLED)
+        .values("bucket").annotate(orders=Sum("orders"), revenue=Sum("revenue")).order_by("bucket")
+    }
+    step = timedelta(hours=1) if period == "hour" else timedelta(days=1)
+    bucket, stop = day_bounds(start)[0], day_bounds(end)[1]
+    series = []
+    while bucket < stop:
+        row = rows.get(bucket, {})
+        series.append({"bucket": bucket, "orders": row.get("orders", 0), "revenue": row.get("revenue") or Decimal("0")})
+        bucket += step
+    best = max((point["revenue"] for point in series), default=0)
+    for point in series:
+        point["pct"] = round(point["revenue"] * 100 / best) if best else 0
+    return series
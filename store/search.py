@@ -0,0 +1,144 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, F, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Product, ProductSearchIndex
+
+
+# -----------------------------
+# Product full-text search
+# -----------------------------
+# SQLite: an FTS5 external-content table (``store_product_fts``) kept in sync
+# with ``store_product`` by triggers, so every write path (save, bulk update,
+# raw SQL) updates the index.
+# Postgres: a GIN expression index over a 'simple' tsvector of name +
+# description, queried with the same expression so the planner can use it.
+# Other backends fall back to the old ``icontains`` filter.
+
+FTS_TABLE = ProductSearchIndex._meta.db_table
+PG_INDEX = "store_product_search_gin"
+
+_PG_VECTOR = (
+    "to_tsvector('simple', coalesce({table}.name, '') || ' ' || coalesce({table}.description, ''))"
+)
+
+_SQLITE_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='{{table}}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {{table}} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {{table}} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description ON {{table}} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+_available = {}
+
+
+def _terms(query):
+    return re.findall(r"\w+", query or "")
+
+
+def install_search_index(using="default", rebuild=False):
+    """
+    Create (or repair) the search index for the ``using`` database.
+
+    Safe to run repeatedly. On SQLite, migrations that rebuild
+    ``store_product`` drop its triggers; when that's detected the FTS table is
+    rebuilt from the product table.
+    """
+    connection = connections[using]
+    table = Product._meta.db_table
+    if table not in connection.introspection.table_names():
+        return
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f"{FTS_TABLE}_%"],
+            )
+            rebuild = rebuild or cursor.fetchone()[0] < 3
+            for statement in _SQLITE_SCHEMA:
+                cursor.execute(statement.format(table=table))
+            if rebuild:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == "postgresql":
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON {table} "
+                f"USING GIN (({_PG_VECTOR.format(table=table)}))"
+            )
+
+    _available.pop(using, None)
+
+
+def search_available(using="default"):
+    if using not in _available:
+        connection = connections[using]
+        if connection.vendor == "postgresql":
+            _available[using] = True
+        elif connection.vendor == "sqlite":
+            _available[using] = FTS_TABLE in connection.introspection.table_names()
+        else:
+            _available[using] = False
+    return _available[using]
+
+
+def _match(queryset, terms):
+    if connections[queryset.db].vendor == "sqlite":
+        # INNER JOIN on the FTS table: one index scan, bm25 once per match
+        match = " ".join(f'"{term}"*' for term in terms)
+        queryset = queryset.filter(search_index__document__match=match)
+        rank = -F("search_index__rank")
+    else:
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        vector = _PG_VECTOR.format(table=Product._meta.db_table)
+        queryset = queryset.filter(
+            RawSQL(f"{vector} @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField())
+        )
+        rank = RawSQL(f"ts_rank({vector}, to_tsquery('simple', %s))", [tsquery])
+    return queryset, rank
+
+
+def filter_by_search(queryset, query):
+    """Filter ``queryset`` to products matching ``query`` without ranking."""
+    terms = _terms(query)
+    if not terms or not search_available(queryset.db):
+        return queryset.filter(Q(name__icontains=query) | Q(description__icontains=query))
+    return _match(queryset, terms)[0]
+
+
+def search_products(queryset, query):
+    """
+    Filter ``queryset`` to products matching ``query``, best matches first.
+
+    Every word is prefix-matched ("kha lawn" finds "Khaddar Lawn Suit") and
+    all words must match. The queryset is annotated with ``search_rank``
+    (higher is better).
+    """
+    terms = _terms(query)
+    if not terms or not search_available(queryset.db):
+        return filter_by_search(queryset, query)
+
+    queryset, rank = _match(queryset, terms)
+    return queryset.annotate(search_rank=rank).order_by("-search_rank", *Product._meta.ordering)
@@ -0,0 +1,174 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cart import drop_product_from_carts
+from .facets import invalidate_facets
+from .fragments import bump_all_products, bump_products
+from .rollups import local_day, mark_dirty
+from .images import get_derivatives
+from .models import CatalogVersion, Category, Order, OrderLedgerEntry, Product, ProductNorm, Review, Wishlist
+from .search import install_search_index
+
+
+# -----------------------------
+# Revenue ledger
+# -----------------------------
+@receiver(post_delete, sender=Order)
+def remove_order_from_ledger(sender, instance, **kwargs):
+    state = getattr(instance, "_loaded_state", None) or {}
+    OrderLedgerEntry.record(
+        instance.created_at,
+        state.get("status") or instance.status,
+        state.get("total_amount") or instance.total_amount,
+        None,
+        None,
+    )
+
+
+# -----------------------------
+# Sales rollups
+# -----------------------------
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def mark_sales_rollup_dirty(sender, instance, raw=False, **kwargs):
+    if not raw and instance.created_at:
+        mark_dirty([local_day(instance.created_at)])
+
+
+# -----------------------------
+# Product rating aggregates
+# -----------------------------
+@receiver(post_save, sender=Review)
+def update_ratings_on_save(sender, instance, created, **kwargs):
+    old_product_id, old_rating = (None, None) if created else getattr(instance, "_loaded_rating", (None, None))
+    if old_product_id == instance.product_id:
+        if instance.rating == old_rating:
+            Product.touch([instance.product_id])  # text-only edit: still a product change
+        else:
+            Product.add_ratings(instance.product_id, 0, instance.rating - old_rating)
+            invalidate_facets()  # min_rating counts
+    else:
+        if old_product_id is not None:
+            Product.add_ratings(old_product_id, -1, -old_rating)
+        Product.add_ratings(instance.product_id, 1, instance.rating)
+        invalidate_facets()
+    # Review list + rating on every card of the product(s)
+    bump_products({instance.product_id, old_product_id} - {None})
+    instance._remember_rating()
+
+
+@receiver(post_delete, sender=Review)
+def update_ratings_on_delete(sender, instance, **kwargs):
+    product_id, rating = getattr(instance, "_loaded_rating", (instance.product_id, instance.rating))
+    Product.add_ratings(product_id, -1, -rating)
+    bump_products([product_id])
+    invalidate_facets()
+
+
+# -----------------------------
+# Fragment cache
+# -----------------------------
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def bump_product_fragments(sender, instance, **kwargs):
+    bump_products([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_products(sender, instance, created=False, **kwargs):
+    # Renames and deletes change what every product of the category shows
+    # (API payloads, cards); a brand-new category isn't on any product yet.
+    if not created:
+        bump_all_products()
+
+
+# -----------------------------
+# Catalog version
+# -----------------------------
+@receiver(post_delete, sender=Product)
+def bump_catalog_version(sender, **kwargs):
+    CatalogVersion.claim()
+
+
+@receiver(post_save, sender=Category)
+def touch_category_products(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        CatalogVersion.claim()
+    else:
+        Product.touch(Product.objects.filter(category=instance).values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+def touch_products_losing_category(sender, instance, **kwargs):
+    # SET_NULL clears their category with a plain UPDATE, bypassing Product.save
+    Product.touch(Product.objects.filter(category=instance).values_list("pk", flat=True))
+
+
+# -----------------------------
+# Search index
+# -----------------------------
+@receiver(post_migrate)
+def install_product_search(sender, app_config=None, using="default", **kwargs):
+    if app_config is not None and app_config.name == "store":
+        install_search_index(using=using)
+
+
+# -----------------------------
+# Catalog facets
+# -----------------------------
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_facets(sender, **kwargs):
+    invalidate_facets()
+
+
+# -----------------------------
+# Image derivatives
+# -----------------------------
+@receiver(post_save, sender=Product)
+def queue_image_derivatives(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Already-built images are a cache hit; new uploads go to the job queue.
+    for image in (instance.image1, instance.image2):
+        if image:
+            get_derivatives(image)
+
+
+# -----------------------------
+# Recommendations
+# -----------------------------
+@receiver(m2m_changed, sender=Wishlist.products.through)
+def mark_wishlist_products_dirty(sender, instance, action, reverse, pk_set, **kwargs):
+    # Co-occurrence changes for every product in the edited wishlist(s).
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    links = Wishlist.products.through.objects
+    if reverse:
+        wishlists = pk_set if pk_set is not None else links.filter(product_id=instance.pk).values("wishlist_id")
+        products = {instance.pk}
+    else:
+        wishlists, products = [instance.pk], set(pk_set or ())
+    products.update(links.filter(wishlist_id__in=wishlists).values_list("product_id", flat=True))
+    ProductNorm.mark_dirty(products)
+
+
+# -----------------------------
+# Cart
+# -----------------------------
+@receiver(user_logged_in)
+def merge_anonymous_cart(sender, request, user, **kwargs):
+    cart = getattr(request, "cart", None)
+    if cart is not None:
+        cart.merge_anonymous()
+
+
+@receiver(pre_delete, sender=Product)
+def remove_deleted_product_from_carts(sender, instance, **kwargs):
+    drop_product_from_carts(instance.pk)
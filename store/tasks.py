@@ -0,0 +1,68 @@
+from django.db.models import Q
+
+from .jobs import task
+from .models import OrderLedgerEntry, Product
+
+
+# -----------------------------
+# Background tasks
+# -----------------------------
+@task("store.build_image_derivatives")
+def build_image_derivatives(name):
+    from django.db.models.fields.files import ImageFieldFile
+    from .images import generate_derivatives
+
+    # Unreadable images are logged by generate_derivatives; retrying won't help.
+    if generate_derivatives(ImageFieldFile(None, Product._meta.get_field("image1"), name)):
+        # Cached cards rendered the original upload while this was pending.
+        # Stamping the rows reaches web processes that don't share our cache.
+        Product.touch(Product.objects.filter(Q(image1=name) | Q(image2=name)).values_list("pk", flat=True))
+
+
+@task("store.rebuild_ratings")
+def rebuild_ratings():
+    Product.rebuild_ratings()
+
+
+@task("store.rebuild_order_ledger")
+def rebuild_order_ledger():
+    OrderLedgerEntry.rebuild()
+
+
+@task("store.compact_order_ledger")
+def compact_order_ledger():
+    OrderLedgerEntry.compact()
+
+
+@task("store.rebuild_search_index")
+def rebuild_search_index():
+    from .search import install_search_index
+
+    install_search_index(rebuild=True)
+
+
+@task("store.refresh_recommendations")
+def refresh_recommendations(full=False):
+    from .recommendations import refresh_recommendations
+
+    refresh_recommendations(full=full)
+
+
+@task("store.rebuild_sales_rollups")
+def rebuild_sales_rollups(day):
+    from datetime import date
+    from .rollups import clear_dirty, rebuild_day
+
+    day = date.fromisoformat(day)
+    clear_dirty(day)
+    rebuild_day(day)
+
+
+@task("store.build_feeds")
+def build_feeds(full=False):
+    from .feeds import FeedBuildRunning, build_feeds
+
+    try:
+        build_feeds(full=full)
+    except FeedBuildRunning:
+        pass  # the next run picks up anything the running one missed
@@ -0,0 +1,22 @@
+from django import template
+
+from .. import fragments
+
+register = template.Library()
+
+
+@register.filter
+def version_stamp(product):
+    """
+    Cache key part for fragments rendering ``product``:
+
+        {% load cache store_cache %}
+        {% cache fragment_ttl "product_card" product.pk product|version_stamp %}
+    """
+    return fragments.version_stamp(product)
+
+
+@register.filter
+def list_stamp(products):
+    """Cache key part for a fragment rendering a whole list of products."""
+    return fragments.list_stamp(products)
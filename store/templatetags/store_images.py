@@ -0,0 +1,52 @@
+from django import template
+from django.utils.html import format_html
+
+from ..images import get_derivatives
+
+register = template.Library()
+
+
+def _srcset(derivatives, fmt):
+    seen, parts = set(), []
+    for variant in derivatives.values():
+        url, width = variant[fmt]
+        if width not in seen:
+            seen.add(width)
+            parts.append(f"{url} {width}w")
+    return ", ".join(parts)
+
+
+@register.simple_tag
+def responsive_img(image, variant="card", alt="", css_class="", sizes="(max-width: 576px) 100vw, 250px",
+                   loading="lazy"):
+    """
+    ``<picture>`` with WebP and JPEG ``srcset``s for a product image.
+
+        {% load store_images %}
+        {% responsive_img product.image1 "card" alt=product.name css_class="w-100" %}
+
+    Falls back to the original upload if derivatives can't be built.
+    """
+    if not image:
+        return ""
+    derivatives = get_derivatives(image)
+    if not derivatives:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}">', image.url, alt, css_class, loading
+        )
+    return format_html(
+        '<picture style="display: contents">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="{}" decoding="async">'
+        '</picture>',
+        _srcset(derivatives, "webp"), sizes,
+        derivatives[variant]["jpg"][0], _srcset(derivatives, "jpg"), sizes,
+        alt, css_class, loading,
+    )
+
+
+@register.filter
+def srcset(image, fmt="webp"):
+    """``{{ product.image1|srcset:"jpg" }}`` — just the srcset string."""
+    derivatives = get_derivatives(image) if image else None
+    return _srcset(derivatives, fmt) if derivatives else ""
@@ -1,3 +1,1579 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import time
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import Http404
+from django.template import Context, Template
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.signals import template_rendered
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from openpyxl import load_workbook
+from PIL import Image
+
+from . import async_views
+from .benchmark import compare, run_benchmark, seed_catalog
+from .cart import CART_COOKIE, CartStore, ResolvedCart, fill_cart, sign_cart_id
+from .checkout import create_order, reserve_stock
+from .exports import ORDER_COLUMNS, PRODUCT_COLUMNS, export_response, iter_csv, order_rows, product_rows
+from .facets import get_facets
+from .feeds import FeedBuildRunning, build_feeds
+from .fragments import product_versions
+from .images import VARIANTS
+from .imports import import_products, load_dataset
+from .inventory import cancel_orders, restock_products, set_discount
+from .jobs import enqueue, requeue_stale, run_worker, task
+from .query_plans import check_plans, full_scans
+from .rollups import rebuild_all as rebuild_sales_rollups, sales_summary
+from .recommendations import recommended_products, refresh_recommendations
+from .profiling import QueryBudgetExceeded, reset_stats, summary
+from .search import search_products
+from .transitions import _status_hooks, on_status_change
+from .models import (
+    Cart, CartItem, CatalogVersion, Category, Job, Order, OrderItem, OrderLedgerEntry, Product, ProductNeighbor,
+    ProductNorm, Review, SalesRollup, Wishlist,
+)
+
+
+# -------------------------------
+# Cart
+# -------------------------------
+class CartResolutionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = [
+            Product.objects.create(name=f"Lawn Suit {i}", price=Decimal("1000.00"), stock=10)
+            for i in range(30)
+        ]
+
+    def _set_cart(self, cart):
+        # anonymous visitor: the cart id travels in a signed cookie
+        self.cart = fill_cart(Cart.objects.create(), cart)
+        self.client.cookies[CART_COOKIE] = sign_cart_id(self.cart.pk)
+
+    def test_cart_page_prices_lines(self):
+        product = self.products[0]
+        product.discount_price = Decimal("800.00")
+        product.save()
+        self._set_cart({str(product.id): 3, str(self.products[1].id): 2})
+        response = self.client.get(reverse('view_cart'))
+        self.assertEqual(response.context['cart_items'][0]['price'], Decimal("800.00"))
+        self.assertEqual(response.context['total'], Decimal("4400.00"))
+
+    def test_view_cart_query_count_is_independent_of_cart_size(self):
+        self._set_cart({str(p.id): 1 for p in self.products[:2]})
+        with self.assertNumQueries(1):  # lines + products; the navbar count comes from them
+            self.client.get(reverse('view_cart'))
+
+        self._set_cart({str(p.id): 1 for p in self.products})
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('view_cart'))
+        self.assertEqual(len(response.context['cart_items']), 30)
+
+    def test_deleted_products_leave_the_cart(self):
+        deleted = Product.objects.create(name="Gone", price=Decimal("500.00"))
+        self._set_cart({str(self.products[0].id): 1, str(deleted.id): 1})
+        deleted.delete()
+
+        response = self.client.get(reverse('view_cart'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cart_items']), 1)
+        self.assertEqual(response.context['request'].cart.count, 1)
+        self.assertContains(response, "1 item in your cart is no longer available and was removed.")
+        # reported once
+        self.assertNotContains(self.client.get(reverse('view_cart')), "no longer available")
+
+    def test_emptied_cart_still_reports_deleted_products(self):
+        deleted = Product.objects.create(name="Gone", price=Decimal("500.00"))
+        self._set_cart({str(deleted.id): 1})
+        deleted.delete()
+
+        response = self.client.get(reverse('view_cart'))
+
+        self.assertEqual(response.context['cart_items'], [])
+        self.assertContains(response, "no longer available")
+
+    def test_add_and_remove_are_single_row_writes(self):
+        product = self.products[0]
+        self.client.post(reverse('add_to_cart', args=[product.id]), {'quantity': 2})
+        cart = Cart.objects.get()
+        self.assertIsNone(cart.user)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse('add_to_cart', args=[product.id]), {'quantity': 1})
+        writes = [q["sql"] for q in ctx.captured_queries if not q["sql"].startswith("SELECT")]
+        self.assertEqual(len(writes), 2)  # line UPDATE + cart count/timestamp UPDATE
+        self.assertEqual(CartItem.objects.get().quantity, 3)
+        self.assertFalse(self.client.session.get('cart'))
+
+        self.client.post(reverse('add_to_cart', args=[self.products[1].id]))
+        self.assertRegex(self.client.get(reverse('product_list')).content.decode(), r"Cart\s+\(2\)")
+        self.client.get(reverse('remove_from_cart', args=[product.id]))
+        self.assertEqual(dict(CartItem.objects.values_list("product_id", "quantity")), {self.products[1].id: 1})
+        self.assertEqual(Cart.objects.get().item_count, 1)
+
+    def test_navbar_count_follows_writes_from_other_workers(self):
+        self._set_cart({str(self.products[0].id): 1})
+        self.assertRegex(self.client.get(reverse('product_list')).content.decode(), r"Cart\s+\(1\)")
+        # another process adds a line: nothing process-local may keep the old count
+        fill_cart(self.cart, {str(p.id): 1 for p in self.products[:3]})
+        self.assertRegex(self.client.get(reverse('product_list')).content.decode(), r"Cart\s+\(3\)")
+
+    def test_anonymous_cart_merges_on_login(self):
+        user = User.objects.create_user(username="shopper", password="pass")
+        fill_cart(Cart.objects.create(user=user), {self.products[0].id: 1, self.products[1].id: 1})
+        self._set_cart({self.products[0].id: 2, self.products[2].id: 1})
+
+        response = self.client.post(reverse('login'), {'username': "shopper", 'password': "pass"})
+
+        self.assertEqual(response.cookies[CART_COOKIE].value, "")
+        self.assertEqual(Cart.objects.get().user, user)
+        self.assertEqual(
+            dict(CartItem.objects.values_list("product_id", "quantity")),
+            {self.products[0].id: 3, self.products[1].id: 1, self.products[2].id: 1},
+        )
+        self.assertEqual(Cart.objects.get().item_count, 3)
+
+
+# -------------------------------
+# Checkout
+# -------------------------------
+class CheckoutTests(TestCase):
+    checkout_data = {
+        'full_name': "Ayesha Khan",
+        'phone_number': "03001234567",
+        'city': "Lahore",
+        'province': "Punjab",
+        'shipping_address': "12 Mall Road",
+        'payment_method': "COD",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", password="pass")
+        cls.lawn = Product.objects.create(name="Lawn", price=Decimal("1000.00"), stock=5)
+        cls.silk = Product.objects.create(
+            name="Silk", price=Decimal("3000.00"), discount_price=Decimal("2500.00"), stock=2
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _set_cart(self, cart):
+        fill_cart(Cart.objects.get_or_create(user=self.user)[0], cart)
+
+    def test_checkout_creates_order_and_reserves_stock(self):
+        self._set_cart({str(self.lawn.id): 2, str(self.silk.id): 1})
+
+        response = self.client.post(reverse('place_order'), self.checkout_data)
+
+        order = Order.objects.get()
+        self.assertRedirects(response, reverse('order_success', args=[order.id]))
+        self.assertEqual(order.items.count(), 2)
+        self.assertEqual(order.total_amount, Decimal("4500.00"))
+        self.lawn.refresh_from_db()
+        self.silk.refresh_from_db()
+        self.assertEqual(self.lawn.stock, 3)
+        self.assertEqual(self.silk.stock, 1)
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(Cart.objects.get().item_count, 0)
+
+    def test_checkout_that_would_oversell_rolls_back(self):
+        self._set_cart({str(self.lawn.id): 2, str(self.silk.id): 3})
+
+        response = self.client.post(reverse('place_order'), self.checkout_data)
+
+        self.assertRedirects(response, reverse('view_cart'))
+        self.assertFalse(Order.objects.exists())
+        self.lawn.refresh_from_db()
+        self.silk.refresh_from_db()
+        self.assertEqual(self.lawn.stock, 5)
+        self.assertEqual(self.silk.stock, 2)
+        self.assertTrue(CartItem.objects.filter(product=self.silk).exists())
+
+
+# -------------------------------
+# Orders & revenue ledger
+# -------------------------------
+class OrderLedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name="Khaddar", price=Decimal("2000.00"), stock=10)
+
+    def _order(self, total="2000.00", quantity=1):
+        order = Order.objects.create(total_amount=Decimal(total))
+        OrderItem.objects.create(order=order, product=self.product, price=Decimal("2000.00"), quantity=quantity)
+        return order
+
+    def _ledger(self, status):
+        return OrderLedgerEntry.totals().get(status, (0, 0))
+
+    def test_ledger_follows_status_transitions(self):
+        order = self._order()
+        self.assertEqual(self._ledger("Pending"), (1, Decimal("2000.00")))
+
+        order.status = "Delivered"
+        order.save()
+
+        self.assertEqual(self._ledger("Pending"), (0, Decimal("0.00")))
+        self.assertEqual(self._ledger("Delivered"), (1, Decimal("2000.00")))
+        self.assertEqual(OrderLedgerEntry.revenue(), Decimal("2000.00"))
+
+        order.total_amount = Decimal("2500.00")
+        order.save(update_fields=["total_amount"])
+        self.assertEqual(OrderLedgerEntry.revenue(), Decimal("2500.00"))
+
+        order.delete()
+        self.assertEqual(OrderLedgerEntry.revenue(), Decimal("0.00"))
+
+    def test_status_save_only_inserts_ledger_entries(self):
+        for _ in range(20):
+            self._order()
+        order = Order.objects.first()
+        order.status = "Confirmed"
+        with CaptureQueriesContext(connection) as queries:
+            order.save()
+        # savepoint, UPDATE order, INSERT ledger entries, release savepoint
+        self.assertEqual(len(queries), 4)
+        self.assertFalse([q for q in queries if q["sql"].startswith("UPDATE") and "store_orderledgerentry" in q["sql"]])
+        order.full_name = "Ayesha Khan"
+        with self.assertNumQueries(1):  # no transition, no ledger entries, no hooks
+            order.save()
+
+    def test_compact_and_rebuild_match_incremental_ledger(self):
+        self._order()
+        delivered = self._order(total="500.00")
+        delivered.status = "Delivered"
+        delivered.save()
+        cancel_orders(Order.objects.filter(pk=delivered.pk))
+        before = OrderLedgerEntry.totals()
+        self.assertEqual(before["Delivered"], (0, Decimal("0.00")))
+
+        OrderLedgerEntry.compact()
+        # one entry per (day, status); Delivered nets out to zero and is dropped
+        self.assertEqual(OrderLedgerEntry.objects.count(), 2)
+        self.assertEqual(OrderLedgerEntry.totals(), {status: before[status] for status in ("Pending", "Cancelled")})
+
+        OrderLedgerEntry.objects.all().delete()
+        OrderLedgerEntry.rebuild()
+        self.assertEqual(OrderLedgerEntry.totals(), {
+            "Pending": (1, Decimal("2000.00")), "Cancelled": (1, Decimal("500.00")),
+        })
+
+    def test_cancellation_restocks_items(self):
+        order = self._order(quantity=3)
+        order = Order.objects.get(pk=order.pk)
+        order.status = "Cancelled"
+        order.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 13)
+
+    def test_bulk_cancel_restocks_and_moves_ledger(self):
+        other = Product.objects.create(name="Chiffon", price=Decimal("1500.00"), stock=0)
+        orders = [self._order(quantity=2) for _ in range(10)]
+        OrderItem.objects.create(order=orders[0], product=other, price=Decimal("1500.00"), quantity=4)
+        delivered = orders[1]
+        delivered.status = "Delivered"
+        delivered.save()
+        self.product.refresh_from_db()
+        stock_before = self.product.stock
+
+        # restocked once per previous status (Pending, Delivered)
+        with self.assertNumQueries(13):  # incl. the revenue ledger entries and the catalog version
+            cancelled = cancel_orders(Order.objects.all())
+
+        self.assertEqual(cancelled, 10)
+        self.assertEqual(cancel_orders(Order.objects.all()), 0)
+        self.product.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.product.stock, stock_before + 20)
+        self.assertEqual(other.stock, 4)
+        self.assertEqual(set(Order.objects.values_list("status", flat=True)), {"Cancelled"})
+        self.assertEqual(self._ledger("Cancelled"), (10, Decimal("20000.00")))
+        self.assertEqual(self._ledger("Pending")[0], 0)
+        self.assertEqual(self._ledger("Delivered")[0], 0)
+
+    def test_bulk_cancel_runs_registered_hooks(self):
+        calls = []
+        on_status_change(from_status="Pending", to_status="Cancelled")(
+            lambda order, old_status, new_status: calls.append((order.pk, old_status, order.status))
+        )
+        self.addCleanup(_status_hooks.pop)
+        pending, confirmed = self._order(), self._order()
+        Order.objects.filter(pk=confirmed.pk).update(status="Confirmed")
+
+        cancel_orders(Order.objects.all())
+
+        self.assertEqual(calls, [(pending.pk, "Pending", "Cancelled")])
+
+
+# -------------------------------
+# Ratings
+# -------------------------------
+class RatingAggregateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="reviewer", password="pass")
+        cls.lawn = Product.objects.create(name="Lawn", price=Decimal("1000.00"))
+        cls.silk = Product.objects.create(name="Silk", price=Decimal("3000.00"))
+
+    def _review(self, product, rating):
+        return Review.objects.create(product=product, user=self.user, body="Nice", rating=rating)
+
+    def _ratings(self, product):
+        product.refresh_from_db()
+        return product.rating_count, product.rating_sum, product.average_rating
+
+    def test_ratings_follow_create_update_and_delete(self):
+        self._review(self.lawn, 5)
+        review = self._review(self.lawn, 2)
+        self.assertEqual(self._ratings(self.lawn), (2, 7, 3.5))
+
+        review = Review.objects.get(pk=review.pk)
+        review.rating = 4
+        review.save()
+        self.assertEqual(self._ratings(self.lawn), (2, 9, 4.5))
+
+        review.product = self.silk
+        review.save()
+        self.assertEqual(self._ratings(self.lawn), (1, 5, 5.0))
+        self.assertEqual(self._ratings(self.silk), (1, 4, 4.0))
+
+        Review.objects.filter(product=self.silk).delete()
+        self.assertEqual(self._ratings(self.silk), (0, 0, 0))
+
+    def test_average_rating_does_not_query(self):
+        self._review(self.lawn, 4)
+        product = Product.objects.get(pk=self.lawn.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(product.average_rating, 4.0)
+
+    def test_rebuild_ratings(self):
+        self._review(self.lawn, 3)
+        self._review(self.lawn, 4)
+        Product.objects.update(rating_count=0, rating_sum=0, rating_average=0)
+        call_command('rebuild_ratings', stdout=StringIO())
+        self.assertEqual(self._ratings(self.lawn), (2, 7, 3.5))
+        self.assertEqual(self._ratings(self.silk), (0, 0, 0))
+
+    def test_product_list_sorts_by_rating(self):
+        self._review(self.lawn, 2)
+        self._review(self.silk, 5)
+        response = self.client.get(reverse('product_list'), {'sort': 'rating'})
+        self.assertEqual(list(response.context['products']), [self.silk, self.lawn])
+
+
+# -------------------------------
+# Fragment cache
+# -------------------------------
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="reviewer", password="pass")
+        cls.lawn = Product.objects.create(name="Lawn Suit", price=Decimal("1000.00"), stock=5)
+        cls.silk = Product.objects.create(name="Silk Suit", price=Decimal("3000.00"), stock=5)
+
+    def setUp(self):
+        cache.clear()
+
+    def _stamps(self):
+        return product_versions([self.lawn.pk, self.silk.pk])
+
+    def test_cards_are_cached_until_the_product_is_saved(self):
+        self.client.get(reverse('product_list'))
+        # A write that bypasses Product.save leaves the cached card in place...
+        Product.objects.filter(pk=self.lawn.pk).update(name="Renamed Suit")
+        self.assertContains(self.client.get(reverse('product_list')), "Lawn Suit")
+
+        # ...while save() retires just that product's fragments.
+        before = self._stamps()
+        product = Product.objects.get(pk=self.lawn.pk)
+        product.save()
+        after = self._stamps()
+        self.assertNotEqual(before[self.lawn.pk], after[self.lawn.pk])
+        self.assertEqual(before[self.silk.pk], after[self.silk.pk])
+        self.assertContains(self.client.get(reverse('product_list')), "Renamed Suit")
+
+    def test_new_review_refreshes_the_review_list(self):
+        url = reverse('product_detail', args=[self.lawn.slug])
+        self.assertContains(self.client.get(url), "No reviews yet")
+        with self.assertNumQueries(2):
+            # product + neighbours (no category to top up from); reviews come from the cache
+            self.client.get(url)
+
+        before = self._stamps()
+        Review.objects.create(product=self.lawn, user=self.user, title="Lovely print", body="Nice", rating=5)
+        self.assertContains(self.client.get(url), "Lovely print")
+        self.assertEqual(before[self.silk.pk], self._stamps()[self.silk.pk])
+
+    def test_stock_changes_bump_stamps(self):
+        before = self._stamps()
+        reserve_stock([{'product': self.silk, 'quantity': 2}])
+        after = self._stamps()
+        self.assertNotEqual(before[self.silk.pk], after[self.silk.pk])
+        self.assertEqual(before[self.lawn.pk], after[self.lawn.pk])
+
+
+# -------------------------------
+# Catalog version
+# -------------------------------
+class CatalogVersionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Lawn", slug="lawn")
+        cls.lawn = Product.objects.create(name="Lawn Suit", price=Decimal("1000.00"), stock=5, category=cls.category)
+        cls.silk = Product.objects.create(name="Silk Suit", price=Decimal("2000.00"), stock=5)
+        cls.user = User.objects.create_user(username="reviewer")
+
+    def setUp(self):
+        cache.clear()
+
+    def _version(self, product):
+        return Product.objects.values_list("version", flat=True).get(pk=product.pk)
+
+    def test_save_and_bulk_updates_claim_increasing_versions(self):
+        start = CatalogVersion.current()[0]
+        self.assertEqual(self._version(self.silk), start)
+
+        self.lawn.stock = 4
+        self.lawn.save(update_fields=["stock"])
+        saved = self._version(self.lawn)
+        self.assertGreater(saved, start)
+        self.assertEqual(CatalogVersion.current()[0], saved)
+
+        restock_products(Product.objects.all(), 1)
+        self.assertEqual({self._version(self.lawn), self._version(self.silk)}, {saved + 1})
+        self.assertEqual(list(Product.objects.filter(version__gt=saved)), list(Product.objects.all()))
+
+        before = Product.objects.get(pk=self.silk.pk).updated_at
+        cart = ResolvedCart([{'product': self.silk, 'price': self.silk.price, 'quantity': 1}], self.silk.price)
+        with CaptureQueriesContext(connection) as ctx:
+            create_order(self.user, cart, CheckoutTests.checkout_data)
+        # one appended version row (no shared row to lock), stamped by the stock UPDATE itself
+        writes = [q["sql"].split('"')[:2] for q in ctx.captured_queries if q["sql"].startswith(("INSERT", "UPDATE"))]
+        self.assertEqual(writes[:2], [["INSERT INTO ", "store_catalogversion"], ["UPDATE ", "store_product"]])
+        self.assertEqual([w for w in writes if w[1] in ("store_catalogversion", "store_product")], writes[:2])
+        self.assertGreater(Product.objects.get(pk=self.silk.pk).updated_at, before)
+        self.assertEqual(self._version(self.silk), saved + 2)
+
+    def test_reviews_and_category_changes_touch_products(self):
+        version = self._version(self.lawn)
+        review = Review.objects.create(product=self.lawn, user=self.user, body="Nice", rating=4)
+        self.assertGreater(self._version(self.lawn), version)
+
+        version = self._version(self.lawn)
+        review.body = "Very nice"
+        review.save()
+        self.assertGreater(self._version(self.lawn), version)
+
+        version = self._version(self.lawn)
+        review.delete()
+        self.assertGreater(self._version(self.lawn), version)
+
+        version, silk = self._version(self.lawn), self._version(self.silk)
+        self.category.name = "Summer Lawn"
+        self.category.save()
+        self.assertGreater(self._version(self.lawn), version)
+        self.assertEqual(self._version(self.silk), silk)
+
+        catalog = CatalogVersion.current()[0]
+        self.silk.delete()
+        self.assertGreater(CatalogVersion.current()[0], catalog)
+
+    def test_fingerprint_moves_when_an_earlier_version_commits_late(self):
+        late = CatalogVersion.claim()["version"]
+        CatalogVersion.objects.filter(pk=late).delete()  # still uncommitted elsewhere
+        Product.touch([self.silk.pk])
+        version, fingerprint = CatalogVersion.current()[0], CatalogVersion.fingerprint()
+
+        CatalogVersion.objects.create(pk=late)  # ... and now committed
+        cache.clear()
+        self.assertEqual(CatalogVersion.current()[0], version)
+        self.assertNotEqual(CatalogVersion.fingerprint(), fingerprint)
+
+    def test_old_versions_are_pruned_on_commit(self):
+        with mock.patch.object(CatalogVersion, "KEEP", 3):
+            with self.captureOnCommitCallbacks(execute=True):
+                while CatalogVersion.claim()["version"] % 3:
+                    pass
+        version = CatalogVersion.current()[0]
+        self.assertEqual(list(CatalogVersion.objects.values_list("pk", flat=True)), [version - 2, version - 1, version])
+
+
+# -------------------------------
+# Product detail
+# -------------------------------
+class ProductDetailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Khaadi")
+        cls.product = Product.objects.create(name="Lawn Suit", price=Decimal("1000.00"), category=cls.category)
+        cls.related = [
+            Product.objects.create(name=f"Related {i}", price=Decimal("900.00"), category=cls.category)
+            for i in range(5)
+        ]
+        Product.objects.create(name="Elsewhere", price=Decimal("900.00"))
+        for i in range(25):
+            user = User.objects.create_user(username=f"reviewer{i}")
+            Review.objects.create(product=cls.product, user=user, title=f"Review {i}", body="Nice", rating=i % 5 + 1)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bounded_queries_regardless_of_review_count(self):
+        # product+category, neighbours, category top-up, one page of reviews+users, star histogram
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('product_detail', args=[self.product.slug]))
+        self.assertContains(response, "reviewer24")
+        self.assertNotContains(response, "reviewer0<")
+
+    def test_reviews_are_paginated_newest_first(self):
+        url = reverse('product_detail', args=[self.product.slug])
+        page = self.client.get(url, {'review_page': 3}).context['detail'].reviews
+        self.assertEqual(page.paginator.num_pages, 3)
+        self.assertEqual([r.title for r in page], ["Review 4", "Review 3", "Review 2", "Review 1", "Review 0"])
+
+    def test_rating_summary_and_related_products(self):
+        detail = self.client.get(reverse('product_detail', args=[self.product.slug])).context['detail']
+        summary = detail.rating_summary
+        self.assertEqual(summary['count'], 25)
+        self.assertEqual([(stars, count) for stars, count, _ in summary['stars']], [(n, 5) for n in range(5, 0, -1)])
+        self.assertEqual(detail.related_products, self.related[::-1][:4])
+
+
+# -------------------------------
+# Recommendations
+# -------------------------------
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer")
+        cls.shirt, cls.dupatta, cls.shawl, cls.scarf = [
+            Product.objects.create(name=name, price=Decimal("1000.00"))
+            for name in ["Shirt", "Dupatta", "Shawl", "Scarf"]
+        ]
+
+    def _order(self, *products):
+        order = Order.objects.create(user=self.user, total_amount=Decimal("0"))
+        OrderItem.objects.bulk_create([OrderItem(order=order, product=p, price=p.price) for p in products])
+        return order
+
+    def _neighbors(self, product):
+        return list(product.neighbors.values_list("neighbor_id", flat=True))
+
+    def test_co_purchases_and_wishlists_are_ranked(self):
+        self._order(self.shirt, self.dupatta)
+        self._order(self.shirt, self.dupatta)
+        self._order(self.shirt, self.shawl)
+        wishlist = Wishlist.objects.create(user=self.user)
+        wishlist.products.add(self.shirt, self.scarf)
+
+        call_command('build_recommendations', '--full', stdout=StringIO())
+        self.assertEqual(self._neighbors(self.shirt), [self.dupatta.pk, self.shawl.pk, self.scarf.pk])
+        self.assertEqual(self._neighbors(self.dupatta), [self.shirt.pk])
+
+    def test_incremental_refresh_only_touches_new_orders(self):
+        self._order(self.shirt, self.dupatta)
+        refresh_recommendations()
+        self.assertEqual(self._neighbors(self.shawl), [])
+
+        self._order(self.shawl, self.scarf)
+        self.assertEqual(refresh_recommendations(), 2)
+        self.assertEqual(self._neighbors(self.shawl), [self.scarf.pk])
+        self.assertEqual(self._neighbors(self.shirt), [self.dupatta.pk])
+
+    def _index(self):
+        return list(ProductNeighbor.objects.order_by("product", "rank").values_list("product", "neighbor", "score"))
+
+    def test_incremental_refresh_rescores_products_ranking_a_changed_norm(self):
+        self._order(self.shirt, self.dupatta)
+        self._order(self.shirt, self.shawl)
+        refresh_recommendations()
+
+        # Shirt isn't in the new order, but the shawl's norm it is scored against grows
+        self._order(self.shawl, self.scarf)
+        with CaptureQueriesContext(connection) as queries:
+            refresh_recommendations()
+        incremental = self._index()
+        refresh_recommendations(full=True)
+
+        self.assertEqual(incremental, self._index())
+        # norms come from the stored table, not a GROUP BY over every order item
+        self.assertFalse([q for q in queries if "GROUP BY" in q["sql"] and "IN (" not in q["sql"]])
+
+    def test_wishlist_edits_are_refreshed_incrementally(self):
+        self._order(self.shirt, self.dupatta)
+        refresh_recommendations()
+        wishlist = Wishlist.objects.create(user=self.user)
+        wishlist.products.add(self.shirt, self.scarf)
+
+        refresh_recommendations()
+        self.assertEqual(self._neighbors(self.shirt), [self.dupatta.pk, self.scarf.pk])
+        self.assertEqual(self._neighbors(self.scarf), [self.shirt.pk])
+        self.assertFalse(ProductNorm.objects.filter(dirty=True).exists())
+
+        wishlist.products.remove(self.scarf)
+        refresh_recommendations()
+        self.assertEqual(self._neighbors(self.scarf), [])
+
+    def test_product_detail_serves_neighbors_in_one_lookup(self):
+        self._order(self.shirt, self.shawl)
+        refresh_recommendations()
+        self.shawl.is_active = False
+        self.shawl.save()
+        self._order(self.shirt, self.scarf)
+        refresh_recommendations(full=True)
+
+        with self.assertNumQueries(1):
+            related = recommended_products(self.shirt, 4)
+        self.assertEqual(related, [self.scarf])
+
+
+# -------------------------------
+# Hot query indexes
+# -------------------------------
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Khaadi")
+        Product.objects.create(name="Lawn Suit", price=Decimal("1000.00"), fabric="Lawn", category=cls.category)
+
+    def test_every_hot_query_uses_an_index(self):
+        out = StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        self.assertNotIn("FAIL", out.getvalue())
+        statuses = {name: status for name, _, status, _ in check_plans()}
+        self.assertEqual(set(statuses.values()), {"ok"}, statuses)
+
+    def test_full_scans_are_detected(self):
+        self.assertTrue(full_scans(Product.objects.filter(color="Red").explain()))
+        self.assertFalse(full_scans(Product.objects.filter(pk=1).explain()))
+
+    def test_fabric_filter_stays_case_insensitive(self):
+        response = self.client.get(reverse('product_list'), {'fabric': "LAWN"})
+        self.assertEqual([p.name for p in response.context['products']], ["Lawn Suit"])
+
+
+# -------------------------------
+# Sales rollups
+# -------------------------------
+@override_settings(STORE_JOBS={'ALWAYS_EAGER': True})
+class SalesRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="staff", is_staff=True)
+        cls.lawn = Product.objects.create(name="Lawn Suit", price=Decimal("1000.00"), stock=50)
+        cls.silk = Product.objects.create(name="Silk Suit", price=Decimal("3000.00"), stock=50)
+
+    def setUp(self):
+        cache.clear()
+
+    def _order(self, lines, city="Lahore", status="Pending"):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(user=self.staff, city=city, province="Punjab", status=status)
+            OrderItem.objects.bulk_create([OrderItem(order=order, product=p, price=p.price, quantity=q) for p, q in lines])
+            order.total_amount = order.calculate_total()
+            order.save()
+        return order
+
+    def _summary(self):
+        today = timezone.localdate()
+        return sales_summary(today, today)
+
+    def test_order_events_keep_rollups_current(self):
+        self._order([(self.lawn, 3), (self.silk, 1)])
+        order = self._order([(self.lawn, 1)], city=" karachi ")
+        summary = self._summary()
+        self.assertEqual((summary['orders'], summary['units'], summary['revenue']), (2, 5, Decimal("7000")))
+        self.assertEqual([(r['name'], r['units']) for r in summary['top_products']], [("Lawn Suit", 4), ("Silk Suit", 1)])
+        self.assertEqual([r['key'] for r in summary['top_regions']], ["Lahore, Punjab", "Karachi, Punjab"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_orders(Order.objects.filter(pk=order.pk))
+        summary = self._summary()
+        self.assertEqual((summary['sold_orders'], summary['units'], summary['revenue']), (1, 4, Decimal("6000")))
+        self.assertIn({'key': "Cancelled", 'orders': 1, 'units': 1, 'revenue': Decimal("1000")}, summary['by_status'])
+
+    def test_rebuild_command_matches_incremental_rollups(self):
+        self._order([(self.lawn, 2)])
+        self._order([(self.silk, 1)], status="Delivered")
+        before = list(SalesRollup.objects.order_by('period', 'dimension', 'key').values_list(
+            'period', 'dimension', 'key', 'orders', 'units', 'revenue'))
+        call_command('rebuild_sales_rollups', stdout=StringIO())
+        after = list(SalesRollup.objects.order_by('period', 'dimension', 'key').values_list(
+            'period', 'dimension', 'key', 'orders', 'units', 'revenue'))
+        self.assertEqual(before, after)
+
+    def test_dashboard_reads_rollups_only(self):
+        self._order([(self.lawn, 2)])
+        self.client.force_login(self.staff)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('admin_dashboard'), {'period': 'hour'})
+        self.assertContains(response, "Lawn Suit")
+        self.assertEqual(len(response.context['series']), 30)  # hourly is capped to a week
+        self.assertFalse([q['sql'] for q in captured if '"store_order"' in q['sql'] or '"store_orderitem"' in q['sql']])
+
+        today = timezone.localdate().isoformat()
+        response = self.client.get(reverse('admin_dashboard'), {'period': 'hour', 'start': today, 'end': today})
+        self.assertEqual(len(response.context['series']), 24)
+
+    @override_settings(STORE_JOBS={'ALWAYS_EAGER': False})
+    def test_dirty_marks_are_shared_with_the_worker(self):
+        self._order([(self.lawn, 1)])
+        self.assertEqual(Job.objects.filter(task="store.rebuild_sales_rollups").count(), 1)
+        self._order([(self.lawn, 1)])  # same day, rebuild already queued
+        self.assertEqual(Job.objects.filter(task="store.rebuild_sales_rollups").count(), 1)
+
+        Job.objects.update(run_after=timezone.now())
+        run_worker(processes=0, once=True)
+        self.assertEqual(self._summary()['orders'], 2)
+
+        # The worker's cache isn't ours: the next event must still queue a rebuild
+        cache.clear()
+        self._order([(self.silk, 1)])
+        Job.objects.filter(status="queued").update(run_after=timezone.now())
+        run_worker(processes=0, once=True)
+        self.assertEqual(self._summary()['orders'], 3)
+
+    def test_failed_rebuild_keeps_existing_rollups(self):
+        self._order([(self.lawn, 2)])
+        rows = SalesRollup.objects.count()
+        with mock.patch("store.rollups.rebuild_day", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                rebuild_sales_rollups()
+        self.assertEqual(SalesRollup.objects.count(), rows)
+
+
+# -------------------------------
+# Exports
+# -------------------------------
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="staff", is_staff=True, is_superuser=True)
+        cls.lawn = Product.objects.create(name="Lawn Suit", price=Decimal("1000.00"), stock=7)
+        cls.silk = Product.objects.create(name="Silk Suit", price=Decimal("3000.00"), stock=2)
+        cls.order = Order.objects.create(user=cls.staff, full_name="Ayesha Khan", city="Lahore",
+                                         total_amount=Decimal("5000.00"))
+        OrderItem.objects.create(order=cls.order, product=cls.lawn, price=Decimal("1000.00"), quantity=2)
+        OrderItem.objects.create(order=cls.order, product=cls.silk, price=Decimal("3000.00"), quantity=1)
+        Order.objects.create(user=cls.staff, full_name="No Items")
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def test_orders_csv_streams_one_row_per_item(self):
+        with self.assertNumQueries(0):
+            response = export_response("orders", ORDER_COLUMNS, order_rows(), "csv")
+        self.assertTrue(response.streaming)
+
+        response = self.client.get(reverse('export_orders'), {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], "text/csv; charset=utf-8")
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][:3], ["Order ID", "Placed at", "Status"])
+        self.assertEqual([(r[12], r[15]) for r in rows[1:]], [("Lawn Suit", "2"), ("Silk Suit", "1"), ("", "")])
+
+    def test_products_xlsx(self):
+        response = self.client.get(reverse('export_products'), {'format': 'xlsx'})
+        self.assertIn("products-", response['Content-Disposition'])
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)), read_only=True)
+        rows = list(workbook.active.values)
+        self.assertEqual(rows[0][:2], ("Product ID", "Name"))
+        self.assertEqual([(r[1], r[13]) for r in rows[1:]], [("Lawn Suit", 7), ("Silk Suit", 2)])
+
+    def test_formula_like_text_is_escaped(self):
+        Order.objects.create(full_name='=HYPERLINK("http://evil.example","Click")', shipping_address="@SUM(A1)",
+                             city="-2+3", total_amount=Decimal("-5.00"))
+        row = list(order_rows())[-1]
+        self.assertEqual(row[3], '\'=HYPERLINK("http://evil.example","Click")')
+        self.assertEqual((row[6], row[8], row[10]), ("'-2+3", "'@SUM(A1)", Decimal("-5.00")))
+
+        response = self.client.get(reverse('export_orders'), {'format': 'xlsx'})
+        rows = list(load_workbook(io.BytesIO(b"".join(response.streaming_content)), read_only=True).active.values)
+        self.assertEqual(rows[-1][3], '\'=HYPERLINK("http://evil.example","Click")')
+
+        Product.objects.filter(pk=self.lawn.pk).update(name="-Sale- Lawn")
+        report = import_products(load_dataset("".join(iter_csv(PRODUCT_COLUMNS, product_rows())).encode(), "csv"))
+        self.assertEqual((report.updated, report.unchanged), ([], 2))  # the escaping round-trips
+
+    def test_admin_export_action_and_staff_only(self):
+        response = self.client.post(reverse('admin:store_order_changelist'), {
+            'action': 'export_csv', '_selected_action': [self.order.pk],
+        })
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        self.assertEqual(content.count("Ayesha Khan"), 2)
+        self.assertNotIn("No Items", content)
+
+        self.client.logout()
+        response = self.client.get(reverse('export_orders'))
+        self.assertEqual(response.status_code, 302)
+
+
+class ProductBulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="staff", is_staff=True, is_superuser=True)
+        cls.lawn = Product.objects.create(name="Lawn Suit", price=Decimal("1000.00"), stock=7)
+        cls.silk = Product.objects.create(name="Silk Suit", price=Decimal("2999.00"), stock=0,
+                                          discount_price=Decimal("2500.00"))
+
+    def test_single_update_and_one_log_entry(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(restock_products(Product.objects.all(), 5, self.staff), 2)
+        self.assertEqual(sum(q["sql"].startswith('UPDATE "store_product"') for q in ctx.captured_queries), 1)
+        self.assertEqual(
+            sorted(Product.objects.values_list("stock", flat=True)), [5, 12]
+        )
+        entry = LogEntry.objects.get()
+        self.assertEqual(entry.object_repr, "2 products")
+        self.assertIn(f"Restocked by 5 (product ids: {self.lawn.pk}-{self.silk.pk})", entry.change_message)
+
+    def test_discount_matches_python_percentage(self):
+        set_discount(Product.objects.all(), Decimal("15"))
+        for product in Product.objects.all():
+            self.assertEqual(product.discount_price, (product.price * Decimal("0.85")).quantize(Decimal("0.01")))
+            self.assertEqual(product.percentage_price,
+                             Product.discount_percent(product.price, product.discount_price))
+        set_discount(Product.objects.all(), 0)
+        self.assertEqual(set(Product.objects.values_list("discount_price", "percentage_price")),
+                         {(None, Decimal("0"))})
+
+    def test_admin_actions(self):
+        self.client.force_login(self.staff)
+        summer = Category.objects.create(name="Summer")
+        url = reverse('admin:store_product_changelist')
+        selected = [self.lawn.pk, self.silk.pk]
+        self.client.post(url, {'action': 'move_to_category', 'category': summer.pk, '_selected_action': selected})
+        self.client.post(url, {'action': 'deactivate_products', '_selected_action': [self.silk.pk]})
+        self.client.post(url, {'action': 'restock_products', 'quantity': 3, '_selected_action': [self.lawn.pk]})
+        self.assertEqual(
+            list(Product.objects.order_by("pk").values_list("category__name", "is_active", "stock")),
+            [("Summer", True, 10), ("Summer", False, 0)],
+        )
+        self.assertEqual(LogEntry.objects.count(), 3)
+
+
+class ImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="staff", is_staff=True, is_superuser=True)
+        cls.lawn = Product.objects.create(name="Lawn Suit", price=Decimal("1000.00"), stock=7,
+                                          description="Printed lawn")
+
+    def _csv(self, rows, headers="Code,Name,Category,Price,Discount price,Stock,Active"):
+        return load_dataset((headers + "\n" + "\n".join(rows) + "\n").encode(), "csv")
+
+    def test_export_round_trips_and_updates_by_code(self):
+        content = "".join(iter_csv(PRODUCT_COLUMNS, product_rows())).encode()
+        dataset = load_dataset(content.replace(b"Lawn Suit", b"Lawn Suit II"), "csv")
+        report = import_products(dataset)
+        self.assertEqual((len(report.created), report.unchanged), (0, 0))
+        self.assertEqual(report.updated, [(self.lawn.product_code, {"name": ("Lawn Suit", "Lawn Suit II")})])
+        self.lawn.refresh_from_db()
+        # the export has no Description column, so it's left alone
+        self.assertEqual((self.lawn.name, self.lawn.slug, self.lawn.description),
+                         ("Lawn Suit II", "lawn-suit", "Printed lawn"))
+
+        report = import_products(load_dataset(content.replace(b"Lawn Suit", b"Lawn Suit II"), "csv"))
+        self.assertEqual((report.updated, report.unchanged), ([], 1))
+
+    def test_creates_with_unique_slugs_codes_and_categories(self):
+        dataset = self._csv([
+            ",Lawn Suit,Summer,1500,1200,3,yes",
+            ",Lawn Suit,summer,1600,,0,no",
+            f"{self.lawn.product_code},Lawn Suit,,1000,,9,yes",
+        ])
+        with self.assertNumQueries(12):  # incl. claiming a catalog version and stamping it
+            report = import_products(dataset)
+        self.assertEqual(report.new_categories, ["Summer"])
+        self.assertEqual(len(report.created), 2)
+        self.assertEqual(report.updated, [(self.lawn.product_code, {"stock": (7, 9)})])
+
+        new = Product.objects.exclude(pk=self.lawn.pk).order_by("price")
+        self.assertEqual([p.slug for p in new], ["lawn-suit-2", "lawn-suit-3"])
+        self.assertEqual(len({p.product_code for p in new} | {self.lawn.product_code}), 3)
+        self.assertEqual([p.category.name for p in new], ["Summer", "Summer"])
+        self.assertEqual([(p.percentage_price, p.is_active) for p in new], [(Decimal("20.00"), True), (0, False)])
+
+    def test_dry_run_and_invalid_rows_write_nothing(self):
+        rows = [",New Suit,Winter,2000,,1,yes", ",,,100,,1,yes", ",Bad Price,,abc,,1,yes"]
+        report = import_products(self._csv(rows), dry_run=True)
+        self.assertEqual((len(report.created), report.new_categories), (1, ["Winter"]))
+        self.assertEqual([row for row, _ in report.errors], [3, 4])
+
+        report = import_products(self._csv(rows))
+        self.assertFalse(report.written)
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertFalse(Category.objects.exists())
+
+        report = import_products(self._csv(rows), skip_invalid=True)
+        self.assertTrue(report.written)
+        self.assertTrue(Product.objects.filter(name="New Suit", category__name="Winter").exists())
+
+    def test_staff_upload_and_command(self):
+        self.client.force_login(self.staff)
+        upload = SimpleUploadedFile("products.csv", b"Name,Price,Stock\nCotton Kurta,2500,4\n")
+        response = self.client.post(reverse('import_products'), {'file': upload, 'dry_run': '1'})
+        self.assertContains(response, "Preview: 1 would be created")
+        self.assertFalse(Product.objects.filter(name="Cotton Kurta").exists())
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("Name,Price,Stock\nCotton Kurta,2500,4\n")
+        self.addCleanup(Path(f.name).unlink)
+        out = StringIO()
+        call_command("import_products", f.name, stdout=out)
+        self.assertIn("Import saved.", out.getvalue())
+        self.assertEqual(Product.objects.get(name="Cotton Kurta").stock, 4)
+
+
+# -------------------------------
+# Search
+# -------------------------------
+class ProductSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.khaddar = Product.objects.create(
+            name="Classic Khaddar Suit", description="Warm winter fabric", price=Decimal("4000.00")
+        )
+        cls.lawn = Product.objects.create(
+            name="Printed Lawn", description="Light khaddar-free summer lawn", price=Decimal("2500.00")
+        )
+        cls.silk = Product.objects.create(name="Silk Dupatta", price=Decimal("1500.00"))
+
+    def _search(self, query):
+        return list(search_products(Product.objects.all(), query))
+
+    def test_prefix_matching_and_ranking(self):
+        self.assertEqual(self._search("khad"), [self.khaddar, self.lawn])
+        self.assertEqual(self._search("lawn summ"), [self.lawn])
+        self.assertEqual(self._search("velvet"), [])
+
+        # one FTS scan joined on rowid, not a MATCH subquery per product
+        sql = str(search_products(Product.objects.all(), "khad").query)
+        self.assertIn('INNER JOIN "store_product_fts"', sql)
+        self.assertEqual(sql.count("MATCH"), 1)
+
+    def test_index_follows_saves_and_deletes(self):
+        self.silk.name = "Velvet Shawl"
+        self.silk.save()
+        self.assertEqual(self._search("velvet"), [self.silk])
+        self.assertEqual(self._search("dupatta"), [])
+
+        Product.objects.filter(pk=self.silk.pk).update(description="Embroidered")
+        self.assertEqual(self._search("embroid"), [self.silk])
+
+        self.silk.delete()
+        self.assertEqual(self._search("velvet"), [])
+
+    def test_product_list_search(self):
+        response = self.client.get(reverse('product_list'), {'q': 'classic'})
+        self.assertEqual(list(response.context['products']), [self.khaddar])
+
+    def test_punctuation_only_query_falls_back(self):
+        self.assertEqual(self._search("!!"), [])
+
+
+# -------------------------------
+# Facets
+# -------------------------------
+class FacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.maria = Category.objects.create(name="Maria B")
+        cls.khaadi = Category.objects.create(name="Khaadi")
+        Product.objects.create(name="A", fabric="Lawn", category=cls.maria, price=Decimal("1500.00"))
+        Product.objects.create(name="B", fabric=" lawn ", category=cls.khaadi, price=Decimal("3000.00"))
+        Product.objects.create(
+            name="C", fabric="Silk", category=cls.maria, price=Decimal("12000.00"),
+            discount_price=Decimal("4000.00"), product_type="stitched",
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _counts(self, facets, name):
+        return {f['value']: f['count'] for f in facets[name] if f['count']}
+
+    def test_counts_respect_other_filters(self):
+        facets = get_facets({'category': self.maria.slug})
+
+        self.assertEqual(self._counts(facets, 'fabric'), {'Lawn': 1, 'Silk': 1})
+        # A facet ignores its own selection so siblings stay visible.
+        self.assertEqual(self._counts(facets, 'category'), {'khaadi': 1, 'maria-b': 2})
+        self.assertEqual(self._counts(facets, 'price'), {'under-2000': 1, '2000-5000': 1})
+        self.assertEqual(self._counts(facets, 'type'), {'unstitched': 1, 'stitched': 1})
+
+    def test_facets_are_cached_and_invalidated_on_product_change(self):
+        get_facets({})
+        with self.assertNumQueries(0):
+            facets = get_facets({})
+        self.assertEqual(self._counts(facets, 'fabric'), {'Lawn': 2, 'Silk': 1})
+
+        Product.objects.create(name="D", fabric="Silk", price=Decimal("900.00"))
+        self.assertEqual(self._counts(get_facets({}), 'fabric'), {'Lawn': 2, 'Silk': 2})
+
+    def test_min_rating_counts_follow_reviews(self):
+        self.assertEqual(self._counts(get_facets({'min_rating': '4'}), 'fabric'), {})
+        user = User.objects.create_user(username="reviewer")
+        review = Review.objects.create(product=Product.objects.get(name="A"), user=user, rating=5)
+        self.assertEqual(self._counts(get_facets({'min_rating': '4'}), 'fabric'), {'Lawn': 1})
+
+        review.rating = 2
+        review.save()
+        self.assertEqual(self._counts(get_facets({'min_rating': '4'}), 'fabric'), {})
+
+    def test_product_list_price_band_filter(self):
+        response = self.client.get(reverse('product_list'), {'price': '2000-5000'})
+        self.assertEqual(sorted(p.name for p in response.context['products']), ['B', 'C'])
+
+
+# -------------------------------
+# Cursor pagination
+# -------------------------------
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Rows created back to back can share created_at; ids break the ties.
+        cls.products = [Product.objects.create(name=f"P{i}", price=Decimal("100.00")) for i in range(20)]
+
+    def test_walks_forward_and_back(self):
+        url = reverse('product_list')
+        seen = []
+        params = {'paging': 'cursor'}
+        while True:
+            response = self.client.get(url, params)
+            page = response.context['page_obj']
+            seen.extend(p.pk for p in page)
+            if not page.has_next():
+                break
+            params = {'paging': 'cursor', 'cursor': page.next_cursor}
+
+        expected = [p.pk for p in sorted(self.products, key=lambda p: (p.created_at, p.pk), reverse=True)]
+        self.assertEqual(seen, expected)
+
+        response = self.client.get(url, {'paging': 'cursor', 'cursor': page.previous_cursor})
+        self.assertEqual([p.pk for p in response.context['page_obj']], expected[8:16])
+
+    def test_json_endpoint(self):
+        data = self.client.get(reverse('product_list_json')).json()
+        self.assertEqual(len(data['products']), 8)
+        self.assertIsNone(data['previous'])
+
+        data = self.client.get(reverse('product_list_json'), {'cursor': data['next']}).json()
+        self.assertEqual(len(data['products']), 8)
+        self.assertIsNotNone(data['previous'])
+
+    def test_tampered_cursor_starts_from_first_page(self):
+        response = self.client.get(reverse('product_list_json'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['previous'])
+
+
+# -------------------------------
+# Profiling middleware
+# -------------------------------
+@override_settings(STORE_PROFILER={'ENABLED': True})
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name="Lawn", price=Decimal("1000.00"))
+        for i in range(3):
+            user = User.objects.create_user(username=f"u{i}")
+            Review.objects.create(product=cls.product, user=user, body="Nice", rating=4)
+
+    def setUp(self):
+        reset_stats()
+        cache.clear()
+
+    def _row(self, view):
+        return next(r for r in summary() if r['view'] == view)
+
+    def test_records_queries_and_latency_per_url_name(self):
+        self.client.get(reverse('product_list'))
+        self.client.get(reverse('product_list'))
+        row = self._row('product_list')
+        self.assertEqual(row['requests'], 2)
+        self.assertGreater(row['max_queries'], 0)
+        self.assertGreater(row['p95_ms'], 0)
+        self.assertGreater(row['avg_template_ms'], 0)
+
+    def test_query_budgets(self):
+        # Measure with warm fragment caches, as the budgeted requests below run.
+        self.client.get(reverse('product_detail', args=[self.product.slug]))
+        reset_stats()
+        self.client.get(reverse('product_detail', args=[self.product.slug]))
+        queries = self._row('product_detail')['max_queries']
+
+        with self.settings(STORE_PROFILER={'ENABLED': True, 'QUERY_BUDGETS': {'product_detail': queries - 1}}):
+            response = self.client.get(reverse('product_detail', args=[self.product.slug]))
+            self.assertIn('X-Query-Budget-Exceeded', response.headers)
+
+        with self.settings(STORE_PROFILER={
+            'ENABLED': True, 'STRICT': True, 'QUERY_BUDGETS': {'product_detail': queries - 1},
+        }):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('product_detail', args=[self.product.slug]))
+
+    def test_staff_profiling_page(self):
+        staff = User.objects.create_user(username="staff", is_staff=True)
+        self.client.force_login(staff)
+        self.client.get(reverse('product_list'))
+        response = self.client.get(reverse('profiling_dashboard'))
+        self.assertContains(response, 'product_list')
+
+
+# -------------------------------
+# Async views (ASGI)
+# -------------------------------
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Lawn", slug="lawn")
+        cls.products = [
+            Product.objects.create(
+                name=f"Suit {i:02d}", price=Decimal("1000.00"), discount_price=Decimal("900.00") if i % 3 else None,
+                category=category, fabric="Silk" if i % 2 else "Lawn", stock=5,
+            )
+            for i in range(20)
+        ]
+        cls.user = User.objects.create_user(username="shopper")
+
+    def setUp(self):
+        cache.clear()
+
+    def _render(self, view, path, *args, user=None, **params):
+        """Call an async view directly; returns ``(response, context of the page template)``."""
+        request = AsyncRequestFactory().get(path, params)
+        request.user = user or AnonymousUser()
+        request.cart = CartStore(request)
+        contexts = []
+
+        def capture(sender, context, **kwargs):
+            contexts.append(context)
+
+        template_rendered.connect(capture)
+        try:
+            response = async_to_sync(view)(request, *args)
+        finally:
+            template_rendered.disconnect(capture)
+        return response, contexts[0]
+
+    def test_product_list_matches_sync_view(self):
+        url = reverse('product_list')
+        for params in ({}, {'page': 2}, {'page': 'last'}, {'fabric': 'Silk'}, {'paging': 'cursor'}):
+            expected = self.client.get(url, params).context
+            response, context = self._render(async_views.product_list, url, **params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([p.pk for p in context['products']], [p.pk for p in expected['products']], params)
+            self.assertEqual(context['is_paginated'], expected['is_paginated'])
+            self.assertEqual(context['facets'], expected['facets'])
+            self.assertEqual(context['discounted_products'], expected['discounted_products'])
+            if 'paging' not in params:
+                self.assertEqual(context['page_obj'].number, expected['page_obj'].number)
+                self.assertEqual(context['paginator'].count, expected['paginator'].count)
+
+        for page in ('0', '99', 'x'):
+            with self.assertRaises(Http404):
+                self._render(async_views.product_list, url, page=page)
+
+    def test_product_detail_and_cart(self):
+        product = self.products[0]
+        url = reverse('product_detail', args=[product.slug])
+        expected = self.client.get(url).context
+        response, context = self._render(async_views.product_detail, url, product.slug)
+        self.assertContains(response, product.name)
+        self.assertEqual(context['related_products'], expected['related_products'])
+
+        Product.objects.filter(pk=product.pk).update(is_active=False)
+        with self.assertRaises(Http404):
+            self._render(async_views.product_detail, url, product.slug)
+
+        fill_cart(Cart.objects.create(user=self.user), {str(self.products[1].pk): 2})
+        response, context = self._render(async_views.view_cart, reverse('view_cart'), user=self.user)
+        self.assertEqual(context['total'], Decimal("1800.00"))
+        self.assertContains(response, self.products[1].name)
+
+    @override_settings(STORE_PROFILER={'ENABLED': True})
+    async def test_middleware_runs_under_asgi(self):
+        # cart cookie round trip and per-view profiling through the async middleware chain
+        await self.async_client.post(reverse('add_to_cart', args=[self.products[2].pk]), {'quantity': 1})
+        self.assertIn(CART_COOKIE, self.async_client.cookies)
+        reset_stats()
+        response = await self.async_client.get(reverse('view_cart'))
+        self.assertContains(response, self.products[2].name)
+        row = next(r for r in summary() if r['view'] == 'view_cart')
+        self.assertGreater(row['max_queries'], 0)
+
+
+# -------------------------------
+# JSON API
+# -------------------------------
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Lawn", slug="lawn")
+        cls.products = [
+            Product.objects.create(
+                name=f"Suit {i}", price=Decimal("1000.00"), discount_price=Decimal("800.00") if i == 0 else None,
+                category=cls.category, fabric="Lawn", stock=5,
+            )
+            for i in range(5)
+        ]
+        cls.user = User.objects.create_user(username="reviewer")
+
+    def setUp(self):
+        cache.clear()
+
+    def _revalidate(self, url, response, queries, **params):
+        with self.assertNumQueries(queries):
+            again = self.client.get(url, params, headers={'if-none-match': response['ETag']})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b'')
+        return again
+
+    def test_products_list_and_conditional_get(self):
+        url = reverse('api_products')
+        response = self.client.get(url, {'per_page': 2})
+        data = response.json()
+        self.assertEqual([p['id'] for p in data['products']], [p.pk for p in self.products[::-1][:2]])
+        self.assertNotIn('Last-Modified', response)  # ETag only, see store/api.py
+        self._revalidate(url, response, 1, per_page=2)  # just the page's ids
+
+        page = self.client.get(url, {'per_page': 2, 'cursor': data['next']}).json()
+        self.assertEqual(len(page['products']), 2)
+        self.assertEqual(page['products'][0]['id'], self.products[2].pk)
+
+        self.products[4].stock = 1
+        self.products[4].save()
+        changed = self.client.get(url, {'per_page': 2}, headers={'if-none-match': response['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['products'][0]['stock'], 1)
+
+    def test_products_list_ignores_if_modified_since_when_a_row_leaves(self):
+        url = reverse('api_products')
+        response = self.client.get(url, {'per_page': 2})
+        since = http_date(time.time() + 60)
+        Product.objects.filter(pk=self.products[4].pk).update(is_active=False)
+        again = self.client.get(url, {'per_page': 2}, headers={'if-modified-since': since})
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual([p['id'] for p in again.json()['products']], [self.products[3].pk, self.products[2].pk])
+        self.assertNotEqual(again['ETag'], response['ETag'])
+
+    def test_product_detail_and_reviews(self):
+        product = self.products[0]
+        url = reverse('api_product', args=[product.slug])
+        response = self.client.get(url)
+        data = response.json()
+        self.assertEqual(data['final_price'], '800.00')
+        self.assertEqual(data['category_name'], 'Lawn')
+        self._revalidate(url, response, 1)
+        since = self.client.get(url, headers={'if-modified-since': response['Last-Modified']})
+        self.assertEqual(since.status_code, 304)
+
+        reviews_url = reverse('api_product_reviews', args=[product.slug])
+        before = self.client.get(reviews_url)
+        Review.objects.create(product=product, user=self.user, body="Soft", rating=5)
+        after = self.client.get(reviews_url, headers={'if-none-match': before['ETag']})
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after.json()['reviews'][0]['user'], 'reviewer')
+        self.assertNotEqual(self.client.get(url)['ETag'], response['ETag'])
+
+        Product.objects.filter(pk=product.pk).update(is_active=False)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_categories_and_facets(self):
+        url = reverse('api_categories')
+        response = self.client.get(url)
+        self.assertEqual(response.json()['categories'], [{'id': self.category.pk, 'name': 'Lawn', 'slug': 'lawn'}])
+        self._revalidate(url, response, 0)
+
+        self.category.name = "Summer Lawn"
+        self.category.save()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': response['ETag']}).status_code, 200)
+
+        facets = self.client.get(reverse('api_facets'), {'fabric': 'lawn'})
+        self.assertEqual(facets.json()['facets']['fabric'][0]['count'], 5)
+        self._revalidate(reverse('api_facets'), facets, 0, fabric='lawn')
+
+
+# -------------------------------
+# Seeding & benchmarks
+# -------------------------------
+class SeedAndBenchmarkTests(TestCase):
+    def test_seed_catalog_keeps_derived_data_consistent(self):
+        created = seed_catalog(products=60, categories=3, users=10, reviews=120, orders=30, seed=7)
+
+        self.assertEqual(created['products'], 60)
+        self.assertEqual(Product.objects.count(), 60)
+        self.assertEqual(Review.objects.count(), 120)
+        self.assertEqual(sum(Product.objects.values_list('rating_count', flat=True)), 120)
+        self.assertEqual(Order.objects.count(), 30)
+        self.assertEqual(len(search_products(Product.objects.all(), "suit")), 60)
+
+    def test_seed_catalog_can_run_twice(self):
+        seed_catalog(products=5, categories=2, users=2, reviews=0, orders=0)
+        seed_catalog(products=5, categories=2, users=2, reviews=0, orders=0)
+        self.assertEqual(Product.objects.count(), 10)
+        self.assertEqual(Category.objects.count(), 2)
+
+    def test_benchmark_drives_every_scenario(self):
+        seed_catalog(products=30, categories=2, users=5, reviews=20, orders=10, seed=3)
+
+        results = run_benchmark(iterations=2, warmup=0, cart_size=3)
+
+        self.assertIn('admin_dashboard', results)
+        self.assertEqual(results['product_list']['status'], 200)
+        self.assertEqual(results['place_order:post']['status'], 302)
+        self.assertEqual(Order.objects.count(), 10)  # checkout was rolled back
+
+        self.assertEqual(compare(results, results)[1], [])
+        slower = {name: dict(r, p95_ms=r['p95_ms'] * 2 + 1) for name, r in results.items()}
+        self.assertEqual(set(compare(slower, results)[1]), set(results))
+
+
+# -------------------------------
+# Image derivatives
+# -------------------------------
+@override_settings(STORE_JOBS={'ALWAYS_EAGER': True})
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = self.settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+
+    def _upload(self, size=(1600, 2000), mode="RGBA"):
+        buffer = io.BytesIO()
+        Image.new(mode, size, (200, 30, 30, 255) if mode == "RGBA" else (200, 30, 30)).save(buffer, "PNG")
+        return SimpleUploadedFile("suit.png", buffer.getvalue(), content_type="image/png")
+
+    def test_derivatives_built_on_upload(self):
+        product = Product.objects.create(name="Red Kurta", price=Decimal("2000.00"), image1=self._upload())
+
+        derived = sorted(p for p in (Path(self.media) / 'derivatives').iterdir() if p.suffix != '.json')
+        self.assertEqual(len(derived), len(VARIANTS) * 2)
+        self.assertTrue(all(p.stat().st_size < product.image1.size for p in derived))
+        self.assertIn('-', derived[0].name)
+
+        html = Template(
+            '{% load store_images %}{% responsive_img product.image1 "card" alt=product.name %}'
+        ).render(Context({'product': product}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('480w', html)
+        self.assertIn('1200w', html)
+        self.assertIn('card.jpg', html)
+
+    def test_small_images_are_not_upscaled(self):
+        product = Product.objects.create(
+            name="Tiny", price=Decimal("100.00"), image1=self._upload(size=(300, 300), mode="RGB")
+        )
+        html = Template('{% load store_images %}{{ product.image1|srcset:"jpg" }}').render(
+            Context({'product': product})
+        )
+        self.assertIn('200w', html)
+        self.assertIn('300w', html)
+        self.assertNotIn('1200w', html)
+
+    def test_missing_file_falls_back_to_original(self):
+        product = Product.objects.create(name="Ghost", price=Decimal("100.00"), image1="products/missing.png")
+        html = Template('{% load store_images %}{% responsive_img product.image1 %}').render(
+            Context({'product': product})
+        )
+        self.assertIn('src="/media/products/missing.png"', html)
+
+
+# -------------------------------
+# Background jobs
+# -------------------------------
+_job_calls = []
+
+
+@task("tests.record")
+def _record(value):
+    _job_calls.append(value)
+
+
+@task("tests.flaky")
+def _flaky():
+    raise RuntimeError("boom")
+
+
+@override_settings(STORE_JOBS={'RETRY_DELAY': 0})
+class JobQueueTests(TestCase):
+    def setUp(self):
+        _job_calls.clear()
+        cache.clear()
+
+    def test_worker_runs_queued_jobs(self):
+        enqueue("tests.record", 1)
+        enqueue("tests.record", 2)
+
+        self.assertEqual(run_worker(processes=0, once=True), 2)
+
+        self.assertEqual(_job_calls, [1, 2])
+        self.assertEqual(set(Job.objects.values_list('status', flat=True)), {'done'})
+
+    def test_idempotency_key_dedupes_live_jobs(self):
+        first = enqueue("tests.record", 1, key="same")
+        self.assertEqual(enqueue("tests.record", 1, key="same"), first)
+        run_worker(processes=0, once=True)
+        # Finished jobs don't block a new one with the same key.
+        self.assertNotEqual(enqueue("tests.record", 1, key="same"), first)
+
+    def test_failed_jobs_retry_then_fail(self):
+        job = enqueue("tests.flaky", max_attempts=3)
+        run_worker(processes=0, once=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 3))
+        self.assertIn("RuntimeError: boom", job.last_error)
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = enqueue("tests.record", 1)
+        Job.objects.filter(pk=job.pk).update(status='running', locked_at=job.created_at)
+        self.assertEqual(requeue_stale(stale_after=0), 1)
+
+    def test_product_image_upload_is_queued_not_processed_inline(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 800)).save(buffer, "PNG")
+        with self.settings(MEDIA_ROOT=media):
+            product = Product.objects.create(
+                name="Queued", price=Decimal("100.00"),
+                image1=SimpleUploadedFile("q.png", buffer.getvalue(), content_type="image/png"),
+            )
+            job = Job.objects.get(task="store.build_image_derivatives")
+            self.assertFalse((Path(media) / 'derivatives').exists())
+
+            html = Template('{% load store_images %}{% responsive_img p.image1 %}').render(Context({'p': product}))
+            self.assertNotIn('<picture', html)
+            self.assertEqual(Job.objects.count(), 1)
+
+            version = Product.objects.values_list("version", flat=True).get(pk=product.pk)
+            run_worker(processes=0, once=True)
+            job.refresh_from_db()
+            self.assertEqual(job.status, 'done')
+            # Stamped in the DB, so cached cards go stale in every process
+            self.assertGreater(Product.objects.values_list("version", flat=True).get(pk=product.pk), version)
+
+            # A web process doesn't share the worker's local-memory cache
+            cache.clear()
+            html = Template('{% load store_images %}{% responsive_img p.image1 %}').render(Context({'p': product}))
+            self.assertIn('<picture', html)
+            self.assertEqual(Job.objects.filter(status="queued").count(), 0)
+
+
+# -------------------------------
+# Sitemap & product feeds
+# -------------------------------
+class FeedTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = self.settings(
+            MEDIA_ROOT=self.media,
+            STORE_FEEDS={'BASE_URL': 'https://shop.example', 'SHARD_SIZE': 10},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+        category = Category.objects.create(name="Khaadi")
+        self.lawn = Product.objects.create(
+            id=3, name="Lawn Suit", category=category, product_code="KH-3", price=Decimal("4500.00"),
+            discount_price=Decimal("3999.00"), stock=4, image1="products/lawn.jpg",
+        )
+        self.silk = Product.objects.create(id=14, name="Silk Shawl", price=Decimal("2500.00"), stock=0)
+        self.feeds = Path(self.media) / 'feeds'
+
+    def _read(self, name):
+        with gzip.open(self.feeds / name, 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def test_builds_gzipped_shards_and_index(self):
+        report = build_feeds()
+        self.assertEqual((report['shards'], report['rebuilt'], report['products']), (2, 2, 2))
+
+        google = ElementTree.fromstring(self._read('google-products-0000.xml.gz'))
+        g = '{http://base.google.com/ns/1.0}'
+        item = google.find('channel/item')
+        self.assertEqual(item.find(f'{g}id').text, 'KH-3')
+        self.assertEqual(item.find(f'{g}price').text, '4500.00 PKR')
+        self.assertEqual(item.find(f'{g}sale_price').text, '3999.00 PKR')
+        self.assertEqual(item.find(f'{g}link').text, 'https://shop.example/product/lawn-suit/')
+        self.assertEqual(item.find(f'{g}image_link').text, 'https://shop.example/media/products/lawn.jpg')
+
+        rows = list(csv.DictReader(io.StringIO(self._read('facebook-products-0001.csv.gz'))))
+        self.assertEqual([(r['id'], r['availability']) for r in rows], [(self.silk.product_code, 'out of stock')])
+
+        response = self.client.get(reverse('sitemap'))
+        index = b''.join(response.streaming_content).decode()
+        self.assertIn('https://shop.example/sitemap-products-0001.xml.gz', index)
+        part = self.client.get(reverse('sitemap_part', args=['0000']))
+        self.assertIn(b'/product/lawn-suit/', gzip.decompress(b''.join(part.streaming_content)))
+
+    def test_only_changed_shards_are_rewritten(self):
+        build_feeds()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(build_feeds()['rebuilt'], 0)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        self.silk.stock = 6
+        self.silk.save()
+        report = build_feeds()
+        self.assertEqual((report['rebuilt'], report['products']), (1, 1))
+        self.assertIn('6', self._read('facebook-products-0001.csv.gz'))
+
+    def test_a_version_committing_late_is_picked_up(self):
+        late = CatalogVersion.claim()
+        CatalogVersion.objects.filter(pk=late["version"]).delete()  # not committed yet
+        self.lawn.save()
+        build_feeds()
+
+        CatalogVersion.objects.create(pk=late["version"])
+        Product.objects.filter(pk=self.silk.pk).update(stock=6, **late)
+        report = build_feeds()
+        self.assertEqual((report['rebuilt'], report['products']), (1, 1))
+        self.assertIn('6', self._read('facebook-products-0001.csv.gz'))
+
+    def test_concurrent_runs_are_locked_out(self):
+        self.feeds.mkdir()
+        lock = self.feeds / '.build.lock'
+        lock.write_text("4242")
+        with self.assertRaises(FeedBuildRunning):
+            build_feeds()
+        self.assertFalse((self.feeds / 'manifest.json').exists())
+
+        os.utime(lock, (0, 0))  # left behind by a crashed run
+        self.assertEqual(build_feeds()['rebuilt'], 2)
+        self.assertFalse(lock.exists())
+
+    def test_inactive_and_deleted_products_drop_out(self):
+        build_feeds()
+        self.lawn.is_active = False
+        self.lawn.save()
+        self.silk.delete()
+        build_feeds()
+
+        self.assertEqual(sorted(p.name for p in self.feeds.iterdir()), ['manifest.json', 'sitemap.xml'])
+        self.assertEqual(self.client.get(reverse('sitemap_part', args=['0000'])).status_code, 404)
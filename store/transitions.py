@@ -0,0 +1,72 @@
+# -----------------------------
+# Order status transition hooks
+# -----------------------------
+# Side effects of an order moving between statuses (restocking on
+# cancellation, ...) are registered here instead of being hard-coded in
+# ``Order.save``. Hooks run inside the same transaction as the save.
+
+_status_hooks = []
+
+
+def on_status_change(from_status=None, to_status=None, bulk=None):
+    """
+    Register ``func(order, old_status, new_status)`` for a status transition.
+
+    ``None`` matches any status, so ``on_status_change(to_status="Cancelled")``
+    fires for every transition into "Cancelled". A newly created order
+    transitions from ``None`` to its initial status.
+
+    ``bulk(order_ids, old_status, new_status)``, if given, handles a whole
+    batch of orders making the same transition (see ``run_bulk_status_hooks``);
+    without it ``func`` is called once per order.
+    """
+    def decorator(func):
+        _status_hooks.append((from_status, to_status, func, bulk))
+        return func
+    return decorator
+
+
+def _matching_hooks(old_status, new_status):
+    for from_status, to_status, func, bulk in _status_hooks:
+        if from_status is not None and from_status != old_status:
+            continue
+        if to_status is not None and to_status != new_status:
+            continue
+        yield func, bulk
+
+
+def run_status_hooks(order, old_status, new_status):
+    for func, _ in _matching_hooks(old_status, new_status):
+        func(order, old_status, new_status)
+
+
+def run_bulk_status_hooks(order_ids_by_status, new_status):
+    """
+    Run the hooks for orders moved to ``new_status`` by a bulk UPDATE, once
+    per hook and previous status. ``order_ids_by_status`` is
+    ``{old_status: [order ids]}``.
+    """
+    from .models import Order
+
+    for old_status, order_ids in order_ids_by_status.items():
+        for func, bulk in _matching_hooks(old_status, new_status):
+            if bulk is not None:
+                bulk(order_ids, old_status, new_status)
+            else:
+                for order in Order.objects.filter(pk__in=order_ids):
+                    func(order, old_status, new_status)
+
+
+# -----------------------------
+# Built-in hooks
+# -----------------------------
+def restock_cancelled_orders(order_ids, old_status, new_status):
+    from .inventory import restock_orders
+    restock_orders(order_ids)
+
+
+@on_status_change(to_status="Cancelled", bulk=restock_cancelled_orders)
+def restock_cancelled_order(order, old_status, new_status):
+    if old_status is None:
+        return
+    restock_cancelled_orders([order.pk], old_status, new_status)
@@ -1,18 +1,32 @@
-from django.urls import path
+from django.conf import settings
+from django.urls import path, re_path
 from . import views
 from . import admin_views
+from . import api
+from . import async_views
 from django.contrib.auth import views as auth_views
 
+# ASGI deployments serve the hot storefront pages with async views (same URL names)
+if settings.STORE_ASYNC_VIEWS:
+    product_list, product_detail, view_cart = (
+        async_views.product_list, async_views.product_detail, async_views.view_cart,
+    )
+else:
+    product_list, product_detail, view_cart = (
+        views.ProductListView.as_view(), views.product_detail, views.view_cart,
+    )
+
 urlpatterns = [
     path("profile/", views.profile_view, name="profile"),
     path('profile/update/', views.update_profile, name='update_profile'),
     
     # Storefront
-    path('', views.ProductListView.as_view(), name='product_list'),
-    path('product/<slug:slug>/', views.product_detail, name='product_detail'),
+    path('', product_list, name='product_list'),
+    path('products.json', views.product_list_json, name='product_list_json'),
+    path('product/<slug:slug>/', product_detail, name='product_detail'),
 
     # Cart
-    path('cart/', views.view_cart, name='view_cart'),
+    path('cart/', view_cart, name='view_cart'),
     path('cart/add/<int:product_id>/', views.add_to_cart, name='add_to_cart'),
     path('cart/remove/<int:product_id>/', views.remove_from_cart, name='remove_from_cart'),
 
@@ -28,6 +42,21 @@ urlpatterns = [
 
     # Admin Dashboard (custom)
     path('admin-dashboard/', admin_views.admin_dashboard, name='admin_dashboard'),
+    path('admin-dashboard/profiling/', admin_views.profiling_dashboard, name='profiling_dashboard'),
+    path('admin-dashboard/export/orders/', admin_views.export_orders, name='export_orders'),
+    path('admin-dashboard/export/products/', admin_views.export_products, name='export_products'),
+    path('admin-dashboard/import/products/', admin_views.import_products_view, name='import_products'),
+
+    # JSON API (read-only, ETag / Last-Modified validated)
+    path('api/products/', api.products, name='api_products'),
+    path('api/products/<slug:slug>/', api.product, name='api_product'),
+    path('api/products/<slug:slug>/reviews/', api.reviews, name='api_product_reviews'),
+    path('api/categories/', api.categories, name='api_categories'),
+    path('api/facets/', api.facets, name='api_facets'),
+
+    # Sitemap (built by `manage.py build_feeds`)
+    path('sitemap.xml', views.sitemap, name='sitemap'),
+    re_path(r'^sitemap-products-(?P<shard>\d{4})\.xml\.gz$', views.sitemap, name='sitemap_part'),
 
     # Authentication
     path('login/', auth_views.LoginView.as_view(template_name='registration/login.html'), name='login'),
@@ -1,26 +1,53 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import FileResponse, Http404, JsonResponse
+from django.urls import reverse
 from django.views.generic import ListView
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Sum, Count
 from django.contrib import messages
-from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
-from django.db.models.signals import pre_save
-from django.dispatch import receiver
-from django.db.models import Sum, F
-from django.db.models.signals import post_save
 
 from django.contrib.auth.models import User
 
 
-from .models import Product, Category, Wishlist, Review, Order, OrderItem
+from .models import Product, Wishlist, Order
 from .forms import ReviewForm, CheckoutForm
-from django.db.models import F
+from .checkout import create_order, OutOfStockError
+from .search import filter_by_search, search_products
+from .pagination import keyset_page
+from .fragments import attach_versions, fragment_timeout
+from .detail import load_product_detail
+from .facets import (
+    filter_products, get_categories, get_discounted_products, get_facets, selected_filters,
+)
 
 # -------------------------------
 # Product List View
 # -------------------------------
 
+def catalog_queryset(params, keyset=False):
+    """
+    Active products filtered by the catalog query ``params`` (``request.GET``).
+
+    With ``keyset=True`` the result keeps the default ``-created_at`` order
+    (search is unranked, ``sort`` is ignored) so it can be cursor-paginated.
+    """
+    filters = selected_filters(params)
+    queryset = Product.objects.filter(is_active=True)
+
+    # 🔍 Search filter
+    query = filters.get('q')
+    if query:
+        queryset = filter_by_search(queryset, query) if keyset else search_products(queryset, query)
+
+    # 🏷️ Category / 🧵 Fabric / 💰 Price band / ⭐ Rating filters
+    queryset = filter_products(queryset, filters)
+
+    if not keyset and params.get('sort') == 'rating':
+        queryset = queryset.order_by('-rating_average', '-rating_count')
+
+    return queryset, filters
+
+
 class ProductListView(ListView):
     model = Product
     template_name = 'store/product_list.html'
@@ -28,58 +55,67 @@ class ProductListView(ListView):
     paginate_by = 8
 
     def get_queryset(self):
-        queryset = Product.objects.filter(is_active=True)
-
-        # 🔍 Search filter
-        query = self.request.GET.get('q')
-        if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) | Q(description__icontains=query)
-            )
-
-        # 🏷️ Category filter
-        category_slug = self.request.GET.get('category')
-        if category_slug:
-            queryset = queryset.filter(category__slug=category_slug)
-
-        # 🧵 Fabric filter
-        fabric = self.request.GET.get('fabric')
-        if fabric:
-            queryset = queryset.filter(fabric__iexact=fabric)
-
+        # ?paging=cursor opts into keyset pagination (no OFFSET, no COUNT)
+        self.cursor_paging = self.request.GET.get('paging') == 'cursor'
+        queryset, self.filters = catalog_queryset(self.request.GET, keyset=self.cursor_paging)
         return queryset
 
+    def paginate_queryset(self, queryset, page_size):
+        if not self.cursor_paging:
+            return super().paginate_queryset(queryset, page_size)
+        page = keyset_page(queryset, self.request.GET.get('cursor'), page_size)
+        return None, page, page.object_list, page.has_other_pages()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
-
-        # ✅ Unique fabrics (case-insensitive + trimmed)
-        fabrics = (
-            Product.objects.filter(is_active=True)
-            .exclude(fabric__exact="")
-            .values_list('fabric', flat=True)
-        )
+        context['categories'] = get_categories()
 
-        # Normalize (remove spaces, lower, then capitalize)
-        unique_fabrics = sorted(set(f.strip().title() for f in fabrics if f))
-
-        context['fabrics'] = unique_fabrics
+        # ✅ Facets with counts under the current filters (cached)
+        facets = get_facets(self.filters)
+        context['facets'] = facets
+        context['fabrics'] = [f['value'] for f in facets['fabric']]
         context['selected_fabric'] = self.request.GET.get('fabric')
+        context['selected_filters'] = self.filters
+        context['cursor_paging'] = self.cursor_paging
 
         # ✅ Top Discounted Products
-        context['discounted_products'] = (
-            Product.objects.filter(is_active=True, stock__gt=0, percentage_price__gt=0)
-            .order_by('-percentage_price')[:10]
-        )
+        context['discounted_products'] = get_discounted_products()
+
+        # ✅ Version stamps for the cached card fragments (one cache round trip)
+        attach_versions(list(context['products']) + list(context['discounted_products']))
+        context['fragment_ttl'] = fragment_timeout()
 
         return context
 
+
+def product_list_json(request):
+    """Cursor-paginated product cards for infinite scroll (same filters as the listing)."""
+    queryset, _ = catalog_queryset(request.GET, keyset=True)
+    page = keyset_page(queryset, request.GET.get('cursor'), ProductListView.paginate_by)
+    return JsonResponse({
+        'products': [
+            {
+                'id': product.id,
+                'name': product.name,
+                'url': reverse('product_detail', args=[product.slug]),
+                'fabric': product.fabric,
+                'price': str(product.price),
+                'final_price': str(product.final_price),
+                'image': product.image1.url if product.image1 else None,
+            }
+            for product in page
+        ],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
 # -------------------------------
 # Product Detail + Review
 # -------------------------------
 def product_detail(request, slug):
-    product = get_object_or_404(Product, slug=slug, is_active=True)
-    reviews = product.reviews.all().order_by("-created_at")
+    detail = load_product_detail(slug, review_page=request.GET.get("review_page", 1))
+    product = detail.product
 
     if request.method == "POST":
         if not request.user.is_authenticated:
@@ -96,16 +132,15 @@ def product_detail(request, slug):
     else:
         form = ReviewForm()
 
-    # ✅ Related products
-    related_products = Product.objects.filter(
-        category=product.category, is_active=True
-    ).exclude(id=product.id)[:4]
+    # ✅ Version stamps for the cached review list / related cards
+    attach_versions([product, *detail.related_products])
 
     return render(request, "store/product_detail.html", {
         "product": product,
-        "reviews": reviews,
+        "detail": detail,
         "form": form,
-        "related_products": related_products,
+        "related_products": detail.related_products,
+        "fragment_ttl": fragment_timeout(),
     })
 
 
@@ -136,7 +171,7 @@ def remove_from_wishlist(request, product_id):
 
 
 # -------------------------------
-# Cart (session-based)
+# Cart (request.cart, see store/cart.py)
 # -------------------------------
 def add_to_cart(request, product_id):
     product = get_object_or_404(Product, id=product_id)
@@ -152,49 +187,30 @@ def add_to_cart(request, product_id):
         messages.error(request, "Not enough stock available.")
         return redirect(request.META.get('HTTP_REFERER', 'product_list'))
 
-    cart = request.session.get('cart', {})
-
-    if str(product_id) in cart:
-        cart[str(product_id)] += quantity
-    else:
-        cart[str(product_id)] = quantity
-
-    request.session['cart'] = cart
+    request.cart.add(product.id, quantity)
     messages.success(request, f"Added {quantity} x {product.name} to cart.")
     return redirect(request.META.get('HTTP_REFERER', 'product_list'))
 
 
+def cart_page_context(request):
+    """Context of the cart page; reports lines of deleted products to the buyer once."""
+    # Lines and products in one query; lines of deleted products cascade away
+    cart = request.cart.resolve()
+    if cart.removed:
+        request.cart.acknowledge_removed(cart.removed)
+    return {
+        'cart_items': cart.items,
+        'total': cart.total,
+        'removed_count': cart.removed,
+    }
+
+
 def view_cart(request):
-    cart = request.session.get('cart', {})
-    products = []
-    total = 0
-
-    for product_id, quantity in cart.items():
-        product = get_object_or_404(Product, pk=product_id)
-
-        # ✅ discounted price support
-        price = product.discount_price if product.discount_price else product.price  
-        subtotal = price * quantity
-        total += subtotal
-
-        products.append({
-            'product': product,
-            'quantity': quantity,
-            'subtotal': subtotal,
-            'price': price,
-        })
-
-    return render(request, 'store/cart.html', {
-        'cart_items': products,
-        'total': total
-    })
+    return render(request, 'store/cart.html', cart_page_context(request))
 
 
 def remove_from_cart(request, product_id):
-    cart = request.session.get('cart', {})
-    if str(product_id) in cart:
-        del cart[str(product_id)]
-        request.session['cart'] = cart
+    if request.cart.remove(product_id):
         messages.success(request, "Item removed from cart.")
     return redirect('view_cart')
 
@@ -204,64 +220,29 @@ def remove_from_cart(request, product_id):
 # -------------------------------
 @login_required
 def place_order(request):
-    cart = request.session.get('cart', {})
+    # Build cart summary
+    cart = request.cart.resolve()
     if not cart:
         messages.error(request, "Your cart is empty.")
         return redirect('product_list')
 
-    cart_items = []
-    total = 0
-
-    # Build cart summary
-    for product_id, quantity in cart.items():
-        product = get_object_or_404(Product, pk=product_id)
-        price = product.discount_price if product.discount_price else product.price
-        subtotal = price * quantity
-        total += subtotal
-
-        cart_items.append({
-            'product': product,
-            'quantity': quantity,
-            'price': price,
-            'subtotal': subtotal,
-        })
+    cart_items = cart.items
+    total = cart.total
 
     if request.method == 'POST':
         form = CheckoutForm(request.POST)
         if form.is_valid():
-            cd = form.cleaned_data
-
-            # ✅ Create order with all form fields
-            order = Order.objects.create(
-                user=request.user if request.user.is_authenticated else None,
-                full_name=cd['full_name'],
-                phone_number=cd['phone_number'],
-                city=cd['city'],
-                province=cd['province'],
-                shipping_address=cd['shipping_address'],
-                payment_method=cd['payment_method'],
-                status="Pending",
-                total_amount=0  # will update after items
-            )
-
-            # ✅ Create order items
-            for item in cart_items:
-                OrderItem.objects.create(
-                    order=order,
-                    product=item['product'],
-                    price=item['price'],
-                    quantity=item['quantity']
+            try:
+                order = create_order(
+                    request.user if request.user.is_authenticated else None,
+                    cart,
+                    form.cleaned_data,
                 )
-                # reduce stock
-                item['product'].stock -= item['quantity']
-                item['product'].save()
+            except OutOfStockError as e:
+                messages.error(request, f"Sorry, {e.product.name} does not have enough stock left.")
+                return redirect('view_cart')
 
-            # ✅ Update total from cart
-            order.total_amount = total
-            order.save()
-
-            # clear session cart
-            request.session['cart'] = {}
+            request.cart.clear()
             messages.success(request, f"Order #{order.id} placed successfully!")
             return redirect('order_success', order_id=order.id)
     else:
@@ -354,4 +335,21 @@ def update_profile(request):
         messages.success(request, 'Your profile has been updated successfully ✅')
         return redirect('profile')
 
-    return render(request, 'store/update_profile.html')
\ No newline at end of file
+    return render(request, 'store/update_profile.html')
+
+
+# -------------------------------
+# Sitemap (files written by store/feeds.py)
+# -------------------------------
+def sitemap(request, shard=None):
+    """
+    Serve the sitemap index or one of its gzipped parts. They live under
+    MEDIA_ROOT but must be served from the site root to cover /product/ URLs.
+    """
+    from .feeds import feed_dir
+
+    name = "sitemap.xml" if shard is None else f"sitemap-products-{shard}.xml.gz"
+    try:
+        return FileResponse(open(feed_dir() / name, "rb"))
+    except FileNotFoundError:
+        raise Http404("Sitemap not built yet.")